@@ -435,8 +435,9 @@ class BacktestEngine:
         if len(equity) == 0:
             return 0.0
         
-        running_max = equity.expanding().max()
-        drawdown = (equity - running_max) / running_max
+        values = np.asarray(equity, dtype=np.float64)
+        running_max = np.maximum.accumulate(values)
+        drawdown = (values - running_max) / running_max
         max_dd = abs(drawdown.min())
         
         return float(max_dd)
@@ -6,6 +6,7 @@ Live demo that runs the actual bot for a short period to show it working.
 import sys
 import time
 import signal
+from datetime import datetime
 from pathlib import Path
 
 # Add project root to path
@@ -83,7 +84,7 @@ def main():
             
             try:
                 # Run one cycle
-                bot._run_strategies()
+                bot._run_strategies(datetime.now())
                 
                 # Show current state
                 positions = bot.redis.get_all_positions() if hasattr(bot, 'redis') else {}
@@ -13,20 +13,23 @@ CRITICAL: Run the watchdog in a separate process:
 """
 
 import os
+import threading
 import time
 from datetime import datetime, timedelta
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 import structlog
 import yaml
 
 from src.data.ingestion.alpaca_client import AlpacaDataClient
-from src.storage.append_log import AppendOnlyLog, Event, EventType
+from src.storage.append_log import AppendOnlyLog, BufferedEventWriter, Event, EventType
 from src.storage.duckdb_store import DuckDBStore
 from src.storage.redis_state import RedisStateStore
 from src.storage.append_log import Event, EventType
 from src.storage.etl_pipeline import ETLPipeline
 from src.regime.detector import RegimeDetector
+from src.strategy.base import SignalType
 from src.strategy.tier1.ema_crossover import EMACrossoverStrategy
 from src.strategy.tier1.rsi_mean_reversion import RSIMeanReversionStrategy
 from src.strategy.tier1.simple_momentum import SimpleMomentumStrategy
@@ -36,7 +39,7 @@ from src.portfolio.allocator import PortfolioAllocator
 from src.execution.order_manager import OrderManager
 from src.execution.reconciler import OrderReconciler
 from src.execution.paper_broker import PaperBroker
-from src.monitoring.metrics import MetricsCollector
+from src.monitoring.metrics import MetricsCollector, MetricsBuffer
 from src.monitoring.alerter import Alerter
 from src.monitoring.decay_detector import StrategyDecayDetector
 from watchdog.graceful_shutdown import create_shutdown_handler_for_bot
@@ -57,6 +60,13 @@ class MarketMaker:
     - Monitoring and heartbeats
     """
     
+    # How long a symbol that returned no bars is skipped before re-fetching
+    EMPTY_BARS_TTL_SECONDS = 300
+    
+    # Metrics are recomputed at least this often even if nothing changed,
+    # so the persisted series has no gaps
+    METRICS_FORCE_EVERY_TICKS = 60
+    
     def __init__(
         self,
         config_path: str = "config/settings.yaml",
@@ -88,7 +98,14 @@ class MarketMaker:
         self.running = False
         self.last_heartbeat = datetime.now()
         self.last_reconciliation = datetime.now()
-        self.last_etl_run = datetime.now()
+        
+        # Negative cache: symbol -> time.time() until which it is skipped
+        self._empty_bar_symbols: dict[str, float] = {}
+        self._empty_bar_day = self.last_heartbeat.date()
+        
+        # Inputs of the last metrics computation, to skip unchanged ticks
+        self._last_metrics_key: Optional[tuple] = None
+        self._metrics_ticks_skipped = 0
         
         logger.info(
             "market_maker_initialized",
@@ -144,6 +161,12 @@ class MarketMaker:
         log_path = self._expand_env_vars(log_path)
         self.append_log = AppendOnlyLog(log_path)
         
+        # Events are batched; anything pending is also flushed at the end
+        # of each iteration
+        self.event_writer = BufferedEventWriter(
+            self.append_log, capacity=64, max_latency_ms=100,
+        )
+        
         # DuckDB
         duckdb_path = storage_config.get("duckdb", {}).get(
             "path", "data/market_maker.duckdb"
@@ -281,20 +304,9 @@ class MarketMaker:
         
         # Drawdown monitor
         drawdown_config = risk_config.get("drawdown", {})
-        try:
-            account = self.alpaca.get_account()
-            initial_equity = float(account.equity)
-        except Exception as e:
-            error_str = str(e).lower()
-            if "unauthorized" in error_str or "401" in error_str:
-                initial_equity = 100000.0  # Default for demo mode
-                logger.warning(
-                    "using_default_equity_for_drawdown",
-                    initial_equity=initial_equity,
-                    reason="API keys invalid",
-                )
-            else:
-                raise
+        # Set by _init_data_clients (which raises if it cannot determine it),
+        # so no second account round-trip is needed here
+        initial_equity = self.redis.get_initial_equity()
         
         self.drawdown_monitor = DrawdownMonitor(
             max_daily_drawdown_pct=drawdown_config.get("max_daily_drawdown_pct", 3.0),
@@ -331,18 +343,54 @@ class MarketMaker:
         else:
             self.broker = self.alpaca
         
+        # Signal type -> handler, built once instead of comparing strings per signal
+        self._signal_dispatch = {
+            SignalType.BUY: self._handle_buy_signal,
+            SignalType.SELL: self._handle_close_signal,
+            SignalType.CLOSE: self._handle_close_signal,
+        }
+        
+        # Pre-bound logger for the order path (context merged once, not per call)
+        self._order_log = logger.bind(component="order", source="main_bot")
+        
         logger.info("execution_initialized", dry_run=self.dry_run)
     
     def _init_monitoring(self) -> None:
         """Initialize monitoring components."""
         self.metrics_collector = MetricsCollector()
+        self.metrics_buffer = MetricsBuffer(self.duckdb)
+        self._seed_metrics()
         self.alerter = Alerter()
         self.decay_detector = StrategyDecayDetector()
         
         logger.info("monitoring_initialized")
     
+    def _seed_metrics(self) -> None:
+        """Warm running risk metrics from stored daily closes (cold start)."""
+        try:
+            today = datetime.now()
+            history = self.duckdb.get_performance_history(
+                today - timedelta(days=90), today - timedelta(days=1),
+            )
+            if history.empty:
+                return
+            
+            closes = history["equity"].astype(float)
+            self.metrics_collector.seed_daily_returns(
+                closes.pct_change().dropna(),
+                last_close=float(closes.iloc[-1]),
+            )
+            logger.info("metrics_seeded", days=len(closes))
+        except Exception as e:
+            logger.warning("metrics_seed_failed", error=str(e))
+    
     def _init_etl(self) -> None:
-        """Initialize ETL pipeline."""
+        """
+        Initialize ETL pipeline.
+        
+        The pipeline runs on a background daemon thread so scanning the
+        append log and loading DuckDB never blocks the main loop.
+        """
         etl_config = self.config.get("etl", {})
         
         self.etl_pipeline = ETLPipeline(
@@ -352,6 +400,14 @@ class MarketMaker:
             max_batch_size=etl_config.get("max_batch_size", 10000),
         )
         
+        self._etl_stop = threading.Event()
+        self._etl_thread = threading.Thread(
+            target=self._etl_loop,
+            name="etl_pipeline",
+            daemon=True,
+        )
+        self._etl_thread.start()
+        
         logger.info("etl_pipeline_initialized")
     
     def _init_shutdown_handler(self) -> None:
@@ -362,6 +418,13 @@ class MarketMaker:
             redis_state=self.redis,
             pid_file="/tmp/market_maker/bot.pid",
         )
+        
+        # Cleanups run last-registered first, so the ETL thread is joined and
+        # buffered snapshots are written before the handler closes DuckDB
+        # and exits
+        self.shutdown_handler.register_cleanup(self._flush_metrics)
+        self.shutdown_handler.register_cleanup(self._stop_etl)
+        
         self.shutdown_handler.install()
         
         logger.info("shutdown_handler_installed")
@@ -377,6 +440,7 @@ class MarketMaker:
         
         # Log startup event
         self._log_event(EventType.HEARTBEAT, {"status": "startup"})
+        self._flush_events()
         
         try:
             while not self.shutdown_handler.should_shutdown():
@@ -388,6 +452,9 @@ class MarketMaker:
             self._log_event(EventType.ERROR, {"error": str(e)})
             raise
         finally:
+            self._flush_events()
+            self._flush_metrics()
+            self._stop_etl()
             self.running = False
             logger.info("market_maker_stopped")
     
@@ -401,9 +468,19 @@ class MarketMaker:
         3. Run strategies
         4. Execute orders
         5. Send heartbeat
+        
+        Events logged during the iteration are written to the append log
+        in a single batch once the iteration finishes.
         """
         now = datetime.now()
         
+        try:
+            self._run_iteration_at(now)
+        finally:
+            self._flush_events()
+    
+    def _run_iteration_at(self, now: datetime) -> None:
+        """Run the body of a main loop iteration for timestamp ``now``."""
         # Check if market is open (handle unauthorized errors gracefully)
         try:
             clock = self.alpaca.get_clock()
@@ -422,7 +499,7 @@ class MarketMaker:
         if not clock.is_open:
             # Market closed - reduced activity
             if (now - self.last_heartbeat).seconds > 60:
-                self._send_heartbeat()
+                self._send_heartbeat(now)
             return
         
         # Market is open - full activity
@@ -431,27 +508,22 @@ class MarketMaker:
             self._sync_positions()
             
             # 2. Check for Friday force close
-            self._check_friday_close()
-            
-            # 3. Run ETL (periodically)
-            if (now - self.last_etl_run).seconds >= 60:
-                self._run_etl()
-                self.last_etl_run = now
+            self._check_friday_close(now)
             
-            # 4. Reconcile orders (periodically)
+            # 3. Reconcile orders (periodically)
             if (now - self.last_reconciliation).seconds >= 300:
                 self._reconcile_orders()
                 self.last_reconciliation = now
             
-            # 5. Run strategies (if enabled)
+            # 4. Run strategies (if enabled)
             if self.config.get("strategies", {}).get("enabled", True):
-                self._run_strategies()
+                self._run_strategies(now)
             
-            # 6. Update metrics
+            # 5. Update metrics
             self._update_metrics()
             
-            # 7. Send heartbeat
-            self._send_heartbeat()
+            # 6. Send heartbeat
+            self._send_heartbeat(now)
             
         except Exception as e:
             logger.error("iteration_error", error=str(e))
@@ -527,16 +599,17 @@ class MarketMaker:
         except Exception as e:
             logger.error("position_sync_error", error=str(e))
     
-    def _check_friday_close(self) -> None:
+    def _check_friday_close(self, now: datetime) -> None:
         """
         Check if it's time for Friday force close.
         
         Implements Gemini's "Time-Based Exit" recommendation:
         Close ALL positions at 3:55 PM EST every Friday.
         No weekend risk. Period.
-        """
-        now = datetime.now()
         
+        Args:
+            now: Iteration timestamp shared by all subcomponents
+        """
         # Check if Friday
         if now.weekday() != 4:  # 4 = Friday
             return
@@ -562,7 +635,7 @@ class MarketMaker:
                     "positions_closed": len(positions),
                 })
     
-    def _run_strategies(self) -> None:
+    def _run_strategies(self, now: datetime) -> None:
         """
         Run trading strategies and execute signals.
         
@@ -573,10 +646,15 @@ class MarketMaker:
         4. Apply risk management
         5. Allocate portfolio
         6. Execute orders
+        
+        Args:
+            now: Iteration timestamp shared by all subcomponents
         """
         if not self.strategies:
             return
         
+        history_start = now - timedelta(days=60)
+        
         # Get current positions
         current_positions = self.redis.get_all_positions()
         
@@ -590,7 +668,10 @@ class MarketMaker:
         
         # Check drawdown limits
         last_equity = self.redis.get_state("last_equity") or portfolio_value
-        metrics = self.drawdown_monitor.update(portfolio_value, last_equity)
+        # Day-ordinal ticks keep days_since_peak in calendar days
+        metrics = self.drawdown_monitor.update(
+            portfolio_value, last_equity, tick_index=now.toordinal()
+        )
         
         # Store last equity for next iteration
         self.redis.set_state("last_equity", portfolio_value)
@@ -619,13 +700,22 @@ class MarketMaker:
         
         all_signals = []
         
+        # Known-empty symbols are only retried once their TTL lapses (or on a new day)
+        if now.date() != self._empty_bar_day:
+            self._empty_bar_symbols.clear()
+            self._empty_bar_day = now.date()
+        wall_time = time.time()
+        
         for symbol in symbols:
+            if self._empty_bar_symbols.get(symbol, 0.0) > wall_time:
+                continue
+            
             # Get historical bars for regime detection
             try:
                 bars = self.duckdb.get_bars(
                     symbol=symbol,
-                    start=datetime.now() - timedelta(days=60),
-                    end=datetime.now(),
+                    start=history_start,
+                    end=now,
                     timeframe="1Day",
                 )
                 
@@ -636,8 +726,8 @@ class MarketMaker:
                         if hasattr(self.alpaca, 'get_historical_bars'):
                             data_bars = self.alpaca.get_historical_bars(
                                 symbol=symbol,
-                                start=datetime.now() - timedelta(days=60),
-                                end=datetime.now(),
+                                start=history_start,
+                                end=now,
                                 timeframe="1Day",
                             )
                             
@@ -682,6 +772,8 @@ class MarketMaker:
                         continue
                 
                 if bars.empty:
+                    self._empty_bar_symbols[symbol] = wall_time + self.EMPTY_BARS_TTL_SECONDS
+                    logger.debug("empty_bars_cached", symbol=symbol)
                     continue
                 
                 # Detect regime
@@ -754,188 +846,205 @@ class MarketMaker:
     ) -> None:
         """Process signals through risk management and execution."""
         for signal in signals:
+            handler = self._signal_dispatch.get(signal.signal_type)
+            if handler is None:
+                continue
+            
             try:
-                # Calculate position size
-                # Get volatility for sizing (simplified - would fetch from bars)
-                volatility = 0.15  # Default
-                
-                size_result = self.position_sizer.calculate_size(
-                    portfolio_value=portfolio_value,
+                handler(signal, portfolio_value, position_scale)
+            except Exception:
+                self._order_log.exception("signal_processing_error", signal_id=signal.signal_id)
+    
+    def _handle_buy_signal(
+        self,
+        signal,
+        portfolio_value: float,
+        position_scale: float,
+    ) -> None:
+        """Size and submit a limit buy order for a BUY signal."""
+        # Calculate position size
+        # Get volatility for sizing (simplified - would fetch from bars)
+        volatility = 0.15  # Default
+        
+        size_result = self.position_sizer.calculate_size(
+            portfolio_value=portfolio_value,
+            symbol=signal.symbol,
+            current_price=signal.entry_price or 100.0,
+            volatility=volatility,
+            regime_scale=position_scale,
+        )
+        
+        # Apply max limit
+        size_result = self.position_sizer.apply_max_limit(size_result, portfolio_value)
+        
+        # Create order
+        if not signal.entry_price or signal.entry_price <= 0:
+            logger.warning("invalid_entry_price", signal_id=signal.signal_id)
+            return
+        
+        qty = size_result.size_dollars / signal.entry_price
+        
+        if qty <= 0:
+            logger.warning("invalid_quantity", signal_id=signal.signal_id, qty=qty)
+            return
+        
+        order = self.order_manager.create_order(
+            symbol=signal.symbol,
+            side="buy",
+            qty=qty,
+            order_type="limit",
+            limit_price=signal.entry_price,
+            strategy_name=signal.strategy_name,
+            signal_id=signal.signal_id,
+        )
+        
+        # Submit order (always execute in simulation mode)
+        try:
+            # Use PaperBroker for simulation/dry_run
+            if hasattr(self.broker, 'submit_limit_order'):
+                broker_order = self.broker.submit_limit_order(
                     symbol=signal.symbol,
-                    current_price=signal.entry_price or 100.0,
-                    volatility=volatility,
-                    regime_scale=position_scale,
+                    qty=qty,
+                    side="buy",
+                    limit_price=signal.entry_price,
+                    client_order_id=order.client_order_id,
                 )
                 
-                # Apply max limit
-                size_result = self.position_sizer.apply_max_limit(size_result, portfolio_value)
+                self.order_manager.mark_submitted(
+                    order.client_order_id,
+                    str(broker_order.get("order_id", order.client_order_id)),
+                )
                 
-                # Create order
-                if signal.signal_type.value == "buy":
-                    if not signal.entry_price or signal.entry_price <= 0:
-                        logger.warning("invalid_entry_price", signal_id=signal.signal_id)
-                        continue
+                # Mark as filled immediately for paper broker
+                if broker_order.get("status") == "filled":
+                    self.order_manager.mark_filled(
+                        order.client_order_id,
+                        filled_qty=qty,
+                        filled_price=broker_order.get("filled_price", signal.entry_price),
+                    )
+            else:
+                # Paper broker submit_order method
+                result = self.broker.submit_order(
+                    symbol=signal.symbol,
+                    side="buy",
+                    qty=qty,
+                    order_type="limit",
+                    limit_price=signal.entry_price,
+                    current_price=signal.entry_price,
+                )
+                
+                if result.get("status") == "filled":
+                    self.order_manager.mark_submitted(
+                        order.client_order_id,
+                        str(result.get("order_id", order.client_order_id)),
+                    )
+                    self.order_manager.mark_filled(
+                        order.client_order_id,
+                        filled_qty=qty,
+                        filled_price=result.get("filled_price", signal.entry_price),
+                    )
                     
-                    qty = size_result.size_dollars / signal.entry_price
+                    # Update position in Redis
+                    account = self.broker.get_account()
+                    positions = self.broker.get_positions()
                     
-                    if qty <= 0:
-                        logger.warning("invalid_quantity", signal_id=signal.signal_id, qty=qty)
-                        continue
+                    for pos in positions:
+                        if pos["symbol"] == signal.symbol:
+                            self.redis.set_position(
+                                symbol=pos["symbol"],
+                                qty=pos["qty"],
+                                avg_price=pos["avg_price"],
+                                market_value=pos["qty"] * signal.entry_price,
+                                unrealized_pnl=(signal.entry_price - pos["avg_price"]) * pos["qty"],
+                                side="long",
+                            )
+                    
+                    # Update account equity in Redis
+                    self.redis.client.rpush(
+                        f"{RedisStateStore.STATE_PREFIX}:equity_history",
+                        account["equity"],
+                    )
+                    self.redis.client.ltrim(
+                        f"{RedisStateStore.STATE_PREFIX}:equity_history",
+                        -100,
+                        -1,
+                    )
                     
-                    order = self.order_manager.create_order(
+                    logger.info(
+                        "order_filled_and_stored",
                         symbol=signal.symbol,
-                        side="buy",
                         qty=qty,
-                        order_type="limit",
-                        limit_price=signal.entry_price,
-                        strategy_name=signal.strategy_name,
-                        signal_id=signal.signal_id,
+                        price=result.get("filled_price", signal.entry_price),
                     )
-                    
-                    # Submit order (always execute in simulation mode)
-                    try:
-                        # Use PaperBroker for simulation/dry_run
-                        if hasattr(self.broker, 'submit_limit_order'):
-                            broker_order = self.broker.submit_limit_order(
-                                symbol=signal.symbol,
-                                qty=qty,
-                                side="buy",
-                                limit_price=signal.entry_price,
-                                client_order_id=order.client_order_id,
-                            )
-                            
-                            self.order_manager.mark_submitted(
-                                order.client_order_id,
-                                str(broker_order.get("order_id", order.client_order_id)),
-                            )
-                            
-                            # Mark as filled immediately for paper broker
-                            if broker_order.get("status") == "filled":
-                                self.order_manager.mark_filled(
-                                    order.client_order_id,
-                                    filled_qty=qty,
-                                    filled_price=broker_order.get("filled_price", signal.entry_price),
-                                )
-                        else:
-                            # Paper broker submit_order method
-                            result = self.broker.submit_order(
-                                symbol=signal.symbol,
-                                side="buy",
-                                qty=qty,
-                                order_type="limit",
-                                limit_price=signal.entry_price,
-                                current_price=signal.entry_price,
-                            )
-                            
-                            if result.get("status") == "filled":
-                                self.order_manager.mark_submitted(
-                                    order.client_order_id,
-                                    str(result.get("order_id", order.client_order_id)),
-                                )
-                                self.order_manager.mark_filled(
-                                    order.client_order_id,
-                                    filled_qty=qty,
-                                    filled_price=result.get("filled_price", signal.entry_price),
-                                )
-                                
-                                # Update position in Redis
-                                account = self.broker.get_account()
-                                positions = self.broker.get_positions()
-                                
-                                for pos in positions:
-                                    if pos["symbol"] == signal.symbol:
-                                        self.redis.set_position(
-                                            symbol=pos["symbol"],
-                                            qty=pos["qty"],
-                                            avg_price=pos["avg_price"],
-                                            market_value=pos["qty"] * signal.entry_price,
-                                            unrealized_pnl=(signal.entry_price - pos["avg_price"]) * pos["qty"],
-                                            side="long",
-                                        )
-                                
-                                # Update account equity in Redis
-                                self.redis.client.rpush(
-                                    f"{RedisStateStore.STATE_PREFIX}:equity_history",
-                                    account["equity"],
-                                )
-                                self.redis.client.ltrim(
-                                    f"{RedisStateStore.STATE_PREFIX}:equity_history",
-                                    -100,
-                                    -1,
-                                )
-                                
-                                logger.info(
-                                    "order_filled_and_stored",
-                                    symbol=signal.symbol,
-                                    qty=qty,
-                                    price=result.get("filled_price", signal.entry_price),
-                                )
-                        
-                        self._log_event(EventType.ORDER_SUBMITTED, order.to_dict())
-                    
-                    except Exception as e:
-                        logger.error("order_submission_error", order_id=order.client_order_id, error=str(e))
-                        self.order_manager.mark_failed(order.client_order_id)
-                
-                elif signal.signal_type.value in ("sell", "close"):
-                    # Close position
-                    current_position = self.redis.get_position(signal.symbol)
-                    if current_position:
-                        qty = abs(current_position["qty"])
-                        
-                        if qty <= 0:
-                            continue
+            
+            self._log_event(EventType.ORDER_SUBMITTED, order.to_dict())
+        
+        except Exception:
+            self._order_log.exception("order_submission_error", order_id=order.client_order_id)
+            self.order_manager.mark_failed(order.client_order_id)
+    
+    def _handle_close_signal(
+        self,
+        signal,
+        portfolio_value: float,
+        position_scale: float,
+    ) -> None:
+        """Submit a market sell closing the current position for a SELL/CLOSE signal."""
+        # Close position
+        current_position = self.redis.get_position(signal.symbol)
+        if current_position:
+            qty = abs(current_position["qty"])
+            
+            if qty <= 0:
+                return
+            
+            order = self.order_manager.create_order(
+                symbol=signal.symbol,
+                side="sell",
+                qty=qty,
+                order_type="market",
+                strategy_name=signal.strategy_name,
+                signal_id=signal.signal_id,
+            )
+            
+            try:
+                if not self.dry_run:
+                    if hasattr(self.broker, 'submit_market_order'):
+                        broker_order = self.broker.submit_market_order(
+                            symbol=signal.symbol,
+                            qty=qty,
+                            side="sell",
+                            client_order_id=order.client_order_id,
+                        )
                         
-                        order = self.order_manager.create_order(
+                        self.order_manager.mark_submitted(
+                            order.client_order_id,
+                            str(broker_order.id) if hasattr(broker_order, 'id') else str(broker_order.get("order_id", "")),
+                        )
+                    else:
+                        # Paper broker
+                        result = self.broker.submit_order(
                             symbol=signal.symbol,
                             side="sell",
                             qty=qty,
                             order_type="market",
-                            strategy_name=signal.strategy_name,
-                            signal_id=signal.signal_id,
+                            current_price=current_position.get("avg_price", 100.0),
                         )
                         
-                        try:
-                            if not self.dry_run:
-                                if hasattr(self.broker, 'submit_market_order'):
-                                    broker_order = self.broker.submit_market_order(
-                                        symbol=signal.symbol,
-                                        qty=qty,
-                                        side="sell",
-                                        client_order_id=order.client_order_id,
-                                    )
-                                    
-                                    self.order_manager.mark_submitted(
-                                        order.client_order_id,
-                                        str(broker_order.id) if hasattr(broker_order, 'id') else str(broker_order.get("order_id", "")),
-                                    )
-                                else:
-                                    # Paper broker
-                                    result = self.broker.submit_order(
-                                        symbol=signal.symbol,
-                                        side="sell",
-                                        qty=qty,
-                                        order_type="market",
-                                        current_price=current_position.get("avg_price", 100.0),
-                                    )
-                                    
-                                    if result.get("status") == "filled":
-                                        self.order_manager.mark_filled(
-                                            order.client_order_id,
-                                            filled_qty=qty,
-                                            filled_price=result.get("filled_price"),
-                                        )
-                            else:
-                                logger.info("dry_run_order", order=order.to_dict())
-                            
-                            self._log_event(EventType.ORDER_SUBMITTED, order.to_dict())
-                        
-                        except Exception as e:
-                            logger.error("order_submission_error", order_id=order.client_order_id, error=str(e))
-                            self.order_manager.mark_failed(order.client_order_id)
+                        if result.get("status") == "filled":
+                            self.order_manager.mark_filled(
+                                order.client_order_id,
+                                filled_qty=qty,
+                                filled_price=result.get("filled_price"),
+                            )
+                else:
+                    logger.info("dry_run_order", order=order.to_dict())
+                
+                self._log_event(EventType.ORDER_SUBMITTED, order.to_dict())
             
-            except Exception as e:
-                logger.error("signal_processing_error", signal_id=signal.signal_id, error=str(e))
+            except Exception:
+                self._order_log.exception("order_submission_error", order_id=order.client_order_id)
+                self.order_manager.mark_failed(order.client_order_id)
     
     def _run_etl(self) -> None:
         """Run ETL pipeline to process events."""
@@ -945,6 +1054,21 @@ class MarketMaker:
         except Exception as e:
             logger.error("etl_run_error", error=str(e))
     
+    def _etl_loop(self) -> None:
+        """Background thread body: run ETL every batch interval until stopped."""
+        while not self._etl_stop.wait(self.etl_pipeline.batch_interval):
+            self._run_etl()
+    
+    def _stop_etl(self) -> None:
+        """
+        Stop the background ETL thread.
+        
+        Waits for a batch in progress, so it runs before DuckDB is closed
+        (as a shutdown cleanup, and again from run()).
+        """
+        self._etl_stop.set()
+        self._etl_thread.join(timeout=self.etl_pipeline.batch_interval)
+    
     def _reconcile_orders(self) -> None:
         """Reconcile orders with broker state."""
         try:
@@ -960,8 +1084,21 @@ class MarketMaker:
             account = self.alpaca.get_account()
             equity = float(account.equity)
             cash = float(account.cash)
-            positions = self.redis.get_all_positions()
-            positions_value = sum(p.get("market_value", 0) for p in positions.values())
+            positions, initial_equity = self.redis.get_portfolio_state()
+            # set_position() always stores market_value, so no .get() default is needed
+            positions_value = sum(map(itemgetter("market_value"), positions.values()))
+            num_open_orders = len(self.order_manager.get_open_orders())
+            
+            # Skip the compute/persist/alert path when nothing moved
+            metrics_key = (equity, cash, positions_value, len(positions), num_open_orders)
+            if (
+                metrics_key == self._last_metrics_key
+                and self._metrics_ticks_skipped < self.METRICS_FORCE_EVERY_TICKS
+            ):
+                self._metrics_ticks_skipped += 1
+                return
+            self._last_metrics_key = metrics_key
+            self._metrics_ticks_skipped = 0
             
             # Get returns history (simplified - would fetch from DuckDB)
             returns_history = None  # Would be fetched from DuckDB
@@ -970,19 +1107,15 @@ class MarketMaker:
                 equity=equity,
                 cash=cash,
                 positions_value=positions_value,
-                initial_equity=self.redis.get_initial_equity() or equity,
+                initial_equity=initial_equity or equity,
                 returns_history=returns_history,
                 num_positions=len(positions),
-                num_open_orders=len(self.order_manager.get_open_orders()),
+                num_open_orders=num_open_orders,
             )
             
-            # Store metrics in DuckDB
+            # Store metrics in DuckDB (batched)
             try:
-                metrics_dict = metrics.to_dict()
-                # Convert timestamp to date for DuckDB
-                if "timestamp" in metrics_dict and "date" not in metrics_dict:
-                    metrics_dict["date"] = datetime.fromisoformat(metrics_dict["timestamp"]).date()
-                self.duckdb.insert_performance(metrics_dict)
+                self.metrics_buffer.append(metrics)
             except Exception as e:
                 logger.debug("metrics_insert_skipped", error=str(e))  # May fail if schema not ready
             
@@ -996,24 +1129,40 @@ class MarketMaker:
         except Exception as e:
             logger.error("metrics_update_error", error=str(e))
     
-    def _send_heartbeat(self) -> None:
+    def _flush_metrics(self) -> None:
+        """Write any buffered performance snapshots to DuckDB."""
+        try:
+            self.metrics_buffer.flush()
+        except Exception as e:
+            logger.error("metrics_flush_error", error=str(e))
+    
+    def _send_heartbeat(self, now: datetime) -> None:
         """Send heartbeat to Redis (for watchdog monitoring)."""
         self.redis.send_heartbeat("main_bot", ttl_seconds=120)
-        self.last_heartbeat = datetime.now()
+        self.last_heartbeat = now
         
         self._log_event(EventType.HEARTBEAT, {
             "timestamp": self.last_heartbeat.isoformat(),
         })
     
     def _log_event(self, event_type: EventType, data: dict) -> None:
-        """Log an event to the append-only log."""
+        """
+        Queue an event for the append-only log.
+        
+        Events are buffered by the event writer and written in batches
+        instead of one file write per event.
+        """
         event = Event(
             event_type=event_type,
             timestamp=datetime.now(),
             data=data,
             source="main_bot",
         )
-        self.append_log.write(event)
+        self.event_writer.write(event)
+    
+    def _flush_events(self) -> None:
+        """Write all queued events to the append-only log in one batch."""
+        self.event_writer.flush()
 
 
 def main():
@@ -8,8 +8,8 @@ Handles:
 - Real-time monitoring
 """
 
-from src.monitoring.metrics import MetricsCollector
+from src.monitoring.metrics import MetricsCollector, MetricsBuffer
 from src.monitoring.alerter import Alerter
 from src.monitoring.decay_detector import StrategyDecayDetector
 
-__all__ = ["MetricsCollector", "Alerter", "StrategyDecayDetector"]
+__all__ = ["MetricsCollector", "MetricsBuffer", "Alerter", "StrategyDecayDetector"]
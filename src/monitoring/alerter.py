@@ -5,12 +5,18 @@ Prevents alert fatigue by deduplicating similar alerts.
 Critical alerts are never suppressed.
 """
 
-from datetime import datetime, timedelta
+import re
+import time
+from collections import OrderedDict, deque
 from typing import Optional
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+# Numbers in templated messages ("Current drawdown: 5.12%") are collapsed
+# so near-duplicate alerts share one deduplication key
+_NUMBER_RE = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
 
 class AlertSeverity:
     """Alert severity levels."""
@@ -26,8 +32,15 @@ class Alerter:
     
     Implements Gemini's recommendation to prevent alert fatigue.
     Same alert within 5 minutes = suppress (except critical).
+    
+    Alerts are keyed by the first 128 characters of the message with
+    numbers normalized, and at most MAX_TRACKED_MESSAGES keys are kept
+    (least recently alerted evicted first) so memory stays bounded.
     """
     
+    MAX_TRACKED_MESSAGES = 4096
+    DEDUP_KEY_CHARS = 128
+    
     def __init__(
         self,
         deduplication_window_seconds: int = 300,  # 5 minutes
@@ -43,8 +56,20 @@ class Alerter:
         self.dedup_window = deduplication_window_seconds
         self.max_per_hour = max_alerts_per_hour
         
-        # Track sent alerts
-        self.sent_alerts: dict[str, list[datetime]] = {}
+        # Alerts are counted over the dedup window, capped at one hour
+        self._count_window = float(min(deduplication_window_seconds, 3600))
+        
+        # Track sent alerts: dedup key -> time.monotonic() send times, oldest first
+        self.sent_alerts: OrderedDict[str, deque[float]] = OrderedDict()
+        
+        # Severity -> log method on a pre-bound logger, built once instead of per alert
+        self._alert_log = logger.bind(component="alert")
+        self._log_methods = {
+            AlertSeverity.DEBUG: self._alert_log.debug,
+            AlertSeverity.INFO: self._alert_log.info,
+            AlertSeverity.WARNING: self._alert_log.warning,
+            AlertSeverity.CRITICAL: self._alert_log.critical,
+        }
         
         logger.info(
             "alerter_initialized",
@@ -73,12 +98,7 @@ class Alerter:
                 return
         
         # Log alert
-        log_method = {
-            AlertSeverity.DEBUG: logger.debug,
-            AlertSeverity.INFO: logger.info,
-            AlertSeverity.WARNING: logger.warning,
-            AlertSeverity.CRITICAL: logger.critical,
-        }.get(severity, logger.info)
+        log_method = self._log_methods.get(severity, self._alert_log.info)
         
         log_method(
             "alert_sent",
@@ -100,34 +120,41 @@ class Alerter:
         if severity == AlertSeverity.CRITICAL:
             return True
         
-        alert_times = self.sent_alerts.get(message, [])
+        key = self._dedup_key(message)
+        alert_times = self.sent_alerts.get(key)
+        if not alert_times:
+            return True
         
-        # Remove old alerts
-        cutoff = datetime.now() - timedelta(seconds=self.dedup_window)
-        alert_times = [t for t in alert_times if t > cutoff]
+        # Expire alerts outside the window (oldest are on the left)
+        cutoff = time.monotonic() - self._count_window
+        while alert_times and alert_times[0] <= cutoff:
+            alert_times.popleft()
         
-        # Check if too many in last hour
-        hour_ago = datetime.now() - timedelta(hours=1)
-        recent_count = sum(1 for t in alert_times if t > hour_ago)
+        if not alert_times:
+            del self.sent_alerts[key]
+            return True
         
-        if recent_count >= self.max_per_hour:
+        if len(alert_times) >= self.max_per_hour:
             return False  # Suppress
         
         return True
     
     def _record_alert(self, message: str) -> None:
-        """Record alert for deduplication."""
-        if message not in self.sent_alerts:
-            self.sent_alerts[message] = []
-        
-        self.sent_alerts[message].append(datetime.now())
-        
-        # Cleanup old entries
-        cutoff = datetime.now() - timedelta(hours=2)
-        self.sent_alerts[message] = [
-            t for t in self.sent_alerts[message]
-            if t > cutoff
-        ]
+        """Record alert for deduplication (expiry happens in _should_send)."""
+        key = self._dedup_key(message)
+        alert_times = self.sent_alerts.get(key)
+        if alert_times is None:
+            alert_times = self.sent_alerts[key] = deque()
+            if len(self.sent_alerts) > self.MAX_TRACKED_MESSAGES:
+                self.sent_alerts.popitem(last=False)  # Evict least recently alerted
+        else:
+            self.sent_alerts.move_to_end(key)
+        
+        alert_times.append(time.monotonic())
+    
+    def _dedup_key(self, message: str) -> str:
+        """Deduplication key: message prefix with numeric values collapsed."""
+        return _NUMBER_RE.sub("#", message[:self.DEDUP_KEY_CHARS])
     
     def send_critical(self, message: str, **context) -> None:
         """Send critical alert (never suppressed)."""
@@ -5,8 +5,8 @@ Detects when strategies are losing effectiveness and should be disabled.
 Implements Gemini's recommendation: detect strategy death, not ignore it.
 """
 
+import time
 from dataclasses import dataclass
-from datetime import datetime, timedelta
 from typing import Optional
 import structlog
 
@@ -32,6 +32,47 @@ class DecayStatus:
     recommendation: str
 
 
+class SharpeHistory:
+    """
+    Fixed-size ring buffer of (timestamp, sharpe) observations.
+    
+    Timestamps and Sharpe values live in two parallel float arrays so the
+    death check is a single vectorized comparison.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize history.
+        
+        Args:
+            capacity: Maximum number of observations retained
+        """
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.sharpes = np.zeros(capacity, dtype=np.float64)
+        self.head = 0
+        self.count = 0
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def append(self, timestamp: float, sharpe: float) -> None:
+        """Record an observation, overwriting the oldest when full."""
+        self.timestamps[self.head] = timestamp
+        self.sharpes[self.head] = sharpe
+        self.head = (self.head + 1) % len(self.timestamps)
+        self.count = min(self.count + 1, len(self.timestamps))
+    
+    def ordered(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps, sharpes) oldest first."""
+        if self.count < len(self.timestamps):
+            return self.timestamps[:self.count], self.sharpes[:self.count]
+        
+        return (
+            np.concatenate((self.timestamps[self.head:], self.timestamps[:self.head])),
+            np.concatenate((self.sharpes[self.head:], self.sharpes[:self.head])),
+        )
+
+
 class StrategyDecayDetector:
     """
     Detects strategy decay and death.
@@ -61,8 +102,12 @@ class StrategyDecayDetector:
         self.degradation_threshold = degradation_threshold
         self.disable_threshold_days = disable_threshold_days
         
-        # Track strategy performance
-        self.strategy_performance: dict[str, list[dict]] = {}
+        # Observations older than this (seconds) are dropped
+        self.death_cutoff_s = float((disable_threshold_days + 10) * 86400)
+        
+        # Track strategy performance: time.monotonic() and sharpe per check
+        self.history_capacity = disable_threshold_days + 10
+        self.strategy_performance: dict[str, SharpeHistory] = {}
         
         logger.info(
             "decay_detector_initialized",
@@ -146,30 +191,29 @@ class StrategyDecayDetector:
         
         Tracks consecutive days with negative Sharpe.
         """
-        if strategy_name not in self.strategy_performance:
-            self.strategy_performance[strategy_name] = []
+        history = self.strategy_performance.get(strategy_name)
+        if history is None:
+            history = self.strategy_performance[strategy_name] = SharpeHistory(
+                self.history_capacity
+            )
         
         # Record current performance
-        self.strategy_performance[strategy_name].append({
-            "timestamp": datetime.now(),
-            "sharpe": current_sharpe,
-        })
-        
-        # Keep only recent data
-        cutoff = datetime.now() - timedelta(days=self.disable_threshold_days + 10)
-        self.strategy_performance[strategy_name] = [
-            p for p in self.strategy_performance[strategy_name]
-            if p["timestamp"] > cutoff
-        ]
+        now = time.monotonic()
+        history.append(now, current_sharpe)
         
         # Check consecutive negative Sharpe days
-        recent_performance = self.strategy_performance[strategy_name][-self.disable_threshold_days:]
-        
-        if len(recent_performance) < self.disable_threshold_days:
+        n = self.disable_threshold_days
+        if len(history) < n:
             return False  # Not enough data
         
+        timestamps, sharpes = history.ordered()
+        
+        # Window must lie entirely within the retention cutoff
+        if timestamps[-n] <= now - self.death_cutoff_s:
+            return False
+        
         # All recent Sharpe values < 0?
-        all_negative = all(p["sharpe"] < 0 for p in recent_performance)
+        all_negative = bool((sharpes[-n:] < 0).all())
         
         return all_negative
     
@@ -8,18 +8,52 @@ Collects and exports performance metrics for:
 - Trading statistics
 """
 
+import json
+import math
+import time
+from collections import deque
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional, Dict
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Any, Optional, Dict
 import structlog
 
 import pandas as pd
 import numpy as np
 
+from src.utils.rolling import RollingMoments
+
 logger = structlog.get_logger(__name__)
 
+# Storage columns copied verbatim by PortfolioMetrics.to_dict()
+_SCALAR_FIELDS = (
+    "equity",
+    "cash",
+    "positions_value",
+    "daily_return",
+    "cumulative_return",
+    "sharpe_30d",
+    "sortino_30d",
+    "max_drawdown",
+    "current_drawdown",
+    "num_positions",
+    "num_open_orders",
+)
+_get_scalar_fields = attrgetter(*_SCALAR_FIELDS)
+
+# Float columns of the performance table, in table order, buffered by MetricsBuffer
+_BUFFER_FIELDS = _SCALAR_FIELDS[:9]
+_get_buffer_fields = attrgetter(*_BUFFER_FIELDS)
+
+# Number of snapshots kept in MetricsCollector.metrics_history
+METRICS_HISTORY_SIZE = 1000
 
-@dataclass
+# Annualization for daily returns, computed once as plain floats
+_TRADING_DAYS = 252.0
+_ANNUALIZER = math.sqrt(_TRADING_DAYS)
+
+
+@dataclass(slots=True)
 class PortfolioMetrics:
     """Portfolio performance metrics."""
     timestamp: datetime
@@ -48,21 +82,104 @@ class PortfolioMetrics:
     
     def to_dict(self) -> dict:
         """Convert to dictionary for storage."""
-        return {
-            "timestamp": self.timestamp.isoformat(),
-            "equity": self.equity,
-            "cash": self.cash,
-            "positions_value": self.positions_value,
-            "daily_return": self.daily_return,
-            "cumulative_return": self.cumulative_return,
-            "sharpe_30d": self.sharpe_30d,
-            "sortino_30d": self.sortino_30d,
-            "max_drawdown": self.max_drawdown,
-            "current_drawdown": self.current_drawdown,
-            "num_positions": self.num_positions,
-            "num_open_orders": self.num_open_orders,
-            "strategy_attribution": self.strategy_attribution or {},
-        }
+        row = {"timestamp": self.timestamp.isoformat()}
+        row.update(zip(_SCALAR_FIELDS, _get_scalar_fields(self)))
+        row["strategy_attribution"] = self.strategy_attribution or {}
+        return row
+
+
+class RollingReturnStats:
+    """
+    Sliding window of daily returns with O(1) Sharpe/Sortino.
+    
+    Keeps running moments of all returns and of the negative returns in
+    the window, so each new return costs O(1) instead of recomputing
+    mean and std over the whole window.
+    """
+    
+    def __init__(self, window: int = 30):
+        """
+        Initialize rolling stats.
+        
+        Args:
+            window: Number of returns in the sliding window
+        """
+        self.window = window
+        self._returns: deque[float] = deque()
+        self._all = RollingMoments()
+        self._downside = RollingMoments()
+    
+    def __len__(self) -> int:
+        return len(self._returns)
+    
+    def push(self, value: float) -> None:
+        """Add a return, evicting the oldest once the window is full."""
+        if len(self._returns) == self.window:
+            old = self._returns.popleft()
+            self._all.remove(old)
+            if old < 0:
+                self._downside.remove(old)
+        
+        self._returns.append(value)
+        self._all.add(value)
+        if value < 0:
+            self._downside.add(value)
+    
+    def sharpe(self, risk_free_rate: float = 0.0) -> float:
+        """Annualized Sharpe ratio of the window."""
+        std = self._all.std()
+        if std == 0:
+            return 0.0
+        
+        excess_returns = self._all.mean - (risk_free_rate / _TRADING_DAYS)
+        return float((excess_returns / std) * _ANNUALIZER)
+    
+    def sortino(self, risk_free_rate: float = 0.0) -> float:
+        """Annualized Sortino ratio of the window."""
+        if not self._returns:
+            return 0.0
+        
+        excess_returns = self._all.mean - (risk_free_rate / _TRADING_DAYS)
+        downside_std = self._downside.std()
+        if downside_std == 0:
+            return float('inf') if excess_returns > 0 else 0.0
+        
+        return float((excess_returns / downside_std) * _ANNUALIZER)
+
+
+class RunningDrawdown:
+    """
+    Running equity curve, peak and max drawdown over a stream of returns.
+    
+    Equity is tracked normalized to 1.0 (drawdowns are scale-free), so each
+    return is an O(1) update instead of a cumprod over the full history.
+    Matches the batch kernels: the peak starts at the first curve point.
+    """
+    
+    __slots__ = ("count", "equity", "peak", "max_drawdown")
+    
+    def __init__(self):
+        self.count = 0
+        self.equity = 1.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+    
+    def push(self, value: float) -> None:
+        """Compound a return into the curve."""
+        self.equity *= 1.0 + value
+        self.count += 1
+        
+        if self.count == 1 or self.equity > self.peak:
+            self.peak = self.equity
+        elif self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, 1.0 - self.equity / self.peak)
+    
+    @property
+    def current_drawdown(self) -> float:
+        """Current drawdown from peak (<= 0)."""
+        if self.count == 0 or self.peak <= 0:
+            return 0.0
+        return (self.equity - self.peak) / self.peak
 
 
 class MetricsCollector:
@@ -77,7 +194,20 @@ class MetricsCollector:
     
     def __init__(self):
         """Initialize metrics collector."""
-        self.metrics_history: list[PortfolioMetrics] = []
+        self.metrics_history: deque[PortfolioMetrics] = deque(maxlen=METRICS_HISTORY_SIZE)
+        
+        # Close-to-close daily returns derived from the ticks we observe,
+        # used when no returns_history is supplied
+        self.daily_returns = RollingReturnStats(window=30)
+        self.daily_drawdown = RunningDrawdown()
+        
+        # Highest equity observed and worst drawdown from it, updated per tick
+        self._equity_peak = 0.0
+        self._max_tick_drawdown = 0.0
+        self._last_day = None
+        self._last_equity: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        
         logger.info("metrics_collector_initialized")
     
     def calculate_metrics(
@@ -107,6 +237,15 @@ class MetricsCollector:
         Returns:
             PortfolioMetrics with all calculated metrics
         """
+        timestamp = datetime.now()
+        self._record_daily_close(timestamp, equity)
+        
+        # Scalar drawdown against the running peak: O(1), no equity curve
+        if equity > self._equity_peak:
+            self._equity_peak = equity
+        tick_drawdown = equity / self._equity_peak - 1.0 if self._equity_peak > 0 else 0.0
+        self._max_tick_drawdown = max(self._max_tick_drawdown, -tick_drawdown)
+        
         # Returns
         cumulative_return = (equity / initial_equity) - 1 if initial_equity > 0 else 0.0
         
@@ -124,19 +263,30 @@ class MetricsCollector:
         current_drawdown = None
         
         if returns_history is not None and len(returns_history) > 0:
+            # Convert once; the helpers below work on raw float64 arrays
+            returns = np.asarray(returns_history, dtype=np.float64)
+            
             # Rolling 30-day metrics
-            if len(returns_history) >= 30:
-                recent_returns = returns_history.tail(30)
+            if len(returns) >= 30:
+                recent_returns = returns[-30:]
                 sharpe_30d = self._calculate_sharpe(recent_returns)
                 sortino_30d = self._calculate_sortino(recent_returns)
             
             # Drawdown
-            equity_series = self._returns_to_equity(returns_history, initial_equity)
-            max_drawdown = self._calculate_max_drawdown(equity_series)
-            current_drawdown = self._calculate_current_drawdown(equity_series)
+            equity_curve = self._returns_to_equity(returns, initial_equity)
+            max_drawdown = self._calculate_max_drawdown(equity_curve)
+            current_drawdown = self._calculate_current_drawdown(equity_curve)
+        else:
+            # Incremental path: O(1) per tick from running state
+            if len(self.daily_returns) >= 30:
+                sharpe_30d = self.daily_returns.sharpe()
+                sortino_30d = self.daily_returns.sortino()
+            
+            current_drawdown = tick_drawdown
+            max_drawdown = max(self.daily_drawdown.max_drawdown, self._max_tick_drawdown)
         
         metrics = PortfolioMetrics(
-            timestamp=datetime.now(),
+            timestamp=timestamp,
             equity=equity,
             cash=cash,
             positions_value=positions_value,
@@ -151,76 +301,206 @@ class MetricsCollector:
             strategy_attribution=strategy_attribution or {},
         )
         
-        # Store in history
+        # Store in history (bounded deque drops the oldest)
         self.metrics_history.append(metrics)
         
-        # Keep only last 1000 metrics (prevent memory bloat)
-        if len(self.metrics_history) > 1000:
-            self.metrics_history = self.metrics_history[-1000:]
-        
         return metrics
     
-    def _calculate_sharpe(self, returns: pd.Series, risk_free_rate: float = 0.0) -> float:
+    def _record_daily_close(self, timestamp: datetime, equity: float) -> None:
+        """Push the previous day's close-to-close return on the first tick of a new day."""
+        day = timestamp.date()
+        if self._last_day is not None and day != self._last_day:
+            close = self._last_equity
+            if self._prev_close and self._prev_close > 0:
+                self._push_daily_return((close / self._prev_close) - 1)
+            self._prev_close = close
+        
+        self._last_day = day
+        self._last_equity = equity
+    
+    def _push_daily_return(self, value: float) -> None:
+        """Feed one daily return into the running risk state."""
+        self.daily_returns.push(value)
+        self.daily_drawdown.push(value)
+    
+    def seed_daily_returns(
+        self,
+        returns: np.ndarray | pd.Series,
+        last_close: Optional[float] = None,
+    ) -> None:
+        """
+        Warm the running risk state from stored daily returns.
+        
+        Call once on startup (e.g. with returns loaded from DuckDB) so the
+        incremental Sharpe/Sortino/drawdown are available immediately
+        instead of after 30 live days.
+        
+        Args:
+            returns: Daily returns, oldest first
+            last_close: Equity at the last stored close, used as the base
+                for the first live daily return
+        """
+        for value in np.asarray(returns, dtype=np.float64):
+            self._push_daily_return(float(value))
+        
+        if last_close is not None:
+            self._prev_close = last_close
+            
+            # Rescale the normalized running peak to account equity
+            curve = self.daily_drawdown
+            if curve.count and curve.equity > 0:
+                self._equity_peak = max(self._equity_peak, last_close * curve.peak / curve.equity)
+    
+    def _calculate_sharpe(self, returns: np.ndarray, risk_free_rate: float = 0.0) -> float:
         """Calculate Sharpe ratio."""
-        if len(returns) == 0 or returns.std() == 0:
+        if returns.size < 2:
             return 0.0
         
-        excess_returns = returns.mean() - (risk_free_rate / 252)
-        sharpe = (excess_returns / returns.std()) * np.sqrt(252)
+        std = returns.std(ddof=1)
+        if std == 0:
+            return 0.0
+        
+        excess_returns = returns.mean() - (risk_free_rate / _TRADING_DAYS)
+        sharpe = (excess_returns / std) * _ANNUALIZER
         
         return float(sharpe)
     
-    def _calculate_sortino(self, returns: pd.Series, risk_free_rate: float = 0.0) -> float:
+    def _calculate_sortino(self, returns: np.ndarray, risk_free_rate: float = 0.0) -> float:
         """Calculate Sortino ratio."""
-        if len(returns) == 0:
+        if returns.size == 0:
             return 0.0
         
-        excess_returns = returns.mean() - (risk_free_rate / 252)
+        excess_returns = returns.mean() - (risk_free_rate / _TRADING_DAYS)
         downside_returns = returns[returns < 0]
         
-        if len(downside_returns) == 0 or downside_returns.std() == 0:
+        # std(ddof=1) is undefined (NaN in pandas) for a single downside return
+        downside_std = downside_returns.std(ddof=1) if downside_returns.size > 1 else 0.0
+        if downside_std == 0:
             return float('inf') if excess_returns > 0 else 0.0
         
-        downside_std = downside_returns.std()
-        sortino = (excess_returns / downside_std) * np.sqrt(252)
+        sortino = (excess_returns / downside_std) * _ANNUALIZER
         
         return float(sortino)
     
-    def _calculate_max_drawdown(self, equity: pd.Series) -> float:
+    def _calculate_max_drawdown(self, equity: np.ndarray | pd.Series) -> float:
         """Calculate maximum drawdown."""
-        if len(equity) == 0:
+        equity = np.asarray(equity, dtype=np.float64)
+        if equity.size == 0:
             return 0.0
         
-        running_max = equity.expanding().max()
+        running_max = np.maximum.accumulate(equity)
         drawdown = (equity - running_max) / running_max
-        max_dd = abs(drawdown.min())
         
-        return float(max_dd)
+        return float(-drawdown.min())
     
-    def _calculate_current_drawdown(self, equity: pd.Series) -> float:
+    def _calculate_current_drawdown(self, equity: np.ndarray | pd.Series) -> float:
         """Calculate current drawdown from peak."""
-        if len(equity) == 0:
+        equity = np.asarray(equity, dtype=np.float64)
+        if equity.size == 0:
             return 0.0
         
         peak = equity.max()
-        current = equity.iloc[-1]
-        drawdown = (current - peak) / peak
+        drawdown = (equity[-1] - peak) / peak
         
         return float(drawdown)
     
-    def _returns_to_equity(self, returns: pd.Series, initial_equity: float) -> pd.Series:
-        """Convert returns series to equity series."""
-        equity = initial_equity * (1 + returns).cumprod()
-        return equity
+    def _returns_to_equity(self, returns: np.ndarray, initial_equity: float) -> np.ndarray:
+        """Convert returns array to equity curve."""
+        return initial_equity * np.cumprod(1.0 + returns)
     
     def get_latest_metrics(self) -> Optional[PortfolioMetrics]:
         """Get most recent metrics."""
         return self.metrics_history[-1] if self.metrics_history else None
     
     def get_metrics_history(self, days: int = 30) -> list[PortfolioMetrics]:
-        """Get metrics history for last N days."""
-        cutoff = datetime.now() - pd.Timedelta(days=days)
-        return [
-            m for m in self.metrics_history
-            if m.timestamp >= cutoff
-        ]
+        """Get metrics history for last N days (oldest first)."""
+        cutoff = datetime.now() - timedelta(days=days)
+        
+        # History is chronological; walk back from the newest and stop at cutoff
+        recent = []
+        for m in reversed(self.metrics_history):
+            if m.timestamp < cutoff:
+                break
+            recent.append(m)
+        
+        recent.reverse()
+        return recent
+
+
+class MetricsBuffer:
+    """
+    Batches performance snapshots before writing them to DuckDB.
+    
+    The performance table holds one row per day, and writing a single-row
+    INSERT on every metrics tick is the worst case for a column store.
+    Snapshots are written into preallocated per-column NumPy arrays (no
+    per-tick dict) and flushed as one DataFrame, coalesced per day (latest
+    wins), once `capacity` ticks have accumulated or
+    `flush_interval_seconds` have elapsed since the last flush.
+    
+    Call flush() on shutdown so the latest snapshot is not lost.
+    """
+    
+    def __init__(
+        self,
+        duckdb_store: Any,
+        capacity: int = 64,
+        flush_interval_seconds: float = 60.0,
+    ):
+        """
+        Initialize metrics buffer.
+        
+        Args:
+            duckdb_store: DuckDBStore providing insert_performance_frame()
+            capacity: Ticks to accumulate before flushing
+            flush_interval_seconds: Max seconds between flushes
+        """
+        self.duckdb = duckdb_store
+        self.capacity = capacity
+        self.flush_interval = flush_interval_seconds
+        
+        # Column buffers; rows [0, _size) are pending
+        self._dates = np.empty(capacity, dtype="datetime64[D]")
+        self._columns = {
+            name: np.empty(capacity, dtype=np.float64) for name in _BUFFER_FIELDS
+        }
+        self._attribution: list[Optional[dict]] = [None] * capacity
+        self._size = 0
+        self._last_flush = time.monotonic()
+    
+    def append(self, metrics: PortfolioMetrics) -> None:
+        """Buffer a snapshot, flushing if the size or time threshold is hit."""
+        i = self._size
+        self._dates[i] = metrics.timestamp.date()
+        for column, value in zip(self._columns.values(), _get_buffer_fields(metrics)):
+            column[i] = value  # None becomes NaN, stored as NULL
+        self._attribution[i] = metrics.strategy_attribution
+        self._size = i + 1
+        
+        if (
+            self._size >= self.capacity
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+    
+    def flush(self) -> int:
+        """
+        Write buffered snapshots to DuckDB.
+        
+        Returns:
+            Number of rows written
+        """
+        self._last_flush = time.monotonic()
+        
+        n = self._size
+        if n == 0:
+            return 0
+        self._size = 0
+        
+        frame = pd.DataFrame({
+            "date": self._dates[:n],
+            **{name: column[:n] for name, column in self._columns.items()},
+            "strategy_attribution": [json.dumps(a or {}) for a in self._attribution[:n]],
+        })
+        frame = frame.drop_duplicates("date", keep="last")
+        return self.duckdb.insert_performance_frame(frame)
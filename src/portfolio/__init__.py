@@ -8,6 +8,6 @@ Handles:
 """
 
 from src.portfolio.allocator import PortfolioAllocator
-from src.portfolio.correlation_matrix import CorrelationMatrix
+from src.portfolio.correlation_matrix import CorrelationMatrix, ReturnMatrix
 
-__all__ = ["PortfolioAllocator", "CorrelationMatrix"]
+__all__ = ["PortfolioAllocator", "CorrelationMatrix", "ReturnMatrix"]
@@ -47,6 +47,7 @@ class PortfolioAllocator:
         max_sector_pct: float = 30.0,
         target_volatility_pct: float = 15.0,
         correlation_lookback_days: int = 60,
+        return_empty_on_no_rebalance: bool = True,
     ):
         """
         Initialize portfolio allocator.
@@ -56,11 +57,14 @@ class PortfolioAllocator:
             max_sector_pct: Maximum sector exposure (% of portfolio)
             target_volatility_pct: Target portfolio volatility
             correlation_lookback_days: Days to calculate correlation
+            return_empty_on_no_rebalance: Have allocate() return [] when no
+                symbol moves past the rebalance threshold
         """
         self.max_position = max_position_pct / 100
         self.max_sector = max_sector_pct / 100
         self.target_volatility = target_volatility_pct / 100
         self.correlation_lookback = correlation_lookback_days
+        self.return_empty_on_no_rebalance = return_empty_on_no_rebalance
         
         logger.info(
             "portfolio_allocator_initialized",
@@ -86,7 +90,8 @@ class PortfolioAllocator:
             correlation_matrix: Correlation matrix (optional)
         
         Returns:
-            List of allocation results
+            List of allocation results (empty when nothing needs rebalancing
+            and return_empty_on_no_rebalance is set)
         """
         if not signals:
             return []
@@ -104,30 +109,35 @@ class PortfolioAllocator:
             portfolio_value=portfolio_value,
         )
         
-        # Generate allocation results
-        results = []
+        # Targets first, then symbols we only hold (to be closed out)
+        symbols = list(target_allocations | current_allocations)
+        target_pct = np.array(
+            [target_allocations.get(s, 0.0) for s in symbols], dtype=np.float64
+        )
+        current_pct = np.array(
+            [current_allocations.get(s, 0.0) for s in symbols], dtype=np.float64
+        )
         
-        for symbol in set(list(target_allocations.keys()) + list(current_allocations.keys())):
-            target_pct = target_allocations.get(symbol, 0.0)
-            current_pct = current_allocations.get(symbol, 0.0)
-            
-            target_dollars = target_pct * portfolio_value
-            current_dollars = current_pct * portfolio_value
-            
-            rebalance_needed = abs(target_pct - current_pct) > 0.01  # 1% threshold
-            rebalance_amount = target_dollars - current_dollars
-            
-            results.append(AllocationResult(
-                symbol=symbol,
-                target_size_pct=target_pct * 100,
-                target_size_dollars=target_dollars,
-                current_size_pct=current_pct * 100,
-                current_size_dollars=current_dollars,
-                rebalance_needed=rebalance_needed,
-                rebalance_amount=rebalance_amount,
-            ))
-        
-        return results
+        target_dollars = target_pct * portfolio_value
+        current_dollars = current_pct * portfolio_value
+        rebalance_needed = np.abs(target_pct - current_pct) > 0.01  # 1% threshold
+        if self.return_empty_on_no_rebalance and not rebalance_needed.any():
+            return []
+        
+        rebalance_amount = target_dollars - current_dollars
+        
+        return [
+            AllocationResult(*row)
+            for row in zip(
+                symbols,
+                (target_pct * 100).tolist(),
+                target_dollars.tolist(),
+                (current_pct * 100).tolist(),
+                current_dollars.tolist(),
+                rebalance_needed.tolist(),
+                rebalance_amount.tolist(),
+            )
+        ]
     
     def _calculate_target_allocations(
         self,
@@ -183,24 +193,34 @@ class PortfolioAllocator:
         """
         Adjust allocations to account for correlation.
         
-        Reduces allocation to highly correlated positions.
+        Reduces allocation to highly correlated positions: every pair with
+        |correlation| > 0.7 scales both positions by (1 - 0.5 * excess).
+        Evaluated as one NumPy pass over the matrix gathered by position;
+        pairs whose symbols are missing from the matrix are left alone.
         """
-        adjusted = allocations.copy()
+        if correlation_matrix.empty:
+            return dict(allocations)
         
         symbols = list(allocations.keys())
+        weights = np.fromiter(allocations.values(), dtype=np.float64, count=len(symbols))
+        
+        # Pair (i, j), i < j, reads correlation_matrix.loc[symbol_i, symbol_j];
+        # symbol -> position lookup tables (-1 if missing) replace label access
+        row_lut = dict(zip(correlation_matrix.index.tolist(), range(len(correlation_matrix))))
+        col_lut = dict(zip(correlation_matrix.columns.tolist(), range(correlation_matrix.shape[1])))
+        rows = np.array([row_lut.get(s, -1) for s in symbols])
+        cols = np.array([col_lut.get(s, -1) for s in symbols])
+        corr = correlation_matrix.to_numpy(dtype=np.float64)[np.ix_(rows, cols)]
+        corr[rows < 0, :] = np.nan
+        corr[:, cols < 0] = np.nan
+        
+        excess = np.clip(np.abs(corr) - 0.7, 0.0, None)
+        reduction = np.triu(np.nan_to_num(excess, nan=0.0), k=1) * 0.5
+        
+        # Each pair reduces both sides
+        factors = np.prod(1.0 - (reduction + reduction.T), axis=1)
         
-        for i, symbol1 in enumerate(symbols):
-            for symbol2 in symbols[i+1:]:
-                if symbol1 in correlation_matrix.index and symbol2 in correlation_matrix.columns:
-                    correlation = correlation_matrix.loc[symbol1, symbol2]
-                    
-                    # If highly correlated, reduce both positions
-                    if abs(correlation) > 0.7:
-                        reduction = abs(correlation) - 0.7  # Reduce by excess correlation
-                        adjusted[symbol1] *= (1 - reduction * 0.5)
-                        adjusted[symbol2] *= (1 - reduction * 0.5)
-        
-        return adjusted
+        return dict(zip(symbols, (weights * factors).tolist()))
     
     def _calculate_current_allocations(
         self,
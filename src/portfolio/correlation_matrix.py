@@ -5,6 +5,7 @@ Calculates correlation between assets for portfolio allocation.
 High correlation = redundant positions = reduce allocation.
 """
 
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Optional
 import structlog
@@ -15,6 +16,152 @@ import numpy as np
 logger = structlog.get_logger(__name__)
 
 
+def _corr_kernel(values: np.ndarray) -> np.ndarray:
+    """
+    Correlation of a NaN-free (T, N) returns array.
+    
+    Columns are centered and scaled to unit sample std, so X.T @ X / (T-1)
+    is the correlation matrix (one BLAS call instead of per-pair column
+    reductions). For tall inputs (T > 4N) the covariance is taken post hoc
+    from the Gram matrix, X.T @ X - T * mean mean.T, which skips the
+    centered (T, N) copy; daily returns are small and well conditioned, so
+    the cancellation is harmless. Constant columns correlate as NaN, like
+    pandas; the diagonal is always 1.0.
+    """
+    n, k = values.shape
+    constant = values.max(axis=0) == values.min(axis=0)
+    has_constant = bool(constant.any())
+    
+    # Small universes are dominated by per-call overhead rather than FLOPs,
+    # so everything after the product works in place on the (N, N) result.
+    if n > 4 * k:
+        mean = values.sum(axis=0) / n
+        correlation = values.T @ values
+        correlation -= n * np.outer(mean, mean)
+        correlation /= n - 1
+        std = np.sqrt(np.maximum(correlation.diagonal(), 0.0))
+        if has_constant:
+            std[constant] = 1.0
+        correlation /= std
+        correlation /= std[:, None]
+    else:
+        centered = values - values.sum(axis=0) / n
+        std = np.sqrt(np.einsum("ij,ij->j", centered, centered) / (n - 1))
+        if has_constant:
+            std[constant] = 1.0
+        centered /= std
+        correlation = centered.T @ centered
+        correlation /= n - 1
+    
+    np.clip(correlation, -1.0, 1.0, out=correlation)
+    if has_constant:
+        correlation[constant, :] = np.nan
+        correlation[:, constant] = np.nan
+    np.fill_diagonal(correlation, 1.0)
+    
+    return correlation
+
+
+def _ledoit_wolf_intensity(values: np.ndarray) -> float:
+    """
+    Closed-form Ledoit-Wolf shrinkage intensity toward the identity.
+    
+    Computed on the standardized returns, whose sample covariance is the
+    correlation matrix (unit diagonal, so the scaled-identity target is I).
+    
+    Args:
+        values: NaN-free (T, N) returns
+    
+    Returns:
+        Shrinkage intensity in [0, 1]
+    """
+    n, k = values.shape
+    if n < 2 or k < 2:
+        return 0.0
+    
+    std = values.std(axis=0)
+    std[~(std > 0)] = 1.0
+    z = (values - values.mean(axis=0)) / std
+    sample = (z.T @ z) / n
+    
+    off_diagonal = sample - np.eye(k)
+    d2 = np.einsum("ij,ij->", off_diagonal, off_diagonal) / k
+    if d2 <= 0:
+        return 0.0
+    
+    # Mean squared distance of each z_t z_t' from the sample matrix,
+    # using sum_t ||z_t z_t' - S||^2 = sum_t ||z_t||^4 - T ||S||^2
+    row_norms = np.einsum("ij,ij->i", z, z)
+    b2 = (np.dot(row_norms, row_norms) / n - np.einsum("ij,ij->", sample, sample)) / (n * k)
+    
+    return float(min(max(b2, 0.0), d2) / d2)
+
+
+class ReturnMatrix:
+    """
+    Rolling (T, N) matrix of close-to-close returns for a fixed universe.
+    
+    Returns are kept in one column-major float64 array with a symbol side
+    table, so correlation can run on it directly without building a
+    DataFrame per symbol. Rows are appended one bar at a time; the buffer
+    holds 2 * capacity rows and compacts only when it fills, so appends are
+    amortized O(N).
+    """
+    
+    def __init__(self, symbols: list[str], capacity: int = 60):
+        """
+        Initialize return matrix.
+        
+        Args:
+            symbols: Universe, in column order
+            capacity: Number of most recent return rows retained
+        """
+        self.symbols = list(symbols)
+        self.capacity = capacity
+        
+        self._buf = np.empty((2 * capacity, len(self.symbols)), dtype=np.float64, order="F")
+        self._start = 0
+        self._end = 0
+        self._last_close = np.full(len(self.symbols), np.nan)
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    @property
+    def data(self) -> np.ndarray:
+        """View of the retained returns, oldest row first (may contain NaN)."""
+        return self._buf[self._start:self._end]
+    
+    def append_bar(self, closes: dict[str, float]) -> None:
+        """
+        Append one bar of closing prices.
+        
+        Symbols missing from `closes` get a NaN return for this bar and the
+        next one. The first bar only seeds the previous closes.
+        
+        Args:
+            closes: Symbol -> close price for this bar
+        """
+        prices = np.array([closes.get(s, np.nan) for s in self.symbols], dtype=np.float64)
+        returns = prices / self._last_close - 1.0
+        seeded = not np.isnan(self._last_close).all()
+        self._last_close = prices
+        
+        if not seeded:
+            return
+        
+        if self._end == len(self._buf):
+            # Compact: move the retained rows to the front
+            keep = self.capacity - 1
+            self._buf[:keep] = self._buf[self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        
+        self._buf[self._end] = returns
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+
+
 class CorrelationMatrix:
     """
     Calculates and maintains correlation matrix for portfolio.
@@ -27,6 +174,7 @@ class CorrelationMatrix:
         self,
         lookback_days: int = 60,
         min_data_points: int = 30,
+        shrinkage: Optional[float | str] = None,
     ):
         """
         Initialize correlation calculator.
@@ -34,14 +182,31 @@ class CorrelationMatrix:
         Args:
             lookback_days: Days to look back for correlation
             min_data_points: Minimum data points required
+            shrinkage: Shrink correlations toward the identity, which
+                stabilizes them when the lookback is short relative to the
+                number of symbols. "auto" uses the Ledoit-Wolf intensity; a
+                float in [0, 1] is used as is; None disables shrinkage.
         """
+        if shrinkage is not None and shrinkage != "auto" and not 0.0 <= shrinkage <= 1.0:
+            raise ValueError(f"shrinkage must be None, 'auto' or in [0, 1], got {shrinkage!r}")
+        
         self.lookback_days = lookback_days
         self.min_data_points = min_data_points
+        self.shrinkage = shrinkage
+        
+        # Rolling window state for update()/current_matrix(): running sum
+        # and outer-product sum of the last lookback_days return rows
+        self._symbols: list[str] = []
+        self._window: deque[np.ndarray] = deque()
+        self._sum = np.zeros(0)
+        self._outer = np.zeros((0, 0))
+        self._updates_since_resync = 0
         
         logger.info(
             "correlation_matrix_initialized",
             lookback_days=lookback_days,
             min_data_points=min_data_points,
+            shrinkage=shrinkage,
         )
     
     def calculate_correlation(
@@ -60,11 +225,16 @@ class CorrelationMatrix:
         if returns_data.empty:
             return pd.DataFrame()
         
-        # Calculate correlation
-        correlation = returns_data.corr()
-        
-        # Fill diagonal with 1.0 (asset perfectly correlated with itself)
-        np.fill_diagonal(correlation.values, 1.0)
+        if returns_data.isna().to_numpy().any():
+            # Missing values need pandas' pairwise-complete handling
+            values = returns_data.corr().to_numpy(dtype=np.float64, copy=True)
+            np.fill_diagonal(values, 1.0)
+            values = self._shrink(values, returns_data.dropna().to_numpy(dtype=np.float64))
+            correlation = pd.DataFrame(
+                values, index=returns_data.columns, columns=returns_data.columns
+            )
+        else:
+            correlation = self._fast_corr(returns_data)
         
         logger.debug(
             "correlation_calculated",
@@ -73,46 +243,216 @@ class CorrelationMatrix:
         
         return correlation
     
+    def _fast_corr(self, returns_data: pd.DataFrame) -> pd.DataFrame:
+        """Correlation of NaN-free returns via a single matrix product."""
+        values = returns_data.to_numpy(dtype=np.float64)
+        correlation = self._shrink(_corr_kernel(values), values)
+        
+        return pd.DataFrame(
+            correlation, index=returns_data.columns, columns=returns_data.columns
+        )
+    
     def calculate_from_bars(
         self,
-        bars_by_symbol: dict[str, pd.DataFrame],
+        bars_by_symbol: dict[str, pd.DataFrame] | ReturnMatrix,
     ) -> pd.DataFrame:
         """
         Calculate correlation from bar data.
         
         Args:
-            bars_by_symbol: Dict mapping symbol to DataFrame with close prices
+            bars_by_symbol: Dict mapping symbol to DataFrame with close prices,
+                or a ReturnMatrix (used directly, no per-symbol DataFrames)
         
         Returns:
             Correlation matrix
         """
-        # Convert to returns
-        returns_data = {}
+        if isinstance(bars_by_symbol, ReturnMatrix):
+            return self._calculate_from_return_matrix(bars_by_symbol)
+        
+        symbols, closes = self._aligned_closes(bars_by_symbol)
+        
+        if not symbols:
+            logger.warning("insufficient_data_for_correlation")
+            return pd.DataFrame()
+        
+        # Same-horizon returns on the shared time axis; a missing close
+        # invalidates the rows on both sides of it
+        returns = np.diff(closes, axis=0) / closes[:-1]
+        
+        return self._correlation_of_returns(returns, symbols)
+    
+    def _aligned_closes(
+        self,
+        bars_by_symbol: dict[str, pd.DataFrame],
+    ) -> tuple[list[str], np.ndarray]:
+        """
+        Scatter per-symbol closes onto one sorted timestamp axis.
+        
+        Bars are keyed by their `timestamp` column when present, otherwise
+        by index. Symbols with fewer than min_data_points returns are left
+        out.
+        
+        Returns:
+            (symbols, closes) with closes shaped (T, N), NaN where a symbol
+            has no bar
+        """
+        symbols = []
+        stamps = []
+        prices = []
         
         for symbol, bars in bars_by_symbol.items():
             if "close" not in bars.columns:
                 continue
             
-            # Calculate returns
-            returns = bars["close"].pct_change().dropna()
+            close = bars["close"].to_numpy(dtype=np.float64)
+            if np.count_nonzero(~np.isnan(close)) - 1 < self.min_data_points:
+                continue
             
-            if len(returns) >= self.min_data_points:
-                returns_data[symbol] = returns
+            if "timestamp" in bars.columns:
+                stamps.append(bars["timestamp"].to_numpy())
+            else:
+                stamps.append(bars.index.to_numpy())
+            symbols.append(symbol)
+            prices.append(close)
         
-        if not returns_data:
-            logger.warning("insufficient_data_for_correlation")
-            return pd.DataFrame()
+        if not symbols:
+            return [], np.empty((0, 0))
+        
+        axis = np.unique(np.concatenate(stamps))
+        closes = np.full((len(axis), len(symbols)), np.nan)
+        for j, (stamp, close) in enumerate(zip(stamps, prices)):
+            closes[np.searchsorted(axis, stamp), j] = close
         
-        # Align by date
-        returns_df = pd.DataFrame(returns_data)
-        returns_df = returns_df.dropna()  # Remove rows with missing data
+        return symbols, closes
+    
+    def _calculate_from_return_matrix(self, matrix: ReturnMatrix) -> pd.DataFrame:
+        """Correlation over the complete rows of a ReturnMatrix."""
+        return self._correlation_of_returns(matrix.data, matrix.symbols)
+    
+    def _correlation_of_returns(
+        self,
+        returns: np.ndarray,
+        symbols: list[str],
+    ) -> pd.DataFrame:
+        """Correlation over the rows of a (T, N) returns array with no NaN."""
+        returns = returns[~np.isnan(returns).any(axis=1)]
         
-        if len(returns_df) < self.min_data_points:
+        if len(returns) < max(self.min_data_points, 2):
             logger.warning("insufficient_aligned_data_for_correlation")
             return pd.DataFrame()
         
-        # Calculate correlation
-        return self.calculate_correlation(returns_df)
+        correlation = self._shrink(_corr_kernel(returns), returns)
+        
+        logger.debug("correlation_calculated", symbols=len(symbols))
+        
+        return pd.DataFrame(correlation, index=symbols, columns=symbols)
+    
+    def update(
+        self,
+        returns_row: np.ndarray | pd.Series,
+        symbols: Optional[list[str]] = None,
+    ) -> None:
+        """
+        Add one bar of returns to the rolling window (O(N^2) per bar).
+        
+        The outer-product sum gets a rank-1 update for the new row and a
+        rank-1 downdate for the row leaving the window, so the matrix is
+        never recomputed from the full lookback. The window restarts when
+        the symbol set changes.
+        
+        Args:
+            returns_row: One return per symbol (a Series supplies symbols)
+            symbols: Symbol order of returns_row when it is an ndarray
+        """
+        if symbols is None and isinstance(returns_row, pd.Series):
+            symbols = list(returns_row.index)
+        if symbols is not None and symbols != self._symbols:
+            self._reset_window(symbols)
+        
+        row = np.asarray(returns_row, dtype=np.float64)
+        if row.shape != self._sum.shape:
+            raise ValueError(f"expected {len(self._symbols)} returns, got {row.shape}")
+        if np.isnan(row).any():
+            return  # Same as dropping incomplete rows in calculate_from_bars
+        
+        if len(self._window) == self.lookback_days:
+            old = self._window.popleft()
+            self._sum -= old
+            self._outer -= np.outer(old, old)
+        
+        self._window.append(row)
+        self._sum += row
+        self._outer += np.outer(row, row)
+        
+        # Periodically rebuild the sums to stop floating-point drift
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.lookback_days:
+            window = np.array(self._window)
+            self._sum = window.sum(axis=0)
+            self._outer = window.T @ window
+            self._updates_since_resync = 0
+    
+    def current_matrix(self) -> pd.DataFrame:
+        """
+        Correlation matrix of the rolling window built by update().
+        
+        Returns:
+            Correlation matrix, or an empty DataFrame with too little data
+        """
+        n = len(self._window)
+        if n < max(self.min_data_points, 2):
+            return pd.DataFrame()
+        
+        mean = self._sum / n
+        cov = (self._outer - n * np.outer(mean, mean)) / (n - 1)
+        
+        variance = np.diag(cov).copy()
+        constant = ~(variance > 0)
+        variance[constant] = 1.0
+        inv_std = 1.0 / np.sqrt(variance)
+        
+        correlation = np.clip(cov * np.outer(inv_std, inv_std), -1.0, 1.0)
+        correlation[constant, :] = np.nan
+        correlation[:, constant] = np.nan
+        np.fill_diagonal(correlation, 1.0)
+        correlation = self._shrink(correlation, self._window)
+        
+        return pd.DataFrame(correlation, index=self._symbols, columns=self._symbols)
+    
+    def _shrink(self, correlation: np.ndarray, returns) -> np.ndarray:
+        """
+        Apply the configured shrinkage toward the identity in place.
+        
+        Args:
+            correlation: (N, N) correlation matrix
+            returns: NaN-free return rows it was estimated from (only read
+                for "auto")
+        
+        Returns:
+            Shrunk correlation matrix
+        """
+        if self.shrinkage is None:
+            return correlation
+        
+        if self.shrinkage == "auto":
+            delta = _ledoit_wolf_intensity(np.asarray(returns, dtype=np.float64))
+        else:
+            delta = float(self.shrinkage)
+        
+        if delta > 0:
+            correlation *= 1.0 - delta
+            np.fill_diagonal(correlation, 1.0)
+        
+        return correlation
+    
+    def _reset_window(self, symbols: list[str]) -> None:
+        """Start an empty rolling window for a new symbol set."""
+        n = len(symbols)
+        self._symbols = list(symbols)
+        self._window.clear()
+        self._sum = np.zeros(n)
+        self._outer = np.zeros((n, n))
+        self._updates_since_resync = 0
     
     def get_correlation(
         self,
@@ -148,13 +488,13 @@ class CorrelationMatrix:
         if correlation_matrix.empty:
             return []
         
-        highly_correlated = []
+        values = correlation_matrix.to_numpy(dtype=np.float64)
         
-        for i, symbol1 in enumerate(correlation_matrix.index):
-            for symbol2 in correlation_matrix.columns[i+1:]:
-                corr = correlation_matrix.loc[symbol1, symbol2]
-                
-                if abs(corr) >= threshold:
-                    highly_correlated.append((symbol1, symbol2, corr))
+        # Upper triangle only (each pair once, no diagonal), row-major order
+        rows, cols = np.nonzero(np.triu(np.abs(values) >= threshold, k=1))
         
-        return highly_correlated
+        return list(zip(
+            correlation_matrix.index[rows].tolist(),
+            correlation_matrix.columns[cols].tolist(),
+            values[rows, cols].tolist(),
+        ))
@@ -8,17 +8,166 @@ This prevents the "lag mismatch" problem where a flash crash
 blows through positions before the slow detector responds.
 """
 
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Optional
+import math
 import structlog
 
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.utils.rolling import RollingMoments
 
 logger = structlog.get_logger(__name__)
 
+# Annualization factor for daily volatility
+_ANNUALIZER = math.sqrt(252.0)
+
+# Regime results memoized per (symbol, last bar, bar count, last close)
+REGIME_CACHE_SIZE = 1024
+
+
+def _close_returns(close: np.ndarray) -> np.ndarray:
+    """Close-to-close returns, skipping those undefined by missing closes."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = close[1:] / close[:-1] - 1.0
+    
+    return returns[~np.isnan(returns)]
+
+
+def _sma(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing simple moving average via a running sum.
+    
+    Equivalent to pd.Series(values).rolling(window).mean() without the
+    leading NaNs: element i is the mean of values[i:i + window]. Windows
+    containing NaN are NaN, like pandas.
+    
+    Returns:
+        Array of length len(values) - window + 1 (empty if shorter)
+    """
+    if len(values) < window:
+        return np.empty(0)
+    
+    missing = np.isnan(values)
+    totals = np.concatenate(([0.0], np.cumsum(np.where(missing, 0.0, values))))
+    sma = (totals[window:] - totals[:-window]) / window
+    
+    if missing.any():
+        counts = np.concatenate(([0], np.cumsum(missing)))
+        sma[(counts[window:] - counts[:-window]) > 0] = np.nan
+    
+    return sma
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    True range per bar, using shifted views for the previous close.
+    
+    The first bar has no previous close, so its range is just high - low.
+    """
+    true_range = np.empty(len(close))
+    true_range[0] = high[0] - low[0]
+    
+    prev_close = close[:-1]
+    cur_high = high[1:]
+    cur_low = low[1:]
+    np.maximum(
+        cur_high - cur_low,
+        np.maximum(np.abs(cur_high - prev_close), np.abs(cur_low - prev_close)),
+        out=true_range[1:],
+    )
+    
+    return true_range
+
+
+def _adx_tr_kernel(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    period: int,
+    fast_window: int,
+) -> tuple[float, float]:
+    """
+    Fast ATR and ADX in a single pass over the tail of the bars.
+    
+    Scalar equivalent of _calculate_fast_volatility + _calculate_adx: the
+    last ADX value only depends on the last 2 * period - 1 bars and the fast
+    ATR on the last fast_window, so only that tail is walked. True range and
+    directional movement are computed once per bar from the previous bar
+    (no shifted copies) and the period sums are slid in place.
+    
+    Args:
+        high: High prices
+        low: Low prices
+        close: Close prices
+        period: ADX period
+        fast_window: Fast ATR window
+    
+    Returns:
+        (fast ATR, ADX); ATR is NaN with fewer than fast_window bars,
+        ADX is 0.0 when undefined
+    """
+    n = len(close)
+    first = max(n - max(2 * period - 1, fast_window), 0)
+    base = max(first - 1, 0)
+    h = high[base:].tolist()
+    l = low[base:].tolist()
+    c = close[base:].tolist()
+    
+    tr = []
+    plus_dm = []
+    minus_dm = []
+    if first == 0:
+        tr.append(h[0] - l[0])
+        plus_dm.append(0.0)
+        minus_dm.append(0.0)
+    
+    for i in range(1, len(c)):
+        hi = h[i]
+        lo = l[i]
+        prev_close = c[i - 1]
+        tr.append(max(hi - lo, abs(hi - prev_close), abs(lo - prev_close)))
+        
+        up = hi - h[i - 1]
+        down = l[i - 1] - lo
+        plus = up if up > down and up > 0 else 0.0
+        plus_dm.append(plus)
+        minus_dm.append(down if down > plus and down > 0 else 0.0)
+    
+    m = len(tr)
+    atr_fast = sum(tr[m - fast_window:]) / fast_window if m >= fast_window else math.nan
+    
+    if m < 2 * period - 1:
+        return atr_fast, 0.0
+    
+    # Slide the period sums over the last `period` DX windows. DI+/DI- share
+    # the ATR denominator, so DX only needs the DM sums (plus ATR > 0).
+    start = m - 2 * period + 1
+    sum_plus = sum(plus_dm[start:start + period])
+    sum_minus = sum(minus_dm[start:start + period])
+    sum_tr = sum(tr[start:start + period])
+    dx_total = 0.0
+    
+    for k in range(start + period - 1, m):
+        if k >= start + period:
+            sum_plus += plus_dm[k] - plus_dm[k - period]
+            sum_minus += minus_dm[k] - minus_dm[k - period]
+            sum_tr += tr[k] - tr[k - period]
+        
+        denominator = sum_plus + sum_minus
+        if sum_tr == 0 or denominator == 0:
+            return atr_fast, 0.0
+        dx_total += 100.0 * abs(sum_plus - sum_minus) / denominator
+    
+    adx = dx_total / period
+    
+    return atr_fast, (0.0 if math.isnan(adx) else adx)
+
 
 class TrendRegime(Enum):
     """Trend strength classification."""
@@ -128,6 +277,15 @@ class RegimeDetector:
         self.adx_trending = adx_trending_threshold
         self.adx_choppy = adx_choppy_threshold
         
+        # LRU of results for bar histories that have not advanced
+        self._cache: OrderedDict[tuple, MarketRegime] = OrderedDict()
+        
+        # Sorted rolling-vol history per symbol, keyed by the bar history
+        self._vol_hist_cache: dict[Optional[str], tuple[tuple, np.ndarray]] = {}
+        
+        # Streamed returns per symbol for update_return()/streaming_slow_vol()
+        self._vol_state: dict[Optional[str], tuple[deque[float], RollingMoments]] = {}
+        
         logger.info(
             "regime_detector_initialized",
             fast_window=fast_window_days,
@@ -166,10 +324,49 @@ class RegimeDetector:
                 position_scale=0.5,
             )
         
-        # Calculate indicators
-        fast_vol = self._calculate_fast_volatility(bars)
-        slow_vol = self._calculate_slow_volatility(bars)
-        adx = self._calculate_adx(bars)
+        key = self._cache_key(bars, symbol)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        
+        regime = self._compute_regime(bars, symbol, key)
+        
+        self._cache[key] = regime
+        if len(self._cache) > REGIME_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        
+        return regime
+    
+    @staticmethod
+    def _cache_key(bars: pd.DataFrame, symbol: Optional[str]) -> tuple:
+        """
+        Identify a bar history by its last bar.
+        
+        The last close is included so a still-forming bar that gets updated
+        in place is not served from the cache.
+        """
+        if "timestamp" in bars.columns:
+            last_bar = bars["timestamp"].iloc[-1]
+        else:
+            last_bar = bars.index[-1]
+        
+        return (symbol, last_bar, len(bars), float(bars["close"].iloc[-1]))
+    
+    def _compute_regime(
+        self,
+        bars: pd.DataFrame,
+        symbol: Optional[str],
+        history_key: Optional[tuple] = None,
+    ) -> MarketRegime:
+        """Classify regime from bars with enough history (uncached)."""
+        # One pandas extraction; the helpers work on the float64 columns
+        prices = bars[["high", "low", "close"]].to_numpy(dtype=np.float64)
+        high, low, close = prices[:, 0], prices[:, 1], prices[:, 2]
+        
+        # Calculate indicators (fast ATR and ADX share one pass)
+        fast_vol, adx = _adx_tr_kernel(high, low, close, self.adx_period, self.fast_window)
+        slow_vol = self._calculate_slow_volatility(close)
         
         # Check for crisis override (Gemini's recommendation)
         vol_ratio = fast_vol / slow_vol if slow_vol > 0 else 1.0
@@ -198,7 +395,7 @@ class RegimeDetector:
             )
         
         # Normal regime detection
-        vol_percentile = self._calculate_vol_percentile(bars, slow_vol)
+        vol_percentile = self._calculate_vol_percentile(close, slow_vol, symbol, history_key)
         trend_regime = self._classify_trend(adx)
         vol_regime = self._classify_volatility(vol_percentile)
         
@@ -221,80 +418,133 @@ class RegimeDetector:
             position_scale=position_scale,
         )
     
-    def _calculate_fast_volatility(self, bars: pd.DataFrame) -> float:
+    def _calculate_fast_volatility(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+    ) -> float:
         """
         Calculate fast volatility using ATR (Average True Range).
         
         This is the 3-day ATR that catches crises immediately.
         """
-        # Calculate True Range
-        high = bars["high"].values
-        low = bars["low"].values
-        close = bars["close"].values
-        
-        tr1 = high - low
-        tr2 = np.abs(high - np.roll(close, 1))
-        tr3 = np.abs(low - np.roll(close, 1))
-        
-        true_range = np.maximum(tr1, np.maximum(tr2, tr3))
-        true_range[0] = tr1[0]  # First value is just high - low
+        true_range = _true_range(high, low, close)
         
         # Calculate ATR over fast window
-        atr = pd.Series(true_range).rolling(window=self.fast_window).mean().iloc[-1]
+        atr = _sma(true_range[-self.fast_window:], self.fast_window)
         
-        return float(atr)
+        return float(atr[-1]) if len(atr) else float("nan")
     
-    def _calculate_slow_volatility(self, bars: pd.DataFrame) -> float:
+    def _calculate_slow_volatility(self, close: np.ndarray) -> float:
         """
         Calculate slow volatility using realized volatility.
         
         This is the 20-day realized volatility for trend context.
         """
         # Calculate returns
-        returns = bars["close"].pct_change().dropna()
+        returns = _close_returns(close)
         
         # Realized volatility (annualized)
         if len(returns) < self.slow_window:
             return 0.0
         
-        realized_vol = returns.tail(self.slow_window).std() * np.sqrt(252)  # Annualized
+        realized_vol = returns[-self.slow_window:].std(ddof=1) * _ANNUALIZER  # Annualized
         
         return float(realized_vol)
     
+    def update_return(self, symbol: Optional[str], value: float) -> float:
+        """
+        Stream one close-to-close return for a symbol.
+        
+        Maintains the slow-window moments incrementally, so a real-time feed
+        gets the slow vol in O(1) per bar instead of re-reducing the window.
+        
+        Args:
+            symbol: Symbol the return belongs to (None for market-wide)
+            value: Close-to-close return of the newest bar
+        
+        Returns:
+            Updated slow volatility (see streaming_slow_vol)
+        """
+        state = self._vol_state.get(symbol)
+        if state is None:
+            state = self._vol_state[symbol] = (deque(), RollingMoments())
+        window, moments = state
+        
+        if len(window) == self.slow_window:
+            moments.remove(window.popleft())
+        window.append(value)
+        moments.add(value)
+        
+        return self.streaming_slow_vol(symbol)
+    
+    def streaming_slow_vol(self, symbol: Optional[str]) -> float:
+        """
+        Annualized slow volatility of the streamed returns.
+        
+        Same value as _calculate_slow_volatility over the last slow_window
+        returns; 0.0 until a full window has been streamed.
+        """
+        state = self._vol_state.get(symbol)
+        if state is None or len(state[0]) < self.slow_window:
+            return 0.0
+        
+        return state[1].std() * _ANNUALIZER
+    
     def _calculate_vol_percentile(
         self,
-        bars: pd.DataFrame,
+        close: np.ndarray,
         current_vol: float,
+        symbol: Optional[str] = None,
+        history_key: Optional[tuple] = None,
     ) -> float:
         """
         Calculate current volatility percentile.
         
-        This determines if we're in a low/normal/high vol regime.
+        This determines if we're in a low/normal/high vol regime. When a
+        history key is given, the sorted rolling-vol history is cached per
+        symbol until the bars change, so repeat lookups are a binary search.
         """
-        # Calculate historical volatility values
-        returns = bars["close"].pct_change().dropna()
+        cached = self._vol_hist_cache.get(symbol)
         
-        if len(returns) < self.slow_percentile_lookback:
+        if history_key is not None and cached is not None and cached[0] == history_key:
+            sorted_vol = cached[1]
+        else:
+            sorted_vol = self._sorted_rolling_vol(close)
+            if history_key is not None:
+                self._vol_hist_cache[symbol] = (history_key, sorted_vol)
+        
+        if sorted_vol is None:
             return 50.0  # Default to median if insufficient data
         
-        # Calculate rolling realized vol
-        rolling_vol = (
-            returns
-            .rolling(window=self.slow_window)
-            .std()
-            .dropna()
-            * np.sqrt(252)  # Annualized
-        )
+        # Fraction of history strictly below the current vol
+        below = np.searchsorted(sorted_vol, current_vol, side="left")
+        percentile = below / len(sorted_vol) * 100
         
-        if len(rolling_vol) == 0:
-            return 50.0
+        return float(percentile)
+    
+    def _sorted_rolling_vol(self, close: np.ndarray) -> Optional[np.ndarray]:
+        """Sorted annualized rolling realized vol, or None if too little history."""
+        # Calculate historical volatility values
+        returns = _close_returns(close)
         
-        # Calculate percentile
-        percentile = (rolling_vol < current_vol).sum() / len(rolling_vol) * 100
+        if len(returns) < self.slow_percentile_lookback or len(returns) < self.slow_window:
+            return None
         
-        return float(percentile)
+        # Calculate rolling realized vol (same reduction as the slow vol, so
+        # the current window never counts as strictly below itself)
+        windows = sliding_window_view(returns, self.slow_window)
+        rolling_vol = windows.std(axis=1, ddof=1) * _ANNUALIZER  # Annualized
+        
+        return np.sort(rolling_vol)
     
-    def _calculate_adx(self, bars: pd.DataFrame) -> float:
+    def _calculate_adx(
+        self,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+    ) -> float:
         """
         Calculate ADX (Average Directional Index).
         
@@ -302,45 +552,37 @@ class RegimeDetector:
         High ADX = strong trend (momentum strategies work)
         Low ADX = choppy market (momentum strategies fail)
         """
-        high = bars["high"].values
-        low = bars["low"].values
-        close = bars["close"].values
-        
-        # Calculate +DM and -DM
-        plus_dm = high - np.roll(high, 1)
-        minus_dm = np.roll(low, 1) - low
-        
-        plus_dm[0] = 0
-        minus_dm[0] = 0
+        # Calculate +DM and -DM against the previous bar (first bar is 0)
+        plus_dm = np.zeros(len(high))
+        minus_dm = np.zeros(len(low))
+        np.subtract(high[1:], high[:-1], out=plus_dm[1:])
+        np.subtract(low[:-1], low[1:], out=minus_dm[1:])
         
         # Only count if one is positive and larger
         plus_dm = np.where((plus_dm > minus_dm) & (plus_dm > 0), plus_dm, 0)
         minus_dm = np.where((minus_dm > plus_dm) & (minus_dm > 0), minus_dm, 0)
         
         # Calculate True Range (same as ATR)
-        tr1 = high - low
-        tr2 = np.abs(high - np.roll(close, 1))
-        tr3 = np.abs(low - np.roll(close, 1))
-        true_range = np.maximum(tr1, np.maximum(tr2, tr3))
-        true_range[0] = tr1[0]
+        true_range = _true_range(high, low, close)
         
         # Smooth +DM, -DM, and TR
         period = self.adx_period
-        plus_di = pd.Series(plus_dm).rolling(window=period).mean()
-        minus_di = pd.Series(minus_dm).rolling(window=period).mean()
-        atr = pd.Series(true_range).rolling(window=period).mean()
-        
-        # Calculate DI+ and DI-
-        plus_di_pct = (plus_di / atr) * 100
-        minus_di_pct = (minus_di / atr) * 100
-        
-        # Calculate DX
-        dx = 100 * np.abs(plus_di_pct - minus_di_pct) / (plus_di_pct + minus_di_pct)
+        plus_di = _sma(plus_dm, period)
+        minus_di = _sma(minus_dm, period)
+        atr = _sma(true_range, period)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Calculate DI+ and DI-
+            plus_di_pct = (plus_di / atr) * 100
+            minus_di_pct = (minus_di / atr) * 100
+            
+            # Calculate DX
+            dx = 100 * np.abs(plus_di_pct - minus_di_pct) / (plus_di_pct + minus_di_pct)
         
         # Calculate ADX (smoothed DX)
-        adx = dx.rolling(window=period).mean().iloc[-1]
+        adx = _sma(dx, period)
         
-        return float(adx) if not pd.isna(adx) else 0.0
+        return float(adx[-1]) if len(adx) and not np.isnan(adx[-1]) else 0.0
     
     def _classify_trend(self, adx: float) -> TrendRegime:
         """Classify trend strength based on ADX."""
@@ -375,6 +617,47 @@ class RegimeDetector:
         }
         return scales.get(vol_regime, 1.0)
     
+    def detect_regimes_batch(
+        self,
+        duckdb_store,
+        symbols: list[str],
+        lookback_days: int = 60,
+    ) -> dict[str, Optional[MarketRegime]]:
+        """
+        Detect regimes for many symbols with one DuckDB query.
+        
+        Same results as calling detect_regime_from_duckdb per symbol, but
+        the bars for the whole universe are fetched in a single round trip.
+        
+        Returns:
+            Dict mapping symbol to its regime (None if no bars)
+        """
+        end = datetime.now()
+        start = end - timedelta(days=lookback_days)
+        
+        try:
+            bars_by_symbol = duckdb_store.get_bars_multi(
+                symbols=symbols,
+                start=start,
+                end=end,
+                timeframe="1Day",
+            )
+        except Exception as e:
+            logger.error("regime_batch_detection_error", symbols=len(symbols), error=str(e))
+            return {symbol: None for symbol in symbols}
+        
+        regimes = {}
+        for symbol in symbols:
+            bars = bars_by_symbol.get(symbol)
+            if bars is None or bars.empty:
+                logger.warning("no_bars_for_regime", symbol=symbol)
+                regimes[symbol] = None
+                continue
+            
+            regimes[symbol] = self.detect_regime(bars, symbol=symbol)
+        
+        return regimes
+    
     def detect_regime_from_duckdb(
         self,
         duckdb_store,
@@ -8,7 +8,7 @@ Handles:
 - Exposure limits
 """
 
-from src.risk.position_sizer import PositionSizer
+from src.risk.position_sizer import PositionSizer, kelly_size
 from src.risk.drawdown_monitor import DrawdownMonitor
 
-__all__ = ["PositionSizer", "DrawdownMonitor"]
+__all__ = ["PositionSizer", "DrawdownMonitor", "kelly_size"]
@@ -5,14 +5,15 @@ Tracks portfolio drawdown and triggers alerts/actions when limits are breached.
 """
 
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 import structlog
 
+import numpy as np
+
 logger = structlog.get_logger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class DrawdownMetrics:
     """Drawdown metrics for a portfolio."""
     current_equity: float
@@ -26,6 +27,18 @@ class DrawdownMetrics:
     max_drawdown_pct: float       # Historical maximum
 
 
+# Row layout of DrawdownMonitor.metrics_buffer (one field per DrawdownMetrics attribute)
+METRICS_DTYPE = np.dtype([
+    ("current_equity", "f8"),
+    ("peak_equity", "f8"),
+    ("initial_equity", "f8"),
+    ("current_drawdown_pct", "f8"),
+    ("total_drawdown_pct", "f8"),
+    ("days_since_peak", "i8"),
+    ("max_drawdown_pct", "f8"),
+])
+
+
 class DrawdownMonitor:
     """
     Monitors portfolio drawdown and enforces limits.
@@ -40,6 +53,7 @@ class DrawdownMonitor:
         max_daily_drawdown_pct: float = 3.0,
         max_total_drawdown_pct: float = 10.0,
         initial_equity: Optional[float] = None,
+        bars_per_day: int = 1,
     ):
         """
         Initialize drawdown monitor.
@@ -48,18 +62,26 @@ class DrawdownMonitor:
             max_daily_drawdown_pct: Maximum daily drawdown before reducing exposure
             max_total_drawdown_pct: Maximum total drawdown before halting trading
             initial_equity: Initial portfolio equity (for total drawdown calculation)
+            bars_per_day: Updates per trading day, used for days_since_peak
         """
         self.max_daily_drawdown = max_daily_drawdown_pct
         self.max_total_drawdown = max_total_drawdown_pct
         self.initial_equity = initial_equity
+        self.bars_per_day = bars_per_day
         
-        # Track peak equity
+        # Track peak equity (peak_tick is the update index of the peak).
+        # _inv_peak is 1/peak, or 0.0 for a non-positive peak (zero drawdown).
         self.peak_equity: Optional[float] = None
-        self.peak_date: Optional[datetime] = None
+        self._inv_peak: float = 0.0
+        self.peak_tick: int = 0
+        self._tick_counter: int = 0
         
         # Track maximum drawdown
         self.max_drawdown_pct: float = 0.0
         
+        # Per-point metrics from the last update_series() call
+        self.metrics_buffer: np.recarray = np.recarray(0, dtype=METRICS_DTYPE)
+        
         logger.info(
             "drawdown_monitor_initialized",
             max_daily=max_daily_drawdown_pct,
@@ -67,10 +89,23 @@ class DrawdownMonitor:
             initial_equity=initial_equity,
         )
     
+    @property
+    def initial_equity(self) -> Optional[float]:
+        """Initial portfolio equity used for total drawdown."""
+        return self._initial_equity
+    
+    @initial_equity.setter
+    def initial_equity(self, value: Optional[float]) -> None:
+        # Cache 1/initial so total drawdown is a multiply; 0.0 disables it
+        self._initial_equity = value
+        self._inv_initial = 1.0 / value if value and value > 0 else 0.0
+        self._initial_ref = value if self._inv_initial else 0.0
+    
     def update(
         self,
         current_equity: float,
         last_equity: Optional[float] = None,
+        tick_index: Optional[int] = None,
     ) -> DrawdownMetrics:
         """
         Update drawdown metrics.
@@ -78,47 +113,35 @@ class DrawdownMonitor:
         Args:
             current_equity: Current portfolio equity
             last_equity: Previous day's equity (for daily drawdown)
+            tick_index: Index of this update (defaults to one past the previous update)
         
         Returns:
             DrawdownMetrics with current state
         """
-        # Initialize peak if first update
-        if self.peak_equity is None:
-            self.peak_equity = current_equity
-            self.peak_date = datetime.now()
-        
-        # Update peak if new high
-        if current_equity > self.peak_equity:
-            self.peak_equity = current_equity
-            self.peak_date = datetime.now()
-        
-        # Calculate drawdowns
-        current_drawdown_pct = (
-            ((current_equity - self.peak_equity) / self.peak_equity) * 100
-            if self.peak_equity > 0
-            else 0.0
-        )
+        if tick_index is None:
+            tick_index = self._tick_counter
+        self._tick_counter = tick_index + 1
         
-        total_drawdown_pct = (
-            ((current_equity - self.initial_equity) / self.initial_equity) * 100
-            if self.initial_equity and self.initial_equity > 0
-            else 0.0
-        )
+        # Initialize peak on first update, then track new highs
+        peak_equity = self.peak_equity
+        if peak_equity is None or current_equity > peak_equity:
+            peak_equity = self.peak_equity = current_equity
+            self._inv_peak = 1.0 / current_equity if current_equity > 0 else 0.0
+            self.peak_tick = tick_index
+        
+        # Calculate drawdowns (cached inverses are 0.0 where undefined)
+        current_drawdown_pct = (current_equity - peak_equity) * self._inv_peak * 100
+        total_drawdown_pct = (current_equity - self._initial_ref) * self._inv_initial * 100
         
         # Update max drawdown
         if abs(current_drawdown_pct) > abs(self.max_drawdown_pct):
             self.max_drawdown_pct = current_drawdown_pct
         
-        # Calculate days since peak
-        days_since_peak = (
-            (datetime.now() - self.peak_date).days
-            if self.peak_date
-            else 0
-        )
+        days_since_peak = (tick_index - self.peak_tick) // self.bars_per_day
         
         metrics = DrawdownMetrics(
             current_equity=current_equity,
-            peak_equity=self.peak_equity,
+            peak_equity=peak_equity,
             initial_equity=self.initial_equity or current_equity,
             current_drawdown_pct=current_drawdown_pct,
             total_drawdown_pct=total_drawdown_pct,
@@ -131,27 +154,97 @@ class DrawdownMonitor:
         
         return metrics
     
+    def update_series(
+        self,
+        equities: Sequence[float],
+        tick_index: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Replay an equity curve through the monitor in one pass.
+        
+        Equivalent to calling update() for every point, but the running
+        peak, drawdown and max drawdown are computed with array operations
+        and no per-point limit logging. Intended for backtests.
+        
+        The per-point DrawdownMetrics fields are written to metrics_buffer
+        (one record per point) instead of allocating a dataclass each.
+        
+        Args:
+            equities: Equity curve, oldest first
+            tick_index: Index of the first point (defaults to one past the previous update)
+        
+        Returns:
+            Drawdown from running peak (%) for every point
+        """
+        equity = np.asarray(equities, dtype=np.float64)
+        n = equity.size
+        buffer = np.recarray(n, dtype=METRICS_DTYPE)
+        self.metrics_buffer = buffer
+        if n == 0:
+            return buffer.current_drawdown_pct
+        
+        if tick_index is None:
+            tick_index = self._tick_counter
+        self._tick_counter = tick_index + n
+        
+        buffer.current_equity = equity
+        
+        prior_peak = self.peak_equity if self.peak_equity is not None else -np.inf
+        peak = buffer.peak_equity
+        np.maximum.accumulate(equity, out=peak)
+        np.maximum(peak, prior_peak, out=peak)
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            buffer.current_drawdown_pct = np.where(peak > 0, (equity - peak) / peak * 100, 0.0)
+        
+        initial = self.initial_equity
+        if initial and initial > 0:
+            buffer.initial_equity = initial
+            buffer.total_drawdown_pct = (equity - initial) / initial * 100
+        else:
+            buffer.initial_equity = initial or equity
+            buffer.total_drawdown_pct = 0.0
+        
+        # Peak tick follows the last strict new high, like update()
+        previous_peak = np.empty_like(peak)
+        previous_peak[0] = prior_peak
+        previous_peak[1:] = peak[:-1]
+        positions = np.arange(n)
+        last_high = np.where(equity > previous_peak, positions, -1)
+        np.maximum.accumulate(last_high, out=last_high)
+        last_high = np.where(last_high >= 0, last_high, self.peak_tick - tick_index)
+        buffer.days_since_peak = (positions - last_high) // self.bars_per_day
+        
+        # Drawdowns are never positive, so the largest |drawdown| is the running minimum
+        np.minimum.accumulate(buffer.current_drawdown_pct, out=buffer.max_drawdown_pct)
+        np.minimum(buffer.max_drawdown_pct, self.max_drawdown_pct, out=buffer.max_drawdown_pct)
+        
+        self.peak_tick = tick_index + int(last_high[-1])
+        self.peak_equity = float(peak[-1])
+        self._inv_peak = 1.0 / self.peak_equity if self.peak_equity > 0 else 0.0
+        self.max_drawdown_pct = float(buffer.max_drawdown_pct[-1])
+        
+        return buffer.current_drawdown_pct
+    
     def _check_limits(
         self,
         metrics: DrawdownMetrics,
         last_equity: Optional[float],
     ) -> None:
         """Check drawdown limits and log warnings."""
-        # Daily drawdown check
-        if last_equity:
-            daily_drawdown_pct = (
-                ((metrics.current_equity - last_equity) / last_equity) * 100
-                if last_equity > 0
-                else 0.0
+        # Daily drawdown check; log kwargs are only built on a breach
+        daily_drawdown_pct = (
+            ((metrics.current_equity - last_equity) / last_equity) * 100
+            if last_equity and last_equity > 0
+            else 0.0
+        )
+        if daily_drawdown_pct < -self.max_daily_drawdown:
+            logger.warning(
+                "daily_drawdown_limit_breached",
+                daily_drawdown_pct=daily_drawdown_pct,
+                limit=-self.max_daily_drawdown,
+                action="reducing_exposure",
             )
-            
-            if daily_drawdown_pct < -self.max_daily_drawdown:
-                logger.warning(
-                    "daily_drawdown_limit_breached",
-                    daily_drawdown_pct=daily_drawdown_pct,
-                    limit=-self.max_daily_drawdown,
-                    action="reducing_exposure",
-                )
         
         # Total drawdown check
         if abs(metrics.total_drawdown_pct) > self.max_total_drawdown:
@@ -184,12 +277,35 @@ class DrawdownMonitor:
         
         Returns a multiplier (0.0 to 1.0) to scale position sizes.
         """
-        if self.should_halt_trading(metrics):
+        # Same rules as should_halt_trading / should_reduce_exposure, inlined
+        if abs(metrics.total_drawdown_pct) > self.max_total_drawdown:
             return 0.0  # No trading
         
-        if self.should_reduce_exposure(metrics):
-            # Reduce by drawdown severity
-            reduction = abs(metrics.current_drawdown_pct) / self.max_daily_drawdown
-            return max(0.25, 1.0 - reduction)  # At least 25% of normal size
+        current = abs(metrics.current_drawdown_pct)
+        if current > self.max_daily_drawdown:
+            # Reduce by drawdown severity, at least 25% of normal size
+            return max(0.25, 1.0 - current / self.max_daily_drawdown)
         
         return 1.0  # Normal sizing
+    
+    def get_position_scale_batch(
+        self,
+        current_drawdown_pct: np.ndarray,
+        total_drawdown_pct: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorized get_position_scale for many drawdown readings.
+        
+        Args:
+            current_drawdown_pct: Drawdown from peak (%) per entry
+            total_drawdown_pct: Drawdown from initial equity (%) per entry
+        
+        Returns:
+            Position size multiplier (0.0 to 1.0) per entry
+        """
+        current = np.abs(np.asarray(current_drawdown_pct, dtype=np.float64))
+        total = np.abs(np.asarray(total_drawdown_pct, dtype=np.float64))
+        
+        reduced = np.maximum(0.25, 1.0 - current / self.max_daily_drawdown)
+        scale = np.where(current > self.max_daily_drawdown, reduced, 1.0)
+        return np.where(total > self.max_total_drawdown, 0.0, scale)
@@ -10,12 +10,81 @@ Implements multiple position sizing methods:
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
+import logging
 import structlog
 
 import numpy as np
 
 logger = structlog.get_logger(__name__)
 
+# Level check for the fallback warnings. Entry points route structlog through
+# stdlib logging (filter_by_level), so this is the level that filters them;
+# BoundLogger.is_enabled_for() only exists from structlog 26.1.
+_level_logger = logging.getLogger(__name__)
+
+try:
+    import numexpr
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+# Fractional (25%) Kelly size in percent, same operation order as _calculate_kelly
+_KELLY_PCT_EXPR = (
+    "((avg_win / avg_loss) * win_rate - (1 - win_rate)) / (avg_win / avg_loss)"
+    " * 0.25 * 100 * regime"
+)
+_KELLY_BATCH_EXPR = (
+    f"where(valid, where({_KELLY_PCT_EXPR} > cap, cap, "
+    f"where({_KELLY_PCT_EXPR} < 0.5, 0.5, {_KELLY_PCT_EXPR})), fixed_pct)"
+)
+
+# Daily volatility target of the friction-adjusted rule (15% annualized)
+FRICTION_SIGMA_TARGET = 0.15 / 252 ** 0.5
+
+
+def kelly_size(
+    portfolio_value: float,
+    win_rate: float,
+    avg_win: float,
+    avg_loss: float,
+    regime_scale: float,
+    current_price: float,
+    base_pct: float,
+    max_pct: float,
+) -> tuple[float, float, float]:
+    """
+    Fractional (25%) Kelly size as plain floats.
+    
+    Uses only scalar arithmetic and returns a tuple, so it can be compiled
+    as-is (e.g. numba.njit(kelly_size)) and called from a strategy's own
+    compiled loop. Invalid inputs fall back to the fixed size, like
+    PositionSizer._calculate_fixed.
+    
+    Args:
+        portfolio_value: Total portfolio value
+        win_rate: Win probability
+        avg_win: Average win amount
+        avg_loss: Average loss amount
+        regime_scale: Regime-based scaling factor
+        current_price: Current stock price
+        base_pct: Fixed position size (%) used for invalid inputs
+        max_pct: Maximum position size (%)
+    
+    Returns:
+        (size_pct, size_dollars, size_shares)
+    """
+    if win_rate <= 0 or win_rate >= 1 or avg_loss <= 0:
+        size_pct = min(base_pct * regime_scale, max_pct)
+    else:
+        odds = avg_win / avg_loss
+        kelly_fraction = (odds * win_rate - (1 - win_rate)) / odds
+        size_pct = kelly_fraction * 0.25 * 100 * regime_scale
+        size_pct = max(min(size_pct, max_pct), 0.5)
+    
+    size_dollars = portfolio_value * (size_pct / 100)
+    size_shares = size_dollars / current_price if current_price > 0 else 0.0
+    return size_pct, size_dollars, size_shares
+
 
 class PositionSizingMethod(Enum):
     """Position sizing methods."""
@@ -24,7 +93,7 @@ class PositionSizingMethod(Enum):
     KELLY = "kelly"
 
 
-@dataclass
+@dataclass(slots=True)
 class PositionSizeResult:
     """Result of position sizing calculation."""
     size_pct: float  # Position size as % of portfolio
@@ -35,6 +104,42 @@ class PositionSizeResult:
     rationale: str
 
 
+@dataclass(slots=True)
+class PositionSizeBatch:
+    """
+    Position sizes for many symbols, one array per field.
+    
+    Rationale strings are not built in batch mode; use describe() or
+    result() for the rows that need one.
+    """
+    size_pct: np.ndarray
+    size_dollars: np.ndarray
+    size_shares: np.ndarray
+    current_price: np.ndarray
+    method: str
+    
+    def __len__(self) -> int:
+        return len(self.size_pct)
+    
+    def describe(self, i: int) -> str:
+        """Build the rationale for row i."""
+        return (
+            f"Batch {self.method}: size={self.size_pct[i]:.2f}%, "
+            f"shares={self.size_shares[i]:.2f} @ {self.current_price[i]:.2f}"
+        )
+    
+    def result(self, i: int) -> PositionSizeResult:
+        """Row i as a PositionSizeResult."""
+        return PositionSizeResult(
+            size_pct=float(self.size_pct[i]),
+            size_dollars=float(self.size_dollars[i]),
+            size_shares=float(self.size_shares[i]),
+            current_price=float(self.current_price[i]),
+            method=self.method,
+            rationale=self.describe(i),
+        )
+
+
 class PositionSizer:
     """
     Position sizing calculator.
@@ -103,10 +208,11 @@ class PositionSizer:
         
         elif self.method == PositionSizingMethod.VOLATILITY_ADJUSTED:
             if volatility is None:
-                logger.warning(
-                    "volatility_missing_using_fixed",
-                    symbol=symbol,
-                )
+                if _level_logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        "volatility_missing_using_fixed",
+                        symbol=symbol,
+                    )
                 return self._calculate_fixed(portfolio_value, regime_scale, current_price)
             
             return self._calculate_volatility_adjusted(
@@ -118,10 +224,11 @@ class PositionSizer:
         
         elif self.method == PositionSizingMethod.KELLY:
             if win_rate is None or avg_win is None or avg_loss is None:
-                logger.warning(
-                    "kelly_params_missing_using_fixed",
-                    symbol=symbol,
-                )
+                if _level_logger.isEnabledFor(logging.WARNING):
+                    logger.warning(
+                        "kelly_params_missing_using_fixed",
+                        symbol=symbol,
+                    )
                 return self._calculate_fixed(portfolio_value, regime_scale, current_price)
             
             return self._calculate_kelly(
@@ -137,6 +244,191 @@ class PositionSizer:
             # Fallback to fixed
             return self._calculate_fixed(portfolio_value, regime_scale, current_price)
     
+    def calculate_sizes_batch(
+        self,
+        portfolio_value: float,
+        prices: np.ndarray,
+        volatilities: Optional[np.ndarray] = None,
+        regime_scales: np.ndarray | float = 1.0,
+        win_rates: Optional[np.ndarray] = None,
+        avg_wins: Optional[np.ndarray] = None,
+        avg_losses: Optional[np.ndarray] = None,
+    ) -> PositionSizeBatch:
+        """
+        Calculate position sizes for many symbols at once.
+        
+        Applies the same rules as calculate_size() element-wise, including
+        the fallback to fixed sizing for missing or invalid inputs.
+        
+        Args:
+            portfolio_value: Total portfolio value
+            prices: Current price per symbol
+            volatilities: Annualized volatility per symbol (for volatility-adjusted)
+            regime_scales: Regime-based scaling factor (scalar or per symbol)
+            win_rates: Win rate per symbol (for Kelly)
+            avg_wins: Average win amount per symbol (for Kelly)
+            avg_losses: Average loss amount per symbol (for Kelly)
+        
+        Returns:
+            PositionSizeBatch with one entry per price
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        regime = np.broadcast_to(np.asarray(regime_scales, dtype=np.float64), prices.shape)
+        
+        # Fixed sizing doubles as the fallback for invalid rows
+        fixed_pct = np.minimum(self.base_position_pct * regime, self.max_position_pct)
+        size_pct = fixed_pct
+        method = "fixed"
+        
+        if self.method == PositionSizingMethod.VOLATILITY_ADJUSTED:
+            if volatilities is None:
+                logger.warning("volatility_missing_using_fixed", count=prices.size)
+            else:
+                vols = np.asarray(volatilities, dtype=np.float64)
+                valid = vols > 0
+                with np.errstate(divide="ignore"):
+                    scaled = self.base_position_pct * (self.volatility_target / vols) * regime
+                size_pct = np.where(valid, self._clamp_pct(scaled), fixed_pct)
+                method = "volatility_adjusted"
+                if not valid.all():
+                    logger.warning(
+                        "invalid_volatility_using_fixed", count=int((~valid).sum())
+                    )
+        
+        elif self.method == PositionSizingMethod.KELLY:
+            if win_rates is None or avg_wins is None or avg_losses is None:
+                logger.warning("kelly_params_missing_using_fixed", count=prices.size)
+            else:
+                win_rate = np.asarray(win_rates, dtype=np.float64)
+                avg_loss = np.asarray(avg_losses, dtype=np.float64)
+                valid = (win_rate > 0) & (win_rate < 1) & (avg_loss > 0)
+                size_pct = self._calculate_kelly_batch(
+                    win_rate,
+                    np.asarray(avg_wins, dtype=np.float64),
+                    avg_loss,
+                    regime,
+                    valid,
+                    fixed_pct,
+                )
+                method = "kelly"
+                if not valid.all():
+                    logger.warning("invalid_kelly_params_using_fixed", count=int((~valid).sum()))
+        
+        size_dollars = portfolio_value * (size_pct / 100)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            size_shares = np.where(prices > 0, size_dollars / prices, 0.0)
+        
+        return PositionSizeBatch(
+            size_pct=size_pct,
+            size_dollars=size_dollars,
+            size_shares=size_shares,
+            current_price=prices,
+            method=method,
+        )
+    
+    def _calculate_kelly_batch(
+        self,
+        win_rate: np.ndarray,
+        avg_win: np.ndarray,
+        avg_loss: np.ndarray,
+        regime: np.ndarray,
+        valid: np.ndarray,
+        fixed_pct: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Fractional Kelly size (%) per symbol, fixed size where inputs are invalid.
+        
+        With numexpr installed the whole expression runs as one fused
+        pass; otherwise NumPy reuses a single work array in place.
+        """
+        max_pct = self.max_position_pct
+        
+        if NUMEXPR_AVAILABLE:
+            # Cap then floor: a cap below the 0.5% floor leaves only the floor
+            return numexpr.evaluate(
+                _KELLY_BATCH_EXPR,
+                local_dict={
+                    "win_rate": win_rate,
+                    "avg_win": avg_win,
+                    "avg_loss": avg_loss,
+                    "regime": regime,
+                    "valid": valid,
+                    "fixed_pct": fixed_pct,
+                    "cap": max(max_pct, 0.5),
+                },
+            )
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            odds = avg_win / avg_loss
+            size_pct = odds * win_rate
+            size_pct -= 1 - win_rate
+            size_pct /= odds
+        size_pct *= 0.25
+        size_pct *= 100
+        size_pct *= regime
+        np.minimum(size_pct, max_pct, out=size_pct)
+        np.maximum(size_pct, 0.5, out=size_pct)
+        return np.where(valid, size_pct, fixed_pct)
+    
+    def calculate_friction_adjusted_kelly(
+        self,
+        sigma_hat: np.ndarray,
+        p_bull: np.ndarray,
+        f_tilde: np.ndarray,
+        w_max: float = 2.0,
+        sigma_target: float = FRICTION_SIGMA_TARGET,
+        dtype: type = np.float64,
+    ) -> np.ndarray:
+        """
+        Friction-adjusted Kelly weights for a whole universe in one pass.
+        
+        Volatility scaling w_vol = min(w_max, sigma_target / sigma_hat) is
+        weighted by regime confidence (p_bull - 0.5) / 0.5 and the
+        friction-adjusted Kelly fraction f_tilde. Where f_tilde is ~0 a
+        baseline of 0.25 * w_vol is used instead.
+        
+        Args:
+            sigma_hat: Estimated daily volatility per symbol
+            p_bull: Probability of the bull regime per symbol
+            f_tilde: Friction-adjusted Kelly fraction per symbol
+            w_max: Maximum volatility scaling
+            sigma_target: Daily volatility target
+            dtype: Working precision; np.float32 halves memory traffic for
+                large universes when the caller does not need doubles
+        
+        Returns:
+            Portfolio weights (fractions), clipped to [0, max_position_pct / 100]
+        """
+        return self._calculate_friction_kelly_batch(
+            np.asarray(sigma_hat, dtype=dtype),
+            np.asarray(p_bull, dtype=dtype),
+            np.asarray(f_tilde, dtype=dtype),
+            w_max,
+            sigma_target,
+        )
+    
+    def _calculate_friction_kelly_batch(
+        self,
+        sigma_hat: np.ndarray,
+        p_bull: np.ndarray,
+        f_tilde: np.ndarray,
+        w_max: float,
+        sigma_target: float,
+    ) -> np.ndarray:
+        """Friction-adjusted Kelly weights; see calculate_friction_adjusted_kelly."""
+        # Python float scalars keep float32 inputs in float32
+        w_max = float(w_max)
+        sigma_target = float(sigma_target)
+        w_vol = np.minimum(w_max, sigma_target / np.maximum(sigma_hat, 1e-8))
+        w_conf = np.clip((p_bull - 0.5) / 0.5, 0.0, 1.0) * w_vol
+        baseline = 0.25 * w_vol
+        weights = np.where(np.abs(f_tilde) < 1e-4, baseline, f_tilde * w_conf)
+        return np.clip(weights, 0.0, self.max_position_pct / 100)
+    
+    def _clamp_pct(self, size_pct: np.ndarray) -> np.ndarray:
+        """Cap at the maximum, then floor at 0.5% (same order as the scalar path)."""
+        return np.maximum(np.minimum(size_pct, self.max_position_pct), 0.5)
+    
     def _calculate_fixed(
         self,
         portfolio_value: float,
@@ -175,7 +467,8 @@ class PositionSizer:
         Formula: size = target_vol / asset_vol * base_size
         """
         if volatility <= 0:
-            logger.warning("invalid_volatility_using_fixed", volatility=volatility)
+            if _level_logger.isEnabledFor(logging.WARNING):
+                logger.warning("invalid_volatility_using_fixed", volatility=volatility)
             return self._calculate_fixed(portfolio_value, regime_scale, current_price)
         
         # Scale position size to target volatility
@@ -227,32 +520,31 @@ class PositionSizer:
         We use fractional Kelly (typically 0.25-0.5) to reduce risk.
         """
         if win_rate <= 0 or win_rate >= 1:
-            logger.warning("invalid_win_rate_using_fixed", win_rate=win_rate)
+            if _level_logger.isEnabledFor(logging.WARNING):
+                logger.warning("invalid_win_rate_using_fixed", win_rate=win_rate)
             return self._calculate_fixed(portfolio_value, regime_scale, current_price)
         
         if avg_loss <= 0:
-            logger.warning("invalid_avg_loss_using_fixed", avg_loss=avg_loss)
+            if _level_logger.isEnabledFor(logging.WARNING):
+                logger.warning("invalid_avg_loss_using_fixed", avg_loss=avg_loss)
             return self._calculate_fixed(portfolio_value, regime_scale, current_price)
         
-        # Calculate Kelly fraction
+        size_pct, size_dollars, size_shares = kelly_size(
+            portfolio_value,
+            win_rate,
+            avg_win,
+            avg_loss,
+            regime_scale,
+            current_price,
+            self.base_position_pct,
+            self.max_position_pct,
+        )
+        
+        # Only the rationale needs the intermediate terms
         odds = avg_win / avg_loss
         kelly_fraction = (odds * win_rate - (1 - win_rate)) / odds
-        
-        # Use fractional Kelly (25% of full Kelly) for safety
         fractional_kelly = kelly_fraction * 0.25
         
-        # Convert to position size percentage
-        size_pct = fractional_kelly * 100 * regime_scale
-        
-        # Cap at maximum
-        size_pct = min(size_pct, self.max_position_pct)
-        
-        # Floor at 0.5%
-        size_pct = max(size_pct, 0.5)
-        
-        size_dollars = portfolio_value * (size_pct / 100)
-        size_shares = size_dollars / current_price if current_price > 0 else 0
-        
         return PositionSizeResult(
             size_pct=size_pct,
             size_dollars=size_dollars,
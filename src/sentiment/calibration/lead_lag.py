@@ -9,17 +9,227 @@ Solution: Two-stage A/B validation
 - Stage 2: Validate ONLY that lag on holdout subset B
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
+import math
 import structlog
 
 import numpy as np
-from scipy import stats
 
 logger = structlog.get_logger(__name__)
 
 
+# Lags with fewer overlapping observations are not tested
+MIN_LAG_OBSERVATIONS = 30
+
+# Number of recently calibrated series pairs whose prefix sums are kept
+PREFIX_CACHE_SIZE = 4
+
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """Prefix sums with a leading zero, so sum(values[a:b]) == out[b] - out[a]."""
+    out = np.empty(values.size + 1)
+    out[0] = 0.0
+    np.cumsum(values, out=out[1:])
+    return out
+
+
+class _PrefixStats:
+    """
+    Prefix sums of a sentiment/returns pair for windowed Pearson correlations.
+    
+    Built once per calibration and shared by the discovery and validation
+    stages. Any window's sums and sums of squares are O(1) differences;
+    only the lagged cross product needs a pass over the window.
+    
+    Lag k pairs sentiment[t] with returns[t + k], the same alignment as
+    SentimentCalibrator._test_single_lag.
+    
+    roll_in() appends observations in O(1) amortized time; the arrays then
+    grow geometrically and only the first n entries (n + 1 for prefix
+    sums) are meaningful.
+    """
+    
+    def __init__(self, sentiment: np.ndarray, returns: np.ndarray):
+        x = np.asarray(sentiment, dtype=np.float64)
+        y = np.asarray(returns, dtype=np.float64)
+        
+        # Correlation is shift invariant; centering keeps the sums well conditioned.
+        # The offsets are kept so rolled-in points are centered the same way.
+        self._x_offset = float(x.mean()) if x.size else 0.0
+        self._y_offset = float(y.mean()) if y.size else 0.0
+        self.x = x - self._x_offset
+        self.y = y - self._y_offset
+        self.n = x.size
+        
+        self.sx = _prefix(self.x)
+        self.sxx = _prefix(self.x * self.x)
+        self.sy = _prefix(self.y)
+        self.syy = _prefix(self.y * self.y)
+    
+    def roll_in(self, sentiment_value: float, return_value: float) -> None:
+        """Append one observation, extending every prefix array by one entry."""
+        i = self.n
+        if i == 0:
+            self._x_offset = sentiment_value
+            self._y_offset = return_value
+        if i == self.x.size:
+            self._grow()
+        
+        x = sentiment_value - self._x_offset
+        y = return_value - self._y_offset
+        self.x[i] = x
+        self.y[i] = y
+        self.sx[i + 1] = self.sx[i] + x
+        self.sxx[i + 1] = self.sxx[i] + x * x
+        self.sy[i + 1] = self.sy[i] + y
+        self.syy[i + 1] = self.syy[i] + y * y
+        self.n = i + 1
+    
+    def _grow(self) -> None:
+        """Double the capacity of all arrays, keeping the filled prefix."""
+        capacity = max(2 * self.x.size, 64)
+        for name, size, used in (
+            ("x", capacity, self.n),
+            ("y", capacity, self.n),
+            ("sx", capacity + 1, self.n + 1),
+            ("sxx", capacity + 1, self.n + 1),
+            ("sy", capacity + 1, self.n + 1),
+            ("syy", capacity + 1, self.n + 1),
+        ):
+            grown = np.empty(size)
+            grown[:used] = getattr(self, name)[:used]
+            setattr(self, name, grown)
+    
+    def lag_range(
+        self,
+        max_lag: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Correlation at every lag in [-max_lag, max_lag] within [start, end).
+        
+        Returns:
+            (lags, correlations, observations). Lags with fewer than
+            MIN_LAG_OBSERVATIONS points or zero variance get correlation 0.0.
+        """
+        end = self.n if end is None else end
+        lags = np.arange(-max_lag, max_lag + 1)
+        n_obs = np.maximum(end - start - np.abs(lags), 0)
+        
+        # Zero-padding returns gives exactly the 2*max_lag+1 needed dot products.
+        # np.correlate runs each lag over contiguous memory; a sliding_window_view
+        # matmul gives the same numbers but its strided rows are ~3x slower.
+        sxy = np.correlate(np.pad(self.y[start:end], max_lag), self.x[start:end], mode="valid")
+        
+        # Window bounds: lag >= 0 -> x[0:n-k], y[k:n]; lag < 0 -> x[-k:n], y[0:n+k]
+        x_start = start + np.minimum(np.maximum(-lags, 0), end - start)
+        y_start = start + np.minimum(np.maximum(lags, 0), end - start)
+        x_end = x_start + n_obs
+        y_end = y_start + n_obs
+        
+        sx = self.sx[x_end] - self.sx[x_start]
+        sy = self.sy[y_end] - self.sy[y_start]
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sxy - sx * sy / n_obs
+            var_x = self.sxx[x_end] - self.sxx[x_start] - sx * sx / n_obs
+            var_y = self.syy[y_end] - self.syy[y_start] - sy * sy / n_obs
+            corrs = cov / np.sqrt(var_x * var_y)
+        
+        valid = (n_obs >= MIN_LAG_OBSERVATIONS) & np.isfinite(corrs)
+        corrs = np.where(valid, np.clip(corrs, -1.0, 1.0), 0.0)
+        return lags, corrs, n_obs
+    
+    def single_lag(
+        self,
+        lag: int,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> tuple[float, int]:
+        """
+        Correlation at one lag within [start, end).
+        
+        Returns:
+            (correlation, observations); correlation is 0.0 when untestable.
+        """
+        end = self.n if end is None else end
+        n_obs = end - start - abs(lag)
+        if n_obs < MIN_LAG_OBSERVATIONS:
+            return 0.0, max(n_obs, 0)
+        
+        x_start = start + max(-lag, 0)
+        y_start = start + max(lag, 0)
+        x_end = x_start + n_obs
+        y_end = y_start + n_obs
+        
+        # Python floats from here on; NumPy scalar arithmetic dispatches per operator
+        sx = float(self.sx[x_end] - self.sx[x_start])
+        sy = float(self.sy[y_end] - self.sy[y_start])
+        sxx = float(self.sxx[x_end] - self.sxx[x_start])
+        syy = float(self.syy[y_end] - self.syy[y_start])
+        sxy = float(np.dot(self.x[x_start:x_end], self.y[y_start:y_end]))
+        
+        var_x = sxx - sx * sx / n_obs
+        var_y = syy - sy * sy / n_obs
+        if var_x <= 0.0 or var_y <= 0.0:
+            return 0.0, n_obs
+        
+        corr = (sxy - sx * sy / n_obs) / math.sqrt(var_x * var_y)
+        return max(-1.0, min(1.0, corr)), n_obs
+
+
+def _slices_for_lag(lag: int) -> tuple[slice, slice]:
+    """(sentiment, returns) slices pairing sentiment[t] with returns[t + lag]."""
+    if lag > 0:
+        # Sentiment leads: shift sentiment back
+        return slice(None, -lag), slice(lag, None)
+    if lag < 0:
+        # Sentiment lags: shift returns back
+        return slice(-lag, None), slice(None, lag)
+    return slice(None), slice(None)
+
+
+def _correlation_p_value(corr: float, n_obs: int) -> float:
+    """
+    Two-sided p-value for a Pearson correlation (t-test with n - 2 dof).
+    
+    Matches scipy.stats.pearsonr. Fewer than MIN_LAG_OBSERVATIONS
+    observations give p = 1.0.
+    """
+    if n_obs < MIN_LAG_OBSERVATIONS:
+        return 1.0
+    if abs(corr) >= 1.0:
+        return 0.0
+    dof = n_obs - 2
+    t_stat = corr * math.sqrt(dof / ((1.0 - corr) * (1.0 + corr)))
+    # Imported here so loading this module does not pull in scipy
+    from scipy.special import stdtr
+    
+    return float(2.0 * stdtr(dof, -abs(t_stat)))
+
+
+def _pearson_fast(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    """
+    Pearson correlation and two-sided p-value of two equal-length arrays.
+    
+    Same result as scipy.stats.pearsonr without its confidence-interval
+    and result-object overhead. Zero-variance input gives (0.0, 1.0).
+    """
+    n = x.size
+    xm = x - x.mean()
+    ym = y - y.mean()
+    denom = math.sqrt(float(xm @ xm) * float(ym @ ym))
+    if denom == 0.0:
+        return 0.0, 1.0
+    
+    corr = max(-1.0, min(1.0, float(xm @ ym) / denom))
+    return corr, _correlation_p_value(corr, n)
+
+
 class SentimentMode(Enum):
     """How to use sentiment based on calibration."""
     DISABLED = "disabled"      # No validated edge - don't use
@@ -27,12 +237,13 @@ class SentimentMode(Enum):
     CONTRARIAN = "contrarian"  # Positive sentiment → bearish filter (crowded)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LeadLagResult:
     """
     Result of lead-lag calibration.
     
     CRITICAL: Only use sentiment if validation_passed is True.
+    Results are immutable so the no-edge result can be shared.
     """
     optimal_lag_hours: int
     correlation: float
@@ -50,6 +261,17 @@ class LeadLagResult:
     discovery_p_value: Optional[float] = None
 
 
+# Shared result for insufficient data or no candidate lag
+_INSUFFICIENT_RESULT = LeadLagResult(
+    optimal_lag_hours=0,
+    correlation=0.0,
+    p_value=1.0,
+    is_significant=False,
+    is_leading=False,
+    validation_passed=False,
+)
+
+
 class SentimentCalibrator:
     """
     Statistically rigorous lead-lag calibration.
@@ -87,6 +309,17 @@ class SentimentCalibrator:
         self.lookback_days = lookback_days
         self.lag_range = lag_range_hours
         
+        # Slice pairs for every configured lag, built once
+        self._lag_slices = {
+            lag: _slices_for_lag(lag) for lag in range(-lag_range_hours, lag_range_hours + 1)
+        }
+        
+        # Recent (series copies, prefix sums) by array address, most recent last
+        self._prefix_cache: OrderedDict[tuple, tuple] = OrderedDict()
+        
+        # Series built point by point via roll_in()
+        self._online: Optional[_PrefixStats] = None
+        
         logger.info(
             "sentiment_calibrator_initialized",
             lookback_days=lookback_days,
@@ -114,40 +347,117 @@ class SentimentCalibrator:
             logger.warning("insufficient_data_for_calibration", length=len(sentiment_series))
             return self._insufficient_data_result()
         
+        # One set of prefix sums serves both discovery and validation
+        prefix = self._prefix_for(sentiment_series, returns_series)
+        
         if use_two_stage:
-            return self._two_stage_validation(sentiment_series, returns_series)
+            return self._two_stage_validation(sentiment_series, returns_series, prefix)
         else:
-            return self._bonferroni_validation(sentiment_series, returns_series)
+            return self._bonferroni_validation(sentiment_series, returns_series, prefix)
+    
+    def roll_in(self, sentiment_value: float, return_value: float) -> None:
+        """
+        Append one observation to the calibrator's online series.
+        
+        Args:
+            sentiment_value: Latest sentiment score
+            return_value: Latest return
+        """
+        if self._online is None:
+            self._online = _PrefixStats(np.empty(0), np.empty(0))
+        self._online.roll_in(sentiment_value, return_value)
+    
+    def measure_online(
+        self,
+        window: Optional[int] = None,
+        use_two_stage: bool = True,
+    ) -> LeadLagResult:
+        """
+        Calibrate over the most recent rolled-in observations.
+        
+        Sliding-window recalibration reuses the online prefix sums, so no
+        per-window setup is recomputed.
+        
+        Args:
+            window: Number of most recent observations (all if None)
+            use_two_stage: If True, use A/B split validation (recommended)
+        
+        Returns:
+            LeadLagResult with validation status
+        """
+        prefix = self._online
+        n = prefix.n if prefix is not None else 0
+        start = max(n - window, 0) if window is not None else 0
+        if n - start < 100:
+            logger.warning("insufficient_data_for_calibration", length=n - start)
+            return self._insufficient_data_result()
+        
+        # Window views; with a prefix given only their lengths are used
+        sentiment = prefix.x[start:n]
+        returns = prefix.y[start:n]
+        
+        if use_two_stage:
+            return self._two_stage_validation(sentiment, returns, prefix, start)
+        else:
+            return self._bonferroni_validation(sentiment, returns, prefix, start)
+    
+    def _prefix_for(self, sentiment: np.ndarray, returns: np.ndarray) -> _PrefixStats:
+        """
+        Prefix sums for a series pair, reused when the same data is calibrated again.
+        
+        Entries are keyed by array address and checked against a stored
+        copy, so in-place edits to a cached series are never served stale.
+        """
+        if not (isinstance(sentiment, np.ndarray) and isinstance(returns, np.ndarray)):
+            return _PrefixStats(sentiment, returns)
+        
+        key = (sentiment.ctypes.data, sentiment.size, returns.ctypes.data, returns.size)
+        cached = self._prefix_cache.get(key)
+        if (
+            cached is not None
+            and np.array_equal(cached[0], sentiment)
+            and np.array_equal(cached[1], returns)
+        ):
+            self._prefix_cache.move_to_end(key)
+            return cached[2]
+        
+        prefix = _PrefixStats(sentiment, returns)
+        self._prefix_cache[key] = (sentiment.copy(), returns.copy(), prefix)
+        self._prefix_cache.move_to_end(key)
+        if len(self._prefix_cache) > PREFIX_CACHE_SIZE:
+            self._prefix_cache.popitem(last=False)
+        return prefix
     
     def _two_stage_validation(
         self,
         sentiment: np.ndarray,
         returns: np.ndarray,
+        prefix: Optional[_PrefixStats] = None,
+        start: int = 0,
     ) -> LeadLagResult:
         """
         Two-stage validation: Discover on A, validate on B.
         
         This is the ONLY statistically valid approach when searching
-        over multiple hypotheses (lag values).
+        over multiple hypotheses (lag values). When prefix is given,
+        sentiment/returns are the window of the prefixed series starting
+        at start.
         """
         n = len(sentiment)
         split_idx = int(n * self.DISCOVERY_RATIO)
+        if prefix is None:
+            prefix = _PrefixStats(sentiment, returns)
         
         # Stage 1: Discovery on subset A
         sentiment_A = sentiment[:split_idx]
         returns_A = returns[:split_idx]
         
-        discovery_result = self._find_optimal_lag(sentiment_A, returns_A)
+        discovery_result = self._find_optimal_lag(
+            sentiment_A, returns_A, prefix=prefix, start=start
+        )
         
         if not discovery_result["is_candidate"]:
-            return LeadLagResult(
-                optimal_lag_hours=0,
-                correlation=0.0,
-                p_value=1.0,
-                is_significant=False,
-                is_leading=False,
-                validation_passed=False,
-            )
+            return _INSUFFICIENT_RESULT
         
         # Stage 2: Validate ONLY the discovered lag on subset B
         sentiment_B = sentiment[split_idx:]
@@ -157,13 +467,15 @@ class SentimentCalibrator:
             sentiment_B,
             returns_B,
             discovery_result["optimal_lag"],
+            prefix=prefix,
+            start=start + split_idx,
         )
         
         # Validation uses standard α=0.05 (single test, no correction needed)
         validation_passed = (
             validation_p < 0.05 and
             abs(validation_corr) > self.MIN_PRACTICAL_CORRELATION and
-            np.sign(validation_corr) == np.sign(discovery_result["correlation"])
+            (validation_corr > 0) == (discovery_result["correlation"] > 0)
         )
         
         return LeadLagResult(
@@ -183,13 +495,15 @@ class SentimentCalibrator:
         self,
         sentiment: np.ndarray,
         returns: np.ndarray,
+        prefix: Optional[_PrefixStats] = None,
+        start: int = 0,
     ) -> LeadLagResult:
         """
         Bonferroni correction: Adjust significance threshold for multiple tests.
         
         Less powerful than two-stage but uses all data.
         """
-        result = self._find_optimal_lag(sentiment, returns)
+        result = self._find_optimal_lag(sentiment, returns, prefix=prefix, start=start)
         
         # Apply Bonferroni correction: p-value must beat corrected threshold
         is_significant = (
@@ -210,19 +524,29 @@ class SentimentCalibrator:
         self,
         sentiment: np.ndarray,
         returns: np.ndarray,
+        prefix: Optional[_PrefixStats] = None,
+        start: int = 0,
     ) -> dict:
-        """Search for optimal lag across all candidate values."""
-        best_lag = 0
-        best_corr = 0.0
-        best_p = 1.0
-        
-        for lag in range(-self.lag_range, self.lag_range + 1):
-            corr, p_value = self._test_single_lag(sentiment, returns, lag)
-            
-            if abs(corr) > abs(best_corr):
-                best_lag = lag
-                best_corr = corr
-                best_p = p_value
+        """
+        Search for optimal lag across all candidate values.
+        
+        When prefix is given, sentiment/returns are the window of the
+        prefixed series starting at start.
+        """
+        if prefix is None:
+            prefix = _PrefixStats(sentiment, returns)
+        lags, corrs, n_obs = prefix.lag_range(self.lag_range, start, start + len(sentiment))
+        abs_corrs = np.abs(corrs)
+        
+        # First lag with the largest |r| wins; no positive |r| keeps lag 0
+        best = int(abs_corrs.argmax())
+        if not abs_corrs[best] > 0.0:
+            best_lag, best_corr, best_p = 0, 0.0, 1.0
+        else:
+            # Only the selected lag needs a p-value
+            best_lag = int(lags[best])
+            best_corr = float(corrs[best])
+            best_p = _correlation_p_value(best_corr, int(n_obs[best]))
         
         return {
             "optimal_lag": best_lag,
@@ -236,30 +560,36 @@ class SentimentCalibrator:
         sentiment: np.ndarray,
         returns: np.ndarray,
         lag: int,
+        prefix: Optional[_PrefixStats] = None,
+        start: int = 0,
     ) -> tuple[float, float]:
         """
         Test correlation at a specific lag value.
         
+        Positive lag means sentiment leads returns. When prefix is given,
+        sentiment/returns are the window of the prefixed series starting
+        at start, and no new sums are computed.
+        
         Returns (correlation, p_value)
         """
-        if lag > 0:
-            # Sentiment leads: shift sentiment back
-            aligned_sentiment = sentiment[:-lag] if lag > 0 else sentiment
-            aligned_returns = returns[lag:] if lag > 0 else returns
-        elif lag < 0:
-            # Sentiment lags: shift returns back
-            aligned_sentiment = sentiment[-lag:]
-            aligned_returns = returns[:lag]
-        else:
-            aligned_sentiment = sentiment
-            aligned_returns = returns
+        if prefix is not None:
+            corr, n_obs = prefix.single_lag(lag, start, start + len(sentiment))
+            return corr, _correlation_p_value(corr, n_obs)
+        
+        slices = self._lag_slices.get(lag)
+        if slices is None:
+            slices = _slices_for_lag(lag)
+        sentiment_slice, returns_slice = slices
+        aligned_sentiment = sentiment[sentiment_slice]
+        aligned_returns = returns[returns_slice]
         
-        # Use Pearson correlation with proper p-value
-        if len(aligned_sentiment) < 30:
+        if len(aligned_sentiment) < MIN_LAG_OBSERVATIONS:
             return 0.0, 1.0
         
-        corr, p_value = stats.pearsonr(aligned_sentiment, aligned_returns)
-        return corr, p_value
+        return _pearson_fast(
+            np.asarray(aligned_sentiment, dtype=np.float64),
+            np.asarray(aligned_returns, dtype=np.float64),
+        )
     
     def get_sentiment_mode(self, result: LeadLagResult) -> SentimentMode:
         """
@@ -279,11 +609,4 @@ class SentimentCalibrator:
     
     def _insufficient_data_result(self) -> LeadLagResult:
         """Return result for insufficient data."""
-        return LeadLagResult(
-            optimal_lag_hours=0,
-            correlation=0.0,
-            p_value=1.0,
-            is_significant=False,
-            is_leading=False,
-            validation_passed=False,
-        )
+        return _INSUFFICIENT_RESULT
@@ -1,5 +1,5 @@
 """Sentiment decay modeling."""
 
-from src.sentiment.decay.exponential import ExponentialDecayModel
+from src.sentiment.decay.exponential import ExponentialDecayModel, ExponentialDecayPool
 
-__all__ = ["ExponentialDecayModel"]
+__all__ = ["ExponentialDecayModel", "ExponentialDecayPool"]
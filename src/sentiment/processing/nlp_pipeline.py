@@ -5,18 +5,49 @@ Uses FinBERT (financial BERT) for domain-specific sentiment analysis.
 Processes Reddit/Twitter text and extracts sentiment scores.
 """
 
+from collections import OrderedDict, deque
 from typing import Optional
+import hashlib
+import re
+import threading
+import numpy as np
 import structlog
 
+logger = structlog.get_logger(__name__)
+
 try:
     from transformers import AutoTokenizer, AutoModelForSequenceClassification
     import torch
+    import torch.nn.functional as F
     TRANSFORMERS_AVAILABLE = True
 except ImportError:
     TRANSFORMERS_AVAILABLE = False
     logger.warning("transformers not available - sentiment analysis will be limited")
 
-logger = structlog.get_logger(__name__)
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    OPTIMUM_AVAILABLE = False
+
+# Inference backends for the FinBERT encoder
+BACKENDS = ("eager", "compile", "onnx")
+
+# Keywords for the basic (no FinBERT) fallback
+POSITIVE_KEYWORDS = (
+    "bullish", "buy", "long", "moon", "rocket", "gains",
+    "profit", "win", "up", "rise", "surge", "rally",
+)
+NEGATIVE_KEYWORDS = (
+    "bearish", "sell", "short", "crash", "drop", "loss",
+    "down", "fall", "decline", "dump", "bear",
+)
+
+# One pass over the text: group 1 matches positive, group 2 negative keywords
+_KEYWORD_RE = re.compile(
+    r"\b(?:(" + "|".join(map(re.escape, POSITIVE_KEYWORDS))
+    + r")|(" + "|".join(map(re.escape, NEGATIVE_KEYWORDS)) + r"))\b"
+)
 
 
 class SentimentPipeline:
@@ -28,10 +59,29 @@ class SentimentPipeline:
     general-purpose sentiment models for market-related text.
     """
     
+    # FinBERT output order and the sentiment sign of each label
+    LABELS = ("positive", "negative", "neutral")
+    LABEL_SIGNS = (1.0, -1.0, 0.0)
+    
+    # Texts per forward pass in batch mode
+    BATCH_SIZE = 32
+    
+    # Padded sequence lengths for compiled/ONNX backends (one graph per bucket)
+    SEQUENCE_BUCKETS = (128, 256, 512)
+    
+    # FinBERT results kept for repeated texts (~5 MB, about a day of Reddit posts)
+    RESULT_CACHE_SIZE = 10_000
+    
+    # Process-wide pipelines from get_shared, by class and constructor arguments
+    _shared: dict[tuple, "SentimentPipeline"] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(
         self,
         model_name: str = "ProsusAI/finbert",
         use_gpu: bool = False,
+        dtype: Optional["torch.dtype"] = None,
+        backend: str = "eager",
     ):
         """
         Initialize sentiment pipeline.
@@ -39,7 +89,27 @@ class SentimentPipeline:
         Args:
             model_name: HuggingFace model name (default: FinBERT)
             use_gpu: Use GPU if available
+            dtype: Inference dtype on GPU (default: bfloat16). CPU always
+                runs in float32.
+            backend: "eager" (HuggingFace model as is), "compile"
+                (torch.compile) or "onnx" (ONNX Runtime via optimum)
         """
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        if backend == "onnx" and not OPTIMUM_AVAILABLE:
+            logger.warning("optimum_not_available_using_eager")
+            backend = "eager"
+        
+        self.backend = backend
+        self.dtype = None
+        
+        # Side stream for host-to-device copies of the next batch (CUDA only)
+        self._copy_stream = None
+        
+        # FinBERT results by text digest, least recently used first
+        self._result_cache: OrderedDict[bytes, dict] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
         if not TRANSFORMERS_AVAILABLE:
             logger.warning("transformers_not_available_using_basic_sentiment")
             self.model = None
@@ -47,16 +117,51 @@ class SentimentPipeline:
             self.device = "cpu"
         else:
             try:
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
                 self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
-                self.model.to(self.device)
-                self.model.eval()
+                if self.device == "cuda":
+                    # Half precision weights and TF32 for any remaining float32 matmuls
+                    self.dtype = dtype or torch.bfloat16
+                    torch.set_float32_matmul_precision("high")
+                else:
+                    self.dtype = torch.float32
+                
+                # Rust tokenizer; tokenization dominates for a model this small
+                self.tokenizer = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+                if not getattr(self.tokenizer, "is_fast", False):
+                    logger.warning("slow_tokenizer_loaded", model=model_name)
+                if backend == "onnx":
+                    # Exported graph runs in float32; autocast does not apply
+                    self.dtype = torch.float32
+                    self.model = ORTModelForSequenceClassification.from_pretrained(
+                        model_name,
+                        export=True,
+                        provider=(
+                            "CUDAExecutionProvider"
+                            if self.device == "cuda"
+                            else "CPUExecutionProvider"
+                        ),
+                    )
+                else:
+                    self.model = AutoModelForSequenceClassification.from_pretrained(
+                        model_name, torch_dtype=self.dtype
+                    )
+                    self.model.to(self.device)
+                    self.model.eval()
+                    if self.device == "cuda":
+                        self._copy_stream = torch.cuda.Stream()
+                    
+                    if backend == "compile":
+                        self.model = torch.compile(
+                            self.model, mode="reduce-overhead", fullgraph=False
+                        )
+                        self._warm_up()
                 
                 logger.info(
                     "sentiment_pipeline_initialized",
                     model=model_name,
                     device=self.device,
+                    dtype=str(self.dtype),
+                    backend=backend,
                 )
             except Exception as e:
                 logger.error("sentiment_model_load_failed", error=str(e))
@@ -64,6 +169,53 @@ class SentimentPipeline:
                 self.tokenizer = None
                 self.device = "cpu"
     
+    @classmethod
+    def get_shared(
+        cls,
+        model_name: str = "ProsusAI/finbert",
+        use_gpu: bool = True,
+        dtype: Optional["torch.dtype"] = None,
+        backend: str = "eager",
+    ) -> "SentimentPipeline":
+        """
+        Process-wide pipeline for the given settings.
+        
+        Symbols and scraper threads should share one instance rather than
+        each loading its own copy of the FinBERT weights. The first call
+        loads the model and, on CUDA, runs a full-size warm-up batch so
+        kernel selection is not paid by the first real request.
+        
+        Args:
+            model_name: HuggingFace model name (default: FinBERT)
+            use_gpu: Use GPU if available
+            dtype: Inference dtype on GPU (default: bfloat16)
+            backend: "eager", "compile" or "onnx"
+        """
+        key = (cls, model_name, use_gpu, dtype, backend)
+        with cls._shared_lock:
+            pipeline = cls._shared.get(key)
+            if pipeline is None:
+                pipeline = cls(model_name, use_gpu=use_gpu, dtype=dtype, backend=backend)
+                loaded_on_gpu = pipeline.model is not None and pipeline.device == "cuda"
+                # Compiled models are already warmed up per bucket in __init__
+                if loaded_on_gpu and pipeline.backend == "eager":
+                    pipeline._warm_up(buckets=pipeline.SEQUENCE_BUCKETS[-1:])
+                cls._shared[key] = pipeline
+        return pipeline
+    
+    @classmethod
+    def release_shared(cls) -> None:
+        """
+        Drop all shared pipelines and return their GPU memory.
+        
+        Cached CUDA blocks are only released once no pipeline holds them,
+        so empty_cache is called here rather than between batches.
+        """
+        with cls._shared_lock:
+            cls._shared.clear()
+        if TRANSFORMERS_AVAILABLE and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    
     def analyze_sentiment(
         self,
         text: str,
@@ -72,7 +224,8 @@ class SentimentPipeline:
         Analyze sentiment of text.
         
         Returns:
-            Dictionary with sentiment score and label
+            Dictionary with sentiment score and label. FinBERT results are
+            cached per text and shared between calls; treat them as read-only.
         """
         if not text or len(text.strip()) == 0:
             return {
@@ -83,86 +236,263 @@ class SentimentPipeline:
         
         # Use FinBERT if available
         if self.model and self.tokenizer:
-            return self._analyze_with_finbert(text)
+            return self._analyze_with_cache([text])[0]
         else:
             # Fallback to basic sentiment
             return self._analyze_basic(text)
     
-    def _analyze_with_finbert(self, text: str) -> dict:
-        """Analyze sentiment using FinBERT."""
-        try:
-            import torch.nn.functional as F
-            
-            # Tokenize
-            inputs = self.tokenizer(
-                text,
-                return_tensors="pt",
-                truncation=True,
-                max_length=512,
-                padding=True,
-            ).to(self.device)
-            
-            # Get predictions
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probs = F.softmax(logits, dim=-1)
-            
-            # FinBERT labels: positive, negative, neutral
-            labels = ["positive", "negative", "neutral"]
-            scores = probs[0].cpu().numpy()
-            
-            # Get predicted label
-            predicted_idx = scores.argmax()
-            predicted_label = labels[predicted_idx]
-            confidence = float(scores[predicted_idx])
-            
-            # Calculate sentiment score (-1 to +1)
-            # positive = +1, negative = -1, neutral = 0
-            if predicted_label == "positive":
-                score = confidence
-            elif predicted_label == "negative":
-                score = -confidence
+    def analyze_sentiment_batch(
+        self,
+        texts: list[str],
+    ) -> list[dict]:
+        """
+        Analyze sentiment of many texts.
+        
+        With FinBERT, texts are run through the model in batches of
+        BATCH_SIZE instead of one forward pass each.
+        
+        Args:
+            texts: Texts to analyze
+        
+        Returns:
+            One result dictionary per text, in input order
+        """
+        results = [None] * len(texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if not text or len(text.strip()) == 0:
+                results[i] = {
+                    "score": 0.0,
+                    "label": "neutral",
+                    "confidence": 0.0,
+                }
             else:
-                score = 0.0
-            
-            return {
-                "score": score,
-                "label": predicted_label,
-                "confidence": confidence,
-                "probabilities": {
-                    "positive": float(scores[0]),
-                    "negative": float(scores[1]),
-                    "neutral": float(scores[2]),
-                },
-            }
+                pending.append(i)
+        
+        if self.model and self.tokenizer:
+            analyzed = self._analyze_with_cache([texts[i] for i in pending])
+        else:
+            analyzed = [self._analyze_basic(texts[i]) for i in pending]
+        
+        for i, result in zip(pending, analyzed):
+            results[i] = result
+        return results
+    
+    def _analyze_with_cache(self, texts: list[str]) -> list[dict]:
+        """
+        FinBERT results for texts, served from the result cache where possible.
+        
+        Only cache misses reach the model, each distinct text once. The
+        cache is locked for lookups and inserts only, not the forward pass.
+        """
+        results = [None] * len(texts)
+        misses: dict[bytes, list[int]] = {}
+        keys = [hashlib.blake2b(text.encode(), digest_size=16).digest() for text in texts]
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._result_cache.get(key)
+                if cached is not None:
+                    self._result_cache.move_to_end(key)
+                    results[i] = cached
+                else:
+                    misses.setdefault(key, []).append(i)
+        
+        if misses:
+            miss_keys = list(misses)
+            analyzed = self._analyze_with_finbert([texts[misses[key][0]] for key in miss_keys])
+            with self._cache_lock:
+                for key, result in zip(miss_keys, analyzed):
+                    for i in misses[key]:
+                        results[i] = result
+                    # Keyword fallbacks from a failed forward pass are not cached
+                    if "probabilities" in result:
+                        self._result_cache[key] = result
+                
+                while len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                    self._result_cache.popitem(last=False)
+        
+        return results
+    
+    def _analyze_with_finbert(self, texts: list[str]) -> list[dict]:
+        """
+        Analyze sentiment using FinBERT, batching texts of similar length.
+        
+        All texts are tokenized in one call; the same token ids give the
+        length ordering and are padded per batch for the forward pass.
+        
+        One batch is kept in flight: batch N+1 is padded and copied to the
+        device before batch N's probabilities are read back, so on CUDA the
+        host work overlaps the forward pass instead of waiting on it.
+        """
+        encoded = self.tokenizer(texts, truncation=True, max_length=512)
+        
+        order = list(range(len(texts)))
+        if len(texts) > self.BATCH_SIZE:
+            # Bucket by token length so each batch pads to a similar length
+            lengths = [len(ids) for ids in encoded["input_ids"]]
+            order.sort(key=lengths.__getitem__)
+        
+        results = [None] * len(texts)
+        in_flight = deque()
+        for start in range(0, len(order), self.BATCH_SIZE):
+            batch = order[start:start + self.BATCH_SIZE]
+            try:
+                features = {key: [values[i] for i in batch] for key, values in encoded.items()}
+                in_flight.append((batch, self._forward(features)))
+            except Exception as e:
+                self._fallback_batch(results, texts, batch, e)
+                continue
             
+            if len(in_flight) > 1:
+                self._collect_batch(results, texts, *in_flight.popleft())
+        
+        while in_flight:
+            self._collect_batch(results, texts, *in_flight.popleft())
+        
+        return results
+    
+    def _collect_batch(self, results: list, texts: list[str], batch: list[int], probs) -> None:
+        """Read back one batch's probabilities (waits for its forward pass)."""
+        try:
+            rows = probs.cpu().numpy()
         except Exception as e:
-            logger.error("finbert_analysis_error", error=str(e))
-            return self._analyze_basic(text)
+            # Asynchronous CUDA errors surface here rather than in _forward
+            self._fallback_batch(results, texts, batch, e)
+            return
+        
+        for i, scores in zip(batch, rows):
+            results[i] = self._scores_to_result(scores)
     
-    def _analyze_basic(self, text: str) -> dict:
+    def _fallback_batch(
+        self,
+        results: list,
+        texts: list[str],
+        batch: list[int],
+        error: Exception,
+    ) -> None:
+        """Score a failed batch with keyword matching."""
+        logger.error("finbert_analysis_error", error=str(error), batch_size=len(batch))
+        for i in batch:
+            results[i] = self._analyze_basic(texts[i])
+    
+    def _forward(self, encoded: dict) -> "torch.Tensor":
         """
-        Basic sentiment analysis (fallback).
+        Class probabilities from a single FinBERT forward pass.
         
-        Uses simple keyword matching when FinBERT is not available.
+        Args:
+            encoded: Unpadded tokenizer output for the batch (lists of ids)
+        
+        Returns:
+            One row of probabilities per text
+        """
+        if self.backend == "eager":
+            inputs = self.tokenizer.pad(encoded, padding=True, return_tensors="pt")
+        else:
+            # Pad to a fixed bucket so compiled graphs are reused across batches
+            longest = max(len(ids) for ids in encoded["input_ids"])
+            inputs = self.tokenizer.pad(
+                encoded,
+                padding="max_length",
+                max_length=self._bucket_length(longest),
+                return_tensors="pt",
+            )
+        
+        return self._run_model(self._to_device(inputs))
+    
+    def _to_device(self, inputs) -> dict:
+        """
+        Move padded inputs to the model device.
+        
+        On CUDA the host tensors are pinned and copied on a side stream; the
+        compute stream waits for the copy, so the forward pass still sees
+        complete inputs while earlier work keeps the GPU busy.
         """
-        text_lower = text.lower()
+        if self._copy_stream is None:
+            return inputs.to(self.device)
         
-        # Positive keywords
-        positive_keywords = [
-            "bullish", "buy", "long", "moon", "rocket", "gains",
-            "profit", "win", "up", "rise", "surge", "rally",
-        ]
+        with torch.cuda.stream(self._copy_stream):
+            on_device = {
+                key: tensor.pin_memory().to(self.device, non_blocking=True)
+                for key, tensor in inputs.items()
+            }
         
-        # Negative keywords
-        negative_keywords = [
-            "bearish", "sell", "short", "crash", "drop", "loss",
-            "down", "fall", "decline", "dump", "bear",
-        ]
+        compute = torch.cuda.current_stream()
+        compute.wait_stream(self._copy_stream)
+        for tensor in on_device.values():
+            # Keep the caching allocator from reusing the memory too early
+            tensor.record_stream(compute)
+        return on_device
+    
+    def _run_model(self, inputs) -> "torch.Tensor":
+        """Softmax of the model logits for already tokenized inputs."""
+        with torch.inference_mode(), torch.autocast(
+            device_type=self.device,
+            dtype=self.dtype,
+            enabled=self.device == "cuda" and self.backend != "onnx",
+        ):
+            logits = self.model(**inputs).logits
         
-        positive_count = sum(1 for kw in positive_keywords if kw in text_lower)
-        negative_count = sum(1 for kw in negative_keywords if kw in text_lower)
+        # Softmax in float32 whatever the model dtype
+        return F.softmax(logits.float(), dim=-1)
+    
+    def _bucket_length(self, length: int) -> int:
+        """Smallest sequence bucket that fits length tokens."""
+        for bucket in self.SEQUENCE_BUCKETS:
+            if length <= bucket:
+                return bucket
+        return self.SEQUENCE_BUCKETS[-1]
+    
+    def _warm_up(self, buckets: Optional[tuple[int, ...]] = None) -> None:
+        """
+        Run full BATCH_SIZE batches before the first real request.
+        
+        Compiles the model (compile backend) and lets CUDA pick its kernels
+        and size its allocator pool for the largest batches it will see.
+        
+        Args:
+            buckets: Sequence lengths to run (default: every bucket)
+        """
+        for bucket in buckets or self.SEQUENCE_BUCKETS:
+            shape = (self.BATCH_SIZE, bucket)
+            self._run_model({
+                "input_ids": torch.zeros(shape, dtype=torch.long, device=self.device),
+                "attention_mask": torch.ones(shape, dtype=torch.long, device=self.device),
+            })
+    
+    def _scores_to_result(self, scores) -> dict:
+        """Result dictionary for one row of FinBERT probabilities."""
+        # Get predicted label
+        predicted_idx = int(scores.argmax())
+        confidence = float(scores[predicted_idx])
+        
+        # Sentiment score (-1 to +1): positive = +1, negative = -1, neutral = 0
+        score = self.LABEL_SIGNS[predicted_idx] * confidence
+        
+        return {
+            "score": score,
+            "label": self.LABELS[predicted_idx],
+            "confidence": confidence,
+            "probabilities": {
+                "positive": float(scores[0]),
+                "negative": float(scores[1]),
+                "neutral": float(scores[2]),
+            },
+        }
+    
+    def _analyze_basic(self, text: str) -> dict:
+        """
+        Basic sentiment analysis (fallback).
+        
+        Uses simple keyword matching when FinBERT is not available.
+        Keywords match whole words and every occurrence counts.
+        """
+        positive_count = 0
+        negative_count = 0
+        for match in _KEYWORD_RE.finditer(text.lower()):
+            if match.lastindex == 1:
+                positive_count += 1
+            else:
+                negative_count += 1
         
         if positive_count > negative_count:
             score = min(0.5, positive_count / 10.0)
@@ -203,25 +533,32 @@ class SentimentPipeline:
                 "count": 0,
             }
         
-        import numpy as np
+        # One sorted copy gives the median and both sign counts (no masks)
+        scores = np.sort(np.asarray(sentiment_scores, dtype=np.float64))
+        n = scores.size
         
-        scores = np.array(sentiment_scores)
-        
-        if weights:
-            weights_array = np.array(weights)
-            weights_array = weights_array / weights_array.sum()  # Normalize
-            mean = np.average(scores, weights=weights_array)
+        unweighted_mean = scores.sum() / n
+        if weights is not None and len(weights) > 0:
+            # Sorting permuted the scores; weight the original order
+            weights_array = np.asarray(weights, dtype=np.float64)
+            mean = np.dot(weights_array, sentiment_scores) / weights_array.sum()
         else:
-            mean = np.mean(scores)
+            mean = unweighted_mean
+        
+        half = n // 2
+        median = scores[half] if n % 2 else (scores[half - 1] + scores[half]) / 2
+        
+        centered = scores - unweighted_mean
+        std = np.sqrt(np.dot(centered, centered) / n)
         
-        median = np.median(scores)
-        std = np.std(scores)
+        negative = np.searchsorted(scores, 0.0, side="left")
+        positive = n - np.searchsorted(scores, 0.0, side="right")
         
         return {
             "mean": float(mean),
             "median": float(median),
             "std": float(std),
-            "count": len(sentiment_scores),
-            "positive_ratio": float(np.sum(scores > 0) / len(scores)),
-            "negative_ratio": float(np.sum(scores < 0) / len(scores)),
+            "count": n,
+            "positive_ratio": float(positive / n),
+            "negative_ratio": float(negative / n),
         }
@@ -1,5 +1,17 @@
 """Sentiment data sources (Reddit, Twitter)."""
 
-from src.sentiment.sources.reddit_scraper import RedditScraper
+from src.sentiment.sources.reddit_scraper import (
+    AsyncRedditScraper,
+    RedditScraper,
+    RedditPost,
+    RedditComment,
+    posts_to_arrays,
+)
 
-__all__ = ["RedditScraper"]
+__all__ = [
+    "AsyncRedditScraper",
+    "RedditScraper",
+    "RedditPost",
+    "RedditComment",
+    "posts_to_arrays",
+]
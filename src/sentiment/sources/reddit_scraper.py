@@ -3,17 +3,147 @@ Reddit sentiment scraper.
 
 Scrapes Reddit posts/comments for sentiment about stocks.
 Includes manipulation detection to filter out pump-and-dump schemes.
+
+RedditScraper uses PRAW with one worker thread per subreddit;
+AsyncRedditScraper (needs asyncpraw) runs the same searches as
+coroutines on a single event loop.
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, list
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import ClassVar, Iterable, Iterator, Optional
+import asyncio
+import queue
+import re
+import threading
+import time
 import structlog
 
+import numpy as np
 import praw
 from praw.models import Submission, Comment
 
 logger = structlog.get_logger(__name__)
 
+try:
+    import asyncpraw
+    from asyncpraw.models import Comment as AsyncComment
+    ASYNCPRAW_AVAILABLE = True
+except ImportError:
+    ASYNCPRAW_AVAILABLE = False
+
+# Hype emoji; a title with this many or more is treated as a pump
+_HYPE_EMOJI_RE = re.compile("[🚀💎📈🌙🦍]")
+HYPE_EMOJI_THRESHOLD = 3
+
+# Scraped items buffered between subreddit workers and the consumer
+RESULT_QUEUE_SIZE = 256
+
+# Marks the end of one subreddit worker's results
+_DONE = object()
+
+
+@dataclass(frozen=True, slots=True)
+class RedditPost:
+    """A scraped Reddit submission."""
+    source: ClassVar[str] = "reddit"
+    subreddit: str
+    post_id: str
+    title: str
+    text: str
+    score: int
+    num_comments: int
+    created_utc: float  # Epoch seconds
+    url: str
+    symbol: Optional[str] = None
+    
+    @property
+    def created_at(self) -> datetime:
+        """Creation time as a local naive datetime."""
+        return datetime.fromtimestamp(self.created_utc)
+
+
+@dataclass(frozen=True, slots=True)
+class RedditComment:
+    """A scraped top-level comment on a Reddit submission."""
+    source: ClassVar[str] = "reddit"
+    subreddit: str
+    post_id: str
+    comment_id: str
+    text: str
+    score: int
+    created_utc: float  # Epoch seconds
+    symbol: Optional[str] = None
+    
+    @property
+    def created_at(self) -> datetime:
+        """Creation time as a local naive datetime."""
+        return datetime.fromtimestamp(self.created_utc)
+
+
+def _is_manipulation(submission, now_ts: Optional[float] = None) -> bool:
+    """
+    Detect potential manipulation/pump-and-dump.
+    
+    now_ts is the current epoch time; scrapes pass one value for all
+    posts instead of reading the clock per post.
+    
+    Heuristics:
+    - New account (< 30 days old)
+    - Suspicious patterns (all caps, excessive emojis)
+    - Coordinated posting (same user posting multiple times)
+    - Low karma relative to post score
+    """
+    # Check account age
+    if submission.author:
+        if now_ts is None:
+            now_ts = time.time()
+        account_age_days = (now_ts - submission.author.created_utc) / 86400
+        if account_age_days < 30:
+            return True
+    
+    # Check for suspicious patterns: excessive emoji (one scan), pump phrases
+    if len(_HYPE_EMOJI_RE.findall(submission.title)) >= HYPE_EMOJI_THRESHOLD:
+        return True
+    
+    title_lower = submission.title.lower()
+    if "to the moon" in title_lower or (
+        "diamond hands" in title_lower and submission.score > 1000
+    ):
+        return True
+    
+    # Check karma ratio (low karma but high score = suspicious)
+    if submission.author and submission.score > 100:
+        if submission.author.link_karma < 100 and submission.score > 500:
+            return True
+    
+    return False
+
+
+def posts_to_arrays(items: Iterable[RedditPost | RedditComment]) -> dict[str, np.ndarray]:
+    """
+    Contiguous per-field arrays for vectorized processing.
+    
+    Ages for ExponentialDecayModel.apply_decay_batch are
+    (now - arrays["created_utc"]) / 3600.
+    
+    Args:
+        items: Scraped posts and/or comments
+    
+    Returns:
+        {"created_utc": float64 epoch seconds, "score": float64}
+    """
+    items = list(items)
+    return {
+        "created_utc": np.fromiter(
+            (item.created_utc for item in items), dtype=np.float64, count=len(items)
+        ),
+        "score": np.fromiter(
+            (item.score for item in items), dtype=np.float64, count=len(items)
+        ),
+    }
+
 
 class RedditScraper:
     """
@@ -44,11 +174,12 @@ class RedditScraper:
             user_agent: User agent string (required by Reddit API)
             subreddits: List of subreddits to scrape
         """
-        self.reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent,
-        )
+        self._credentials = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "user_agent": user_agent,
+        }
+        self.reddit = praw.Reddit(**self._credentials)
         
         self.subreddits = subreddits or [
             "wallstreetbets",
@@ -57,6 +188,14 @@ class RedditScraper:
             "options",
         ]
         
+        # Subreddits are searched concurrently. PRAW instances are not thread
+        # safe, so each worker thread lazily creates and keeps its own client.
+        self._executor = ThreadPoolExecutor(
+            max_workers=len(self.subreddits),
+            thread_name_prefix="reddit",
+        )
+        self._local = threading.local()
+        
         logger.info(
             "reddit_scraper_initialized",
             subreddits=self.subreddits,
@@ -67,160 +206,438 @@ class RedditScraper:
         symbol: str,
         lookback_hours: int = 24,
         max_posts: int = 100,
-    ) -> list[dict]:
+    ) -> Iterator[RedditPost | RedditComment]:
         """
-        Scrape Reddit for mentions of a symbol.
+        Scrape Reddit for mentions of a symbol, yielding results as they arrive.
+        
+        Subreddits are searched concurrently and items are yielded as soon
+        as any subreddit produces them, so processing can overlap with the
+        network wait. Order is kept within a subreddit, not across them.
+        Closing the generator early stops the workers.
         
         Args:
             symbol: Stock symbol (e.g., "AAPL")
             lookback_hours: How far back to look
             max_posts: Maximum posts to return
         
-        Returns:
-            List of post/comment dictionaries with sentiment data
+        Yields:
+            RedditPost for each submission, followed by its RedditComments
         """
-        results = []
-        cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
+        # Epoch seconds, compared directly against created_utc
+        now_ts = time.time()
+        cutoff_ts = now_ts - lookback_hours * 3600
+        limit = max_posts // len(self.subreddits)
         
-        # Search across all subreddits
+        results: queue.Queue = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+        cancelled = threading.Event()
         for subreddit_name in self.subreddits:
+            self._executor.submit(
+                self._scrape_into,
+                results,
+                cancelled,
+                subreddit_name,
+                symbol,
+                cutoff_ts,
+                now_ts,
+                limit,
+            )
+        
+        try:
+            remaining = len(self.subreddits)
+            count = 0
+            while remaining:
+                item = results.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                count += 1
+                yield item
+            
+            logger.info(
+                "reddit_scrape_complete",
+                symbol=symbol,
+                results_count=count,
+            )
+        finally:
+            cancelled.set()
+    
+    def scrape_symbol_list(
+        self,
+        symbol: str,
+        lookback_hours: int = 24,
+        max_posts: int = 100,
+    ) -> list[RedditPost | RedditComment]:
+        """Scrape Reddit for mentions of a symbol; see scrape_symbol."""
+        return list(self.scrape_symbol(symbol, lookback_hours, max_posts))
+    
+    def close(self) -> None:
+        """Stop the subreddit worker threads."""
+        self._executor.shutdown(wait=True)
+    
+    def _thread_client(self) -> praw.Reddit:
+        """Reddit client owned by the calling thread."""
+        client = getattr(self._local, "reddit", None)
+        if client is None:
+            client = praw.Reddit(**self._credentials)
+            self._local.reddit = client
+        return client
+    
+    def _scrape_into(
+        self,
+        results: queue.Queue,
+        cancelled: threading.Event,
+        subreddit_name: str,
+        symbol: str,
+        cutoff_ts: float,
+        now_ts: float,
+        limit: int,
+    ) -> None:
+        """Worker: push one subreddit's items, then _DONE, unless the consumer quit."""
+        try:
+            for item in self._scrape_subreddit(
+                subreddit_name, symbol, cutoff_ts, now_ts, limit
+            ):
+                if not self._put(results, cancelled, item):
+                    return
+        finally:
+            self._put(results, cancelled, _DONE)
+    
+    @staticmethod
+    def _put(results: queue.Queue, cancelled: threading.Event, item) -> bool:
+        """Block until item is queued; False if the consumer went away first."""
+        while not cancelled.is_set():
             try:
-                subreddit = self.reddit.subreddit(subreddit_name)
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _scrape_subreddit(
+        self,
+        subreddit_name: str,
+        symbol: str,
+        cutoff_ts: float,
+        now_ts: float,
+        limit: int,
+    ) -> Iterator[RedditPost | RedditComment]:
+        """
+        Scrape one subreddit for mentions of a symbol.
+        
+        cutoff_ts and now_ts are epoch seconds fixed once per scrape.
+        
+        Errors are logged and end the subreddit's results, so one failing
+        subreddit does not affect the others.
+        """
+        try:
+            subreddit = self._thread_client().subreddit(subreddit_name)
+            
+            # Search for symbol mentions
+            query = f"${symbol} OR {symbol}"
+            
+            for submission in subreddit.search(
+                query,
+                sort="new",
+                limit=limit,
+            ):
+                # Reject stale posts with one float compare, before the author
+                # lookup in _is_manipulation or any record is built
+                created_utc = submission.created_utc
+                if created_utc < cutoff_ts:
+                    continue
                 
-                # Search for symbol mentions
-                query = f"${symbol} OR {symbol}"
+                # Check for manipulation
+                if self._is_manipulation(submission, now_ts):
+                    logger.debug(
+                        "manipulation_detected",
+                        submission_id=submission.id,
+                        symbol=symbol,
+                    )
+                    continue
                 
-                for submission in subreddit.search(
-                    query,
-                    sort="new",
-                    limit=max_posts // len(self.subreddits),
-                ):
-                    # Check if post is recent enough
-                    post_time = datetime.fromtimestamp(submission.created_utc)
-                    if post_time < cutoff_time:
-                        continue
-                    
-                    # Check for manipulation
-                    if self._is_manipulation(submission):
-                        logger.debug(
-                            "manipulation_detected",
-                            submission_id=submission.id,
+                # Extract sentiment data
+                yield RedditPost(
+                    subreddit=subreddit_name,
+                    post_id=submission.id,
+                    title=submission.title,
+                    text=submission.selftext,
+                    score=submission.score,
+                    num_comments=submission.num_comments,
+                    created_utc=created_utc,
+                    url=submission.url,
+                    symbol=symbol,
+                )
+                
+                # Also scrape top comments
+                submission.comments.replace_more(limit=0)
+                for comment in submission.comments[:10]:  # Top 10 comments
+                    if isinstance(comment, Comment):
+                        yield RedditComment(
+                            subreddit=subreddit_name,
+                            post_id=submission.id,
+                            comment_id=comment.id,
+                            text=comment.body,
+                            score=comment.score,
+                            created_utc=comment.created_utc,
                             symbol=symbol,
                         )
-                        continue
-                    
-                    # Extract sentiment data
-                    post_data = {
-                        "source": "reddit",
-                        "subreddit": subreddit_name,
-                        "post_id": submission.id,
-                        "title": submission.title,
-                        "text": submission.selftext,
-                        "score": submission.score,
-                        "num_comments": submission.num_comments,
-                        "created_at": post_time,
-                        "url": submission.url,
-                        "symbol": symbol,
-                    }
-                    
-                    results.append(post_data)
-                    
-                    # Also scrape top comments
-                    submission.comments.replace_more(limit=0)
-                    for comment in submission.comments.list()[:10]:  # Top 10 comments
-                        if isinstance(comment, Comment):
-                            comment_data = {
-                                "source": "reddit",
-                                "subreddit": subreddit_name,
-                                "post_id": submission.id,
-                                "comment_id": comment.id,
-                                "text": comment.body,
-                                "score": comment.score,
-                                "created_at": datetime.fromtimestamp(comment.created_utc),
-                                "symbol": symbol,
-                            }
-                            results.append(comment_data)
+        
+        except Exception as e:
+            logger.error(
+                "reddit_scrape_error",
+                subreddit=subreddit_name,
+                symbol=symbol,
+                error=str(e),
+            )
+    
+    def _is_manipulation(
+        self,
+        submission: Submission,
+        now_ts: Optional[float] = None,
+    ) -> bool:
+        """Detect potential manipulation/pump-and-dump; see _is_manipulation."""
+        return _is_manipulation(submission, now_ts)
+    
+    def get_hot_posts(
+        self,
+        subreddit_name: str,
+        limit: int = 25,
+    ) -> list[RedditPost]:
+        """Get hot posts from a subreddit."""
+        try:
+            subreddit = self.reddit.subreddit(subreddit_name)
+            posts = []
             
-            except Exception as e:
-                logger.error(
-                    "reddit_scrape_error",
+            for submission in subreddit.hot(limit=limit):
+                posts.append(RedditPost(
                     subreddit=subreddit_name,
-                    symbol=symbol,
-                    error=str(e),
-                )
+                    post_id=submission.id,
+                    title=submission.title,
+                    text=submission.selftext,
+                    score=submission.score,
+                    num_comments=submission.num_comments,
+                    created_utc=submission.created_utc,
+                    url=submission.url,
+                ))
+            
+            return posts
+            
+        except Exception as e:
+            logger.error(
+                "reddit_hot_posts_error",
+                subreddit=subreddit_name,
+                error=str(e),
+            )
+            return []
+
+
+class AsyncRedditScraper:
+    """
+    Scrapes Reddit for sentiment data with asyncpraw.
+    
+    Same searches, filters and records as RedditScraper, but all
+    subreddits are queried concurrently as coroutines on one event loop
+    instead of one thread each. Requires the optional asyncpraw package.
+    """
+    
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        user_agent: str,
+        subreddits: Optional[list[str]] = None,
+    ):
+        """
+        Initialize async Reddit scraper.
+        
+        Args:
+            client_id: Reddit API client ID
+            client_secret: Reddit API client secret
+            user_agent: User agent string (required by Reddit API)
+            subreddits: List of subreddits to scrape
+        
+        Raises:
+            ImportError: If asyncpraw is not installed
+        """
+        if not ASYNCPRAW_AVAILABLE:
+            raise ImportError(
+                "AsyncRedditScraper requires asyncpraw (pip install asyncpraw)"
+            )
+        
+        self._credentials = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "user_agent": user_agent,
+        }
+        
+        # asyncpraw's HTTP session is bound to the event loop that first uses
+        # it, so the client is created lazily inside the running loop
+        self.reddit = None
+        
+        self.subreddits = subreddits or [
+            "wallstreetbets",
+            "stocks",
+            "investing",
+            "options",
+        ]
         
         logger.info(
-            "reddit_scrape_complete",
-            symbol=symbol,
-            results_count=len(results),
+            "async_reddit_scraper_initialized",
+            subreddits=self.subreddits,
         )
+    
+    async def scrape_symbol(
+        self,
+        symbol: str,
+        lookback_hours: int = 24,
+        max_posts: int = 100,
+    ) -> list[RedditPost | RedditComment]:
+        """
+        Scrape Reddit for mentions of a symbol.
         
-        return results
+        All subreddits are searched concurrently; total latency is bound by
+        the slowest subreddit rather than the sum.
+        
+        Args:
+            symbol: Stock symbol (e.g., "AAPL")
+            lookback_hours: How far back to look
+            max_posts: Maximum posts to return
+        
+        Returns:
+            RedditPosts, each followed by its RedditComments, grouped by
+            subreddit in self.subreddits order
+        """
+        if self.reddit is None:
+            self.reddit = asyncpraw.Reddit(**self._credentials)
+        return await self._scrape(self.reddit, symbol, lookback_hours, max_posts)
     
-    def _is_manipulation(self, submission: Submission) -> bool:
+    def scrape_symbol_sync(
+        self,
+        symbol: str,
+        lookback_hours: int = 24,
+        max_posts: int = 100,
+    ) -> list[RedditPost | RedditComment]:
         """
-        Detect potential manipulation/pump-and-dump.
+        Blocking scrape_symbol for callers without an event loop.
         
-        Heuristics:
-        - New account (< 30 days old)
-        - Suspicious patterns (all caps, excessive emojis)
-        - Coordinated posting (same user posting multiple times)
-        - Low karma relative to post score
+        Runs its own event loop with a client that is closed afterwards;
+        must not be called from inside a running loop.
         """
-        # Check account age
-        if submission.author:
-            account_age_days = (datetime.now().timestamp() - submission.author.created_utc) / 86400
-            if account_age_days < 30:
-                return True
+        async def run():
+            async with asyncpraw.Reddit(**self._credentials) as reddit:
+                return await self._scrape(reddit, symbol, lookback_hours, max_posts)
         
-        # Check for suspicious patterns
-        title_lower = submission.title.lower()
-        suspicious_patterns = [
-            "🚀" * 3,  # Excessive rockets
-            "to the moon" in title_lower,
-            "diamond hands" in title_lower and submission.score > 1000,
-        ]
+        return asyncio.run(run())
+    
+    async def close(self) -> None:
+        """Close the client's HTTP session."""
+        if self.reddit is not None:
+            await self.reddit.close()
+            self.reddit = None
+    
+    async def _scrape(
+        self,
+        reddit,
+        symbol: str,
+        lookback_hours: int,
+        max_posts: int,
+    ) -> list[RedditPost | RedditComment]:
+        """Search every subreddit concurrently with the given client."""
+        # Epoch seconds, compared directly against created_utc
+        now_ts = time.time()
+        cutoff_ts = now_ts - lookback_hours * 3600
+        limit = max_posts // len(self.subreddits)
         
-        if any(submission.title.count(pattern) > 0 for pattern in ["🚀", "💎", "📈"] * 3):
-            return True
+        per_subreddit = await asyncio.gather(*(
+            self._scrape_subreddit(reddit, subreddit_name, symbol, cutoff_ts, now_ts, limit)
+            for subreddit_name in self.subreddits
+        ))
+        results = [item for items in per_subreddit for item in items]
         
-        # Check karma ratio (low karma but high score = suspicious)
-        if submission.author and submission.score > 100:
-            if submission.author.link_karma < 100 and submission.score > 500:
-                return True
+        logger.info(
+            "reddit_scrape_complete",
+            symbol=symbol,
+            results_count=len(results),
+        )
         
-        return False
+        return results
     
-    def get_hot_posts(
+    async def _scrape_subreddit(
         self,
+        reddit,
         subreddit_name: str,
-        limit: int = 25,
-    ) -> list[dict]:
-        """Get hot posts from a subreddit."""
+        symbol: str,
+        cutoff_ts: float,
+        now_ts: float,
+        limit: int,
+    ) -> list[RedditPost | RedditComment]:
+        """
+        Scrape one subreddit for mentions of a symbol.
+        
+        Errors are logged and end the subreddit's results, so one failing
+        subreddit does not affect the others.
+        """
+        results = []
         try:
-            subreddit = self.reddit.subreddit(subreddit_name)
-            posts = []
-            
-            for submission in subreddit.hot(limit=limit):
-                post_data = {
-                    "source": "reddit",
-                    "subreddit": subreddit_name,
-                    "post_id": submission.id,
-                    "title": submission.title,
-                    "text": submission.selftext,
-                    "score": submission.score,
-                    "num_comments": submission.num_comments,
-                    "created_at": datetime.fromtimestamp(submission.created_utc),
-                    "url": submission.url,
-                }
-                posts.append(post_data)
+            subreddit = await reddit.subreddit(subreddit_name)
             
-            return posts
+            # Search for symbol mentions
+            query = f"${symbol} OR {symbol}"
             
+            async for submission in subreddit.search(
+                query,
+                sort="new",
+                limit=limit,
+            ):
+                # Reject stale posts before any further request
+                created_utc = submission.created_utc
+                if created_utc < cutoff_ts:
+                    continue
+                
+                # asyncpraw authors are lazy; fetch before the age/karma checks
+                if submission.author:
+                    await submission.author.load()
+                if _is_manipulation(submission, now_ts):
+                    logger.debug(
+                        "manipulation_detected",
+                        submission_id=submission.id,
+                        symbol=symbol,
+                    )
+                    continue
+                
+                results.append(RedditPost(
+                    subreddit=subreddit_name,
+                    post_id=submission.id,
+                    title=submission.title,
+                    text=submission.selftext,
+                    score=submission.score,
+                    num_comments=submission.num_comments,
+                    created_utc=created_utc,
+                    url=submission.url,
+                    symbol=symbol,
+                ))
+                
+                # Also scrape top comments
+                await submission.load()
+                await submission.comments.replace_more(limit=0)
+                for comment in submission.comments[:10]:  # Top 10 comments
+                    if isinstance(comment, AsyncComment):
+                        results.append(RedditComment(
+                            subreddit=subreddit_name,
+                            post_id=submission.id,
+                            comment_id=comment.id,
+                            text=comment.body,
+                            score=comment.score,
+                            created_utc=comment.created_utc,
+                            symbol=symbol,
+                        ))
+        
         except Exception as e:
             logger.error(
-                "reddit_hot_posts_error",
+                "reddit_scrape_error",
                 subreddit=subreddit_name,
+                symbol=symbol,
                 error=str(e),
             )
-            return []
+        
+        return results
@@ -9,8 +9,8 @@ This architecture eliminates the SQLite concurrency bottleneck
 identified in the adversarial review.
 """
 
-from src.storage.append_log import AppendOnlyLog, Event
+from src.storage.append_log import AppendOnlyLog, BufferedEventWriter, Event
 from src.storage.duckdb_store import DuckDBStore
 from src.storage.redis_state import RedisStateStore
 
-__all__ = ["AppendOnlyLog", "Event", "DuckDBStore", "RedisStateStore"]
+__all__ = ["AppendOnlyLog", "BufferedEventWriter", "Event", "DuckDBStore", "RedisStateStore"]
@@ -2,29 +2,150 @@
 Append-only log for high-throughput event capture.
 
 This is the primary write path for all events (market data, sentiment, orders).
-It uses simple file appending with no locks, enabling concurrent writes
-from multiple sources without the SQLite bottleneck.
+It uses simple file appending with no per-write locks, so any number of threads
+in the writing process can log concurrently without the SQLite bottleneck.
+
+Each log has a single writer, one AppendOnlyLog in one process: the open
+descriptor and the size used for rotation belong to that instance, so a second
+writer would keep appending to a file the first had rotated away. The first
+write claims the log (an exclusive flock on ``<log>.lock``); writes through any
+other instance or process, forked children included, raise RuntimeError until
+the writer is closed. Other instances and processes may still read it.
 
 Events are later batch-ETL'd to DuckDB for analytics.
 """
 
-import json
+import atexit
+import itertools
+import threading
 import os
+import time
+import weakref
 import gzip
 import shutil
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
+from collections import deque
 from pathlib import Path
 from typing import Any, Optional
 from threading import Lock
 from enum import Enum
 import structlog
 
+import orjson
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    # Windows: the single-writer rule is not enforced
+    FCNTL_AVAILABLE = False
+
 logger = structlog.get_logger(__name__)
 
+# Buffers per writev() call (IOV_MAX on Linux and macOS)
+_IOV_MAX = 1024
+
+# Read size when compressing a rotated file
+_ROTATION_COPY_BUFFER = 1024 * 1024
+
+# Event IDs: process-local sequence plus pid, instead of a uuid4 per event
+_EVENT_SEQ = itertools.count()
+_PID = os.getpid()
+
+
+def _reset_event_ids_after_fork() -> None:
+    """Give a forked child its own pid in event IDs and a fresh sequence."""
+    global _EVENT_SEQ, _PID
+    _EVENT_SEQ = itertools.count()
+    _PID = os.getpid()
+
 
-class EventType(Enum):
-    """Types of events that can be logged."""
+# Writer locks held by this process, by resolved log path: [lock fd, writer].
+# One AppendOnlyLog writes each path: the descriptor, byte counter and
+# rotation sequence are per instance, so a second writer would keep appending
+# to a file the first had rotated away. The writer is held weakly, so a log
+# dropped without close() does not keep the path claimed.
+_WRITER_LOCKS: dict[str, list] = {}
+_WRITER_LOCKS_GUARD = Lock()
+
+
+def _acquire_writer_lock(log: "AppendOnlyLog") -> None:
+    """
+    Make an AppendOnlyLog the writer of its path.
+    
+    Raises:
+        RuntimeError: If another log in this process, or another process,
+            is writing to the path
+    """
+    key = os.path.realpath(log.log_path)
+    with _WRITER_LOCKS_GUARD:
+        held = _WRITER_LOCKS.get(key)
+        if held is not None:
+            writer = held[1]()
+            if writer is not None and writer is not log:
+                raise RuntimeError(
+                    f"Append log {log.log_path} already has a writer in this process "
+                    "(one AppendOnlyLog per log path)"
+                )
+            held[1] = weakref.ref(log)
+            return
+        
+        fd = None
+        if FCNTL_AVAILABLE:
+            fd = os.open(f"{log.log_path}.lock", os.O_WRONLY | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                raise RuntimeError(
+                    f"Append log {log.log_path} is written by another process "
+                    "(one writer process per log)"
+                ) from None
+        _WRITER_LOCKS[key] = [fd, weakref.ref(log)]
+
+
+def _release_writer_lock(log: "AppendOnlyLog") -> None:
+    """Unlock the log's path if this log is its writer."""
+    key = os.path.realpath(log.log_path)
+    with _WRITER_LOCKS_GUARD:
+        held = _WRITER_LOCKS.get(key)
+        if held is None or held[1]() is not log:
+            return
+        del _WRITER_LOCKS[key]
+        if held[0] is not None:
+            os.close(held[0])
+
+
+def _drop_writer_locks_after_fork() -> None:
+    """A forked child does not inherit its parent's writer role."""
+    global _WRITER_LOCKS_GUARD
+    _WRITER_LOCKS_GUARD = Lock()
+    # Closing the child's copies leaves the parent's flocks in place
+    for fd, _ in _WRITER_LOCKS.values():
+        if fd is not None:
+            os.close(fd)
+    _WRITER_LOCKS.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_event_ids_after_fork)
+    os.register_at_fork(after_in_child=_drop_writer_locks_after_fork)
+
+# orjson options for event lines: NumPy values in data are serialized natively.
+# Non-string keys need OPT_NON_STR_KEYS, which is slower for every dict, so it
+# is only used for the events that actually have them.
+_ORJSON_LINE_OPTS = orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY
+_ORJSON_LINE_OPTS_NON_STR_KEYS = _ORJSON_LINE_OPTS | orjson.OPT_NON_STR_KEYS
+
+
+class EventType(str, Enum):
+    """
+    Types of events that can be logged.
+    
+    Members are strings (EventType.QUOTE == "quote"), so they serialize
+    as their value without a .value lookup.
+    """
     # Market data events
     QUOTE = "quote"
     BAR = "bar"
@@ -54,7 +175,7 @@ class EventType(Enum):
     ERROR = "error"
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """
     A single event to be logged.
@@ -77,16 +198,18 @@ class Event:
     def __post_init__(self):
         """Generate event ID if not provided."""
         if not self.event_id:
-            # Simple event ID: timestamp + type + random suffix
-            import uuid
-            ts = self.timestamp.strftime("%Y%m%d%H%M%S%f")
-            self.event_id = f"{ts}_{self.event_type.value}_{uuid.uuid4().hex[:8]}"
+            # Epoch microseconds + type + pid + per-process sequence: unique
+            # without a random source, and cheap on the ingestion path
+            micros = int(self.timestamp.timestamp() * 1e6)
+            self.event_id = (
+                f"{micros}_{self.event_type.value}_{_PID}_{next(_EVENT_SEQ)}"
+            )
     
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
             "event_id": self.event_id,
-            "event_type": self.event_type.value,
+            "event_type": self.event_type,
             "timestamp": self.timestamp.isoformat(),
             "symbol": self.symbol,
             "source": self.source,
@@ -95,8 +218,26 @@ class Event:
         }
     
     def to_json(self) -> str:
-        """Convert to JSON string."""
-        return json.dumps(self.to_dict())
+        """Convert to JSON string (no trailing newline)."""
+        return self.to_json_bytes()[:-1].decode()
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to a newline-terminated JSON line (orjson, UTF-8 bytes)."""
+        line = {
+            "event_id": self.event_id,
+            "event_type": self.event_type,
+            # orjson writes the same RFC 3339 text as isoformat(), natively
+            "timestamp": self.timestamp,
+            "symbol": self.symbol,
+            "source": self.source,
+            "correlation_id": self.correlation_id,
+            "data": self.data,
+        }
+        try:
+            return orjson.dumps(line, option=_ORJSON_LINE_OPTS)
+        except TypeError:
+            # e.g. int keys in data; still raises if data is not serializable
+            return orjson.dumps(line, option=_ORJSON_LINE_OPTS_NON_STR_KEYS)
     
     @classmethod
     def from_dict(cls, d: dict[str, Any]) -> "Event":
@@ -118,13 +259,19 @@ class AppendOnlyLog:
     
     Design principles:
     - Append-only: No updates, no deletes
-    - No locks on writes (thread-safe via file append semantics)
+    - One writing instance per log, claimed on its first write
+    - No locks on writes (one O_APPEND descriptor; each write() lands whole)
     - Simple JSONL format for easy parsing
     - Automatic rotation when file gets too large
     - Compression of rotated files
     
     This avoids the SQLite single-writer bottleneck that would
     cause latency issues under high-throughput sentiment ingestion.
+    
+    With batch_mode, write() only serializes the event and queues the
+    line; a background thread appends queued lines with one writev()
+    per max_batch lines every flush_interval_ms. Call flush() before
+    reading back and close() at shutdown (also done at interpreter exit).
     """
     
     def __init__(
@@ -132,6 +279,9 @@ class AppendOnlyLog:
         log_path: str,
         max_file_size_mb: float = 100.0,
         rotation_count: int = 10,
+        batch_mode: bool = False,
+        flush_interval_ms: float = 5.0,
+        max_batch: int = 1024,
     ):
         """
         Initialize append-only log.
@@ -140,6 +290,9 @@ class AppendOnlyLog:
             log_path: Path to the log file (JSONL format)
             max_file_size_mb: Max file size before rotation
             rotation_count: Number of rotated files to keep
+            batch_mode: Queue writes for a background flusher thread
+            flush_interval_ms: Flusher wake-up interval (batch_mode)
+            max_batch: Max lines per writev() call (batch_mode)
         """
         self.log_path = Path(log_path)
         self.max_file_size_bytes = int(max_file_size_mb * 1024 * 1024)
@@ -148,34 +301,71 @@ class AppendOnlyLog:
         # Ensure directory exists
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Lock for rotation (not for writes)
+        # Lock for rotation and (re)opening (not for writes); compression of
+        # rotated files is serialized separately, outside it
         self._rotation_lock = Lock()
+        self._compress_lock = Lock()
+        self._rotation_seq = itertools.count(1)
+        
+        # Append descriptor kept open across writes: one write() per event
+        # instead of open/write/close
+        self._fd: Optional[int] = self._open_fd()
+        
+        # Pid of the process holding the writer lock through this instance.
+        # Claimed on first write, so processes that only read never take it.
+        self._writer_pid: Optional[int] = None
+        
+        # Size of the current file as seen by this writer, so the rotation
+        # check needs no stat() per write. Unlocked: it is only a size hint.
+        self._bytes_written = os.fstat(self._fd).st_size
         
-        # File handle (opened on first write)
-        self._file: Optional[Any] = None
+        # Batch mode: producers append serialized lines (deque.append is
+        # thread safe); draining is serialized so lines keep their order
+        self._batching = batch_mode
+        self._lines: Optional[deque[bytes]] = None
+        self._flusher: Optional[threading.Thread] = None
+        if batch_mode:
+            self._lines = deque()
+            self._flush_interval = flush_interval_ms / 1000.0
+            self._max_batch = max_batch
+            self._drain_lock = Lock()
+            self._stop = threading.Event()
+            self._flusher = threading.Thread(
+                target=self._flush_loop,
+                name="append-log-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+            atexit.register(self.close)
         
         logger.info(
             "append_log_initialized",
             path=str(self.log_path),
             max_size_mb=max_file_size_mb,
+            batch_mode=batch_mode,
         )
     
     def write(self, event: Event) -> None:
         """
         Write an event to the log.
         
-        This is the hot path - optimized for throughput.
+        This is the hot path - optimized for throughput. In batch mode
+        the line is queued for the flusher thread instead.
         """
+        if self._batching:
+            self._lines.append(event.to_json_bytes())
+            self._drain_if_closed()
+            return
+        
         # Check if rotation needed (cheap check)
         if self._should_rotate():
             self._rotate()
         
         # Write event
-        line = event.to_json() + "\n"
+        line = event.to_json_bytes()
         
         try:
-            with open(self.log_path, "a") as f:
-                f.write(line)
+            self._append(line)
         except Exception as e:
             logger.error("append_log_write_error", error=str(e))
             raise
@@ -189,44 +379,168 @@ class AppendOnlyLog:
         if not events:
             return
         
+        if self._batching:
+            self._lines.extend([event.to_json_bytes() for event in events])
+            self._drain_if_closed()
+            return
+        
         # Check rotation before batch
         if self._should_rotate():
             self._rotate()
         
-        lines = [event.to_json() + "\n" for event in events]
+        # One buffer per line, handed to writev() without joining them
+        lines = [event.to_json_bytes() for event in events]
         
         try:
-            with open(self.log_path, "a") as f:
-                f.writelines(lines)
+            self._append_lines(lines)
             
             logger.debug("batch_written", count=len(events))
         except Exception as e:
             logger.error("append_log_batch_error", error=str(e))
             raise
     
+    def _open_fd(self) -> int:
+        """Open the log for appending (created if missing, not inheritable)."""
+        return os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    
+    def _writable_fd(self) -> int:
+        """The shared descriptor, once this process is the log's writer."""
+        fd = self._fd
+        if fd is None or self._writer_pid != _PID:
+            # First write, a forked child, or written after close()
+            # (e.g. a flush at interpreter exit)
+            with self._rotation_lock:
+                self._claim_writer()
+                fd = self._fd
+        return fd
+    
+    def _claim_writer(self) -> None:
+        """Take the writer lock and (re)open the descriptor (rotation lock held)."""
+        if self._writer_pid != _PID:
+            _acquire_writer_lock(self)
+            self._writer_pid = _PID
+            # The descriptor may predate a rotation by the previous writer
+            self._swap_fd()
+            self._bytes_written = os.fstat(self._fd).st_size
+        elif self._fd is None:
+            self._fd = self._open_fd()
+            self._bytes_written = os.fstat(self._fd).st_size
+    
+    def _append(self, data: bytes) -> None:
+        """Append data with write() on the shared descriptor."""
+        fd = self._writable_fd()
+        
+        # Regular files take the whole buffer; loop in case of a short write
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        self._bytes_written += len(data)
+    
+    def _append_lines(self, lines: list[bytes]) -> None:
+        """
+        Append lines with one writev() per _IOV_MAX lines.
+        
+        Each call is a single O_APPEND write, so lines stay whole even
+        when other threads append between calls.
+        """
+        if not hasattr(os, "writev"):
+            self._append(b"".join(lines))
+            return
+        
+        fd = self._writable_fd()
+        for start in range(0, len(lines), _IOV_MAX):
+            group = lines[start:start + _IOV_MAX]
+            size = sum(map(len, group))
+            written = os.writev(fd, group)
+            if written < size:
+                # Short write (e.g. disk nearly full): finish the remainder
+                view = memoryview(b"".join(group))[written:]
+                while view:
+                    view = view[os.write(fd, view):]
+            self._bytes_written += size
+    
+    def _drain_if_closed(self) -> None:
+        """
+        Write just-queued lines if close() switched batching off meanwhile.
+        
+        close() clears the flag before its final drain, so a producer that
+        still sees it set after queueing can rely on that drain; otherwise
+        the drain may already be done and nothing else would write the lines.
+        """
+        if not self._batching:
+            self._drain()
+    
+    def _flush_loop(self) -> None:
+        """Flusher thread: drain the queue every flush interval until stopped."""
+        while not self._stop.is_set():
+            self._drain()
+            self._stop.wait(self._flush_interval)
+        self._drain()
+    
+    def _drain(self) -> None:
+        """Append every queued line, max_batch lines per writev()."""
+        with self._drain_lock:
+            queue = self._lines
+            while queue:
+                lines = []
+                try:
+                    while len(lines) < self._max_batch:
+                        lines.append(queue.popleft())
+                except IndexError:
+                    pass
+                
+                if self._should_rotate():
+                    self._rotate()
+                try:
+                    self._append_lines(lines)
+                except Exception as e:
+                    # No caller to raise to; the lines are dropped
+                    logger.error("append_log_flush_error", error=str(e), count=len(lines))
+    
     def _should_rotate(self) -> bool:
-        """Check if log file should be rotated."""
-        if not self.log_path.exists():
-            return False
-        return self.log_path.stat().st_size >= self.max_file_size_bytes
+        """Check if log file should be rotated (byte counter, no syscall)."""
+        return self._bytes_written >= self.max_file_size_bytes
     
     def _rotate(self) -> None:
         """
         Rotate the log file.
         
         Rotation is:
-        1. Rename current file to .1
+        1. Move the current file aside and point the descriptor at a new file
         2. Shift existing rotated files (.1 -> .2, etc.)
-        3. Compress old files
-        4. Delete files beyond rotation_count
+        3. Delete files beyond rotation_count
+        4. Compress the moved file to .1
+        
+        Only step 1 holds the rotation lock; compression runs after it is
+        released, so other writers are not held up. The descriptor number
+        never changes (dup2), so writers racing the rotation land in either
+        the moved file or the new one; nothing is lost and no write hits a
+        closed descriptor.
         """
         with self._rotation_lock:
+            # Only the writer process may move the file
+            self._claim_writer()
+            
             # Double-check after acquiring lock
             if not self._should_rotate():
                 return
             
             logger.info("rotating_log", path=str(self.log_path))
             
+            # Move the current file aside (unique name per rotation)
+            staging_path = None
+            if self.log_path.exists():
+                staging_path = Path(f"{self.log_path}.{next(self._rotation_seq)}.rotating")
+                self.log_path.rename(staging_path)
+            # Else it was deleted behind our back; just start a new file
+            self._swap_fd()
+            self._bytes_written = 0
+            
+            # Taken before the rotation lock is released, so a later rotation
+            # cannot compress its newer file ahead of this one
+            self._compress_lock.acquire()
+        
+        try:
             # Shift existing rotated files
             for i in range(self.rotation_count - 1, 0, -1):
                 old_path = Path(f"{self.log_path}.{i}.gz")
@@ -238,17 +552,28 @@ class AppendOnlyLog:
                     else:
                         old_path.rename(new_path)
             
-            # Compress and rename current file
-            if self.log_path.exists():
+            if staging_path is not None:
+                # Level 1: several times faster than the default 9, and JSONL
+                # compresses nearly as well
                 rotated_path = Path(f"{self.log_path}.1.gz")
-                with open(self.log_path, "rb") as f_in:
-                    with gzip.open(rotated_path, "wb") as f_out:
-                        shutil.copyfileobj(f_in, f_out)
+                with open(staging_path, "rb") as f_in:
+                    with gzip.open(rotated_path, "wb", compresslevel=1) as f_out:
+                        shutil.copyfileobj(f_in, f_out, length=_ROTATION_COPY_BUFFER)
                 
-                # Clear current file
-                self.log_path.unlink()
-            
-            logger.info("log_rotated", path=str(self.log_path))
+                staging_path.unlink()
+        finally:
+            self._compress_lock.release()
+        
+        logger.info("log_rotated", path=str(self.log_path))
+    
+    def _swap_fd(self) -> None:
+        """Point the write descriptor at a fresh file at log_path (rotation lock held)."""
+        new_fd = self._open_fd()
+        if self._fd is None:
+            self._fd = new_fd
+            return
+        os.dup2(new_fd, self._fd, inheritable=False)
+        os.close(new_fd)
     
     def read_all(self) -> list[Event]:
         """
@@ -262,14 +587,15 @@ class AppendOnlyLog:
         if not self.log_path.exists():
             return events
         
-        with open(self.log_path, "r") as f:
+        # Binary lines: orjson parses UTF-8 bytes directly
+        with open(self.log_path, "rb") as f:
             for line in f:
                 line = line.strip()
                 if line:
                     try:
-                        d = json.loads(line)
+                        d = orjson.loads(line)
                         events.append(Event.from_dict(d))
-                    except json.JSONDecodeError as e:
+                    except orjson.JSONDecodeError as e:
                         logger.warning("invalid_log_line", error=str(e))
         
         return events
@@ -292,17 +618,146 @@ class AppendOnlyLog:
         Flush any buffered writes.
         
         Called during graceful shutdown to ensure all events are persisted.
+        In batch mode, blocks until every queued line has been written.
         """
-        # With file append mode, writes are unbuffered
-        # This method exists for API compatibility
-        pass
+        # Without batch mode writes go straight to the descriptor
+        if self._lines is not None:
+            self._drain()
     
     def close(self) -> None:
-        """Close the log (for graceful shutdown)."""
+        """
+        Close the log (for graceful shutdown); a later write reopens it.
+        
+        In batch mode the flusher thread is stopped after writing the
+        queue, and later writes are written synchronously.
+        """
+        if self._flusher is not None:
+            self._batching = False
+            self._stop.set()
+            self._flusher.join()
+            self._flusher = None
+            atexit.unregister(self.close)
+        
+        # Also writes lines queued just before batching was switched off
         self.flush()
+        with self._rotation_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._writer_pid == _PID:
+                _release_writer_lock(self)
+            self._writer_pid = None
         logger.info("append_log_closed", path=str(self.log_path))
 
 
+class BufferedEventWriter:
+    """
+    Batches events in memory before writing them to an AppendOnlyLog.
+    
+    Events are flushed in a single write_batch() call once `capacity`
+    events are pending or `max_latency_ms` has passed since the first
+    pending event, whichever comes first. Keeping `capacity` small bounds
+    how many events a crash can lose; pending events are also flushed at
+    interpreter exit.
+    
+    The latency flush is done by one long-lived thread that sleeps until
+    the first pending event's deadline, so a batch costs no thread start
+    even when an explicit flush() usually gets there first.
+    """
+    
+    def __init__(
+        self,
+        append_log: AppendOnlyLog,
+        capacity: int = 256,
+        max_latency_ms: float = 100.0,
+    ):
+        """
+        Initialize buffered writer.
+        
+        Args:
+            append_log: Log the events are written to
+            capacity: Pending events that trigger an immediate flush
+            max_latency_ms: Max time an event waits before being flushed
+        """
+        self.append_log = append_log
+        self.capacity = capacity
+        self.max_latency = max_latency_ms / 1000.0
+        
+        # Guards the pending list and serializes flushes so order is kept;
+        # the flusher waits on it for the first pending event
+        self._lock = Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: list[Event] = []
+        self._deadline = 0.0
+        self._closed = False
+        
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            name="event-writer-flusher",
+            daemon=True,
+        )
+        self._flusher.start()
+        
+        atexit.register(self.flush)
+    
+    def write(self, event: Event) -> None:
+        """Queue an event, flushing if the buffer is full (or closed)."""
+        with self._lock:
+            self._pending.append(event)
+            
+            if len(self._pending) >= self.capacity or self._closed:
+                self._flush_locked()
+            elif len(self._pending) == 1:
+                self._deadline = time.monotonic() + self.max_latency
+                self._wakeup.notify()
+    
+    def flush(self) -> None:
+        """Write all pending events to the log."""
+        with self._lock:
+            self._flush_locked()
+    
+    def close(self) -> None:
+        """
+        Flush pending events and stop the flusher thread.
+        
+        Later writes are written immediately.
+        """
+        with self._lock:
+            self._closed = True
+            self._flush_locked()
+            self._wakeup.notify()
+        self._flusher.join()
+        atexit.unregister(self.flush)
+    
+    def _flush_loop(self) -> None:
+        """Flusher thread: write pending events once their deadline passes."""
+        with self._lock:
+            while not self._closed:
+                if not self._pending:
+                    self._wakeup.wait()
+                    continue
+                
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._wakeup.wait(remaining)
+                    continue
+                
+                try:
+                    self._flush_locked()
+                except Exception as e:
+                    # No caller to raise to
+                    logger.error("buffered_event_flush_error", error=str(e))
+    
+    def _flush_locked(self) -> None:
+        """Flush with the lock held."""
+        if not self._pending:
+            return
+        
+        events = self._pending
+        self._pending = []
+        self.append_log.write_batch(events)
+
+
 # Convenience functions for creating common events
 
 def create_quote_event(
@@ -12,9 +12,11 @@ Strategies read from DuckDB, never write directly.
 """
 
 import json
+import functools
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 import structlog
 
 import duckdb
@@ -22,6 +24,50 @@ import pandas as pd
 
 logger = structlog.get_logger(__name__)
 
+# Insert column order for the upserted tables (everything but the surrogate id)
+_BAR_COLUMNS = (
+    "symbol", "timestamp", "timeframe", "tier",
+    "open", "high", "low", "close", "volume", "estimated_spread_bps",
+)
+_BAR_KEY = ("symbol", "timestamp", "timeframe")
+_SENTIMENT_COLUMNS = (
+    "symbol", "timestamp", "source",
+    "score", "volume", "is_calibrated", "lead_lag_hours", "correlation",
+)
+_SENTIMENT_KEY = ("symbol", "timestamp", "source")
+
+
+def _upsert_sql(table: str, columns: tuple[str, ...], key: tuple[str, ...]) -> str:
+    """
+    Build an upsert from the staged relation into ``table``.
+    
+    The tables carry both an ``id`` primary key and a natural UNIQUE key, so
+    DuckDB needs an explicit conflict target. New rows get ids after the
+    current maximum; conflicting rows keep theirs and take the new values.
+    """
+    updates = ", ".join(f"{col} = excluded.{col}" for col in columns if col not in key)
+    return f"""
+        INSERT INTO {table} (id, {", ".join(columns)})
+        SELECT
+            (SELECT coalesce(max(id), 0) FROM {table}) + row_number() OVER (),
+            {", ".join(columns)}
+        FROM _staged_rows
+        ON CONFLICT ({", ".join(key)}) DO UPDATE SET {updates}
+    """
+
+
+_BAR_UPSERT = _upsert_sql("bars", _BAR_COLUMNS, _BAR_KEY)
+_SENTIMENT_UPSERT = _upsert_sql("sentiment", _SENTIMENT_COLUMNS, _SENTIMENT_KEY)
+
+
+def _synchronized(method: Callable) -> Callable:
+    """Serialize access to the shared DuckDB connection across threads."""
+    @functools.wraps(method)
+    def wrapper(self: "DuckDBStore", *args: Any, **kwargs: Any) -> Any:
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class DuckDBStore:
     """
@@ -32,6 +78,9 @@ class DuckDBStore:
     - Read-heavy workload optimized
     - Strategies get read-only connections
     - Schema designed for time-series queries
+    
+    A single connection is shared by the main loop and the background
+    ETL thread, so every method that touches it holds ``self.lock``.
     """
     
     def __init__(self, db_path: str, read_only: bool = False):
@@ -45,6 +94,9 @@ class DuckDBStore:
         self.db_path = Path(db_path)
         self.read_only = read_only
         
+        # Guards self.conn (DuckDB connections are not thread-safe)
+        self.lock = threading.RLock()
+        
         # Ensure directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -208,6 +260,7 @@ class DuckDBStore:
     # Bar Data Operations
     # =========================================================================
     
+    @_synchronized
     def insert_bars(self, bars: list[dict]) -> int:
         """
         Insert bars into the database.
@@ -222,19 +275,11 @@ class DuckDBStore:
         if not bars:
             return 0
         
-        df = pd.DataFrame(bars)
-        
-        # Use INSERT OR REPLACE for upsert behavior
-        self.conn.execute("""
-            INSERT OR REPLACE INTO bars 
-            (symbol, timestamp, timeframe, tier, open, high, low, close, volume, estimated_spread_bps)
-            SELECT * FROM df
-        """)
-        
-        self.conn.commit()
+        self._upsert(_BAR_UPSERT, bars, _BAR_COLUMNS, _BAR_KEY)
         logger.debug("bars_inserted", count=len(bars))
         return len(bars)
     
+    @_synchronized
     def get_bars(
         self,
         symbol: str,
@@ -273,19 +318,12 @@ class DuckDBStore:
         
         result = self.conn.execute(query, [symbol, start, end, timeframe]).fetchdf()
         
-        if exclude_tier0 and not result.empty:
-            # Verify no TIER_0 data slipped through
-            tier0_count = (result["tier"] == "TIER_0_UNIVERSE").sum()
-            if tier0_count > 0:
-                logger.critical(
-                    "TIER0_DATA_IN_BACKTEST",
-                    count=tier0_count,
-                    message="TIER_0 data found in backtest query. Results invalid.",
-                )
-                raise ValueError(f"TIER_0 data found in backtest: {tier0_count} bars")
+        if exclude_tier0:
+            self._verify_no_tier0(result)
         
         return result
     
+    @_synchronized
     def get_bars_multi(
         self,
         symbols: list[str],
@@ -293,32 +331,98 @@ class DuckDBStore:
         end: datetime,
         timeframe: str = "1Day",
     ) -> dict[str, pd.DataFrame]:
-        """Get bars for multiple symbols."""
-        result = {}
-        for symbol in symbols:
-            result[symbol] = self.get_bars(symbol, start, end, timeframe)
-        return result
+        """
+        Get bars for multiple symbols in one query.
+        
+        Same rows as calling get_bars() per symbol (TIER_0 excluded), but
+        with a single round trip split by symbol afterwards.
+        
+        Returns:
+            Dict mapping each requested symbol to its bars (empty if none)
+        """
+        if not symbols:
+            return {}
+        
+        placeholders = ", ".join("?" * len(symbols))
+        query = f"""
+            SELECT 
+                symbol, timestamp, open, high, low, close, volume,
+                tier, estimated_spread_bps
+            FROM bars
+            WHERE symbol IN ({placeholders})
+              AND timestamp >= ?
+              AND timestamp <= ?
+              AND timeframe = ?
+              AND tier != 'TIER_0_UNIVERSE'
+            ORDER BY symbol, timestamp
+        """
+        
+        frame = self.conn.execute(query, [*symbols, start, end, timeframe]).fetchdf()
+        self._verify_no_tier0(frame)
+        
+        grouped = {
+            symbol: group.reset_index(drop=True)
+            for symbol, group in frame.groupby("symbol", sort=False)
+        }
+        empty = frame.iloc[0:0]
+        
+        return {symbol: grouped.get(symbol, empty) for symbol in symbols}
+    
+    @staticmethod
+    def _verify_no_tier0(result: pd.DataFrame) -> None:
+        """Raise if TIER_0 (yfinance) bars slipped into a backtest query."""
+        if result.empty:
+            return
+        
+        tier0_count = (result["tier"] == "TIER_0_UNIVERSE").sum()
+        if tier0_count > 0:
+            logger.critical(
+                "TIER0_DATA_IN_BACKTEST",
+                count=tier0_count,
+                message="TIER_0 data found in backtest query. Results invalid.",
+            )
+            raise ValueError(f"TIER_0 data found in backtest: {tier0_count} bars")
     
     # =========================================================================
     # Sentiment Operations
     # =========================================================================
     
+    @_synchronized
     def insert_sentiment(self, records: list[dict]) -> int:
         """Insert sentiment records."""
         if not records:
             return 0
         
-        df = pd.DataFrame(records)
+        self._upsert(_SENTIMENT_UPSERT, records, _SENTIMENT_COLUMNS, _SENTIMENT_KEY)
+        return len(records)
+    
+    def _upsert(
+        self,
+        sql: str,
+        records: list[dict],
+        columns: tuple[str, ...],
+        key: tuple[str, ...],
+    ) -> None:
+        """
+        Stage records as one column-ordered frame and upsert them.
+        
+        Fixing the columns up front selects by name rather than dict key
+        order, fills absent optional keys with NULL, and lets pandas build
+        each column in one pass. The later of two rows sharing a key wins,
+        as it would for row-by-row replaces.
+        """
+        staged = pd.DataFrame(records, columns=columns)
+        staged = staged.drop_duplicates(subset=list(key), keep="last")
         
-        self.conn.execute("""
-            INSERT OR REPLACE INTO sentiment
-            (symbol, timestamp, source, score, volume, is_calibrated, lead_lag_hours, correlation)
-            SELECT * FROM df
-        """)
+        self.conn.register("_staged_rows", staged)
+        try:
+            self.conn.execute(sql)
+        finally:
+            self.conn.unregister("_staged_rows")
         
         self.conn.commit()
-        return len(records)
     
+    @_synchronized
     def get_sentiment(
         self,
         symbol: str,
@@ -348,6 +452,7 @@ class DuckDBStore:
     # Regime Operations
     # =========================================================================
     
+    @_synchronized
     def insert_regime(self, regime: dict) -> None:
         """Insert a regime classification."""
         self.conn.execute("""
@@ -370,6 +475,7 @@ class DuckDBStore:
         ])
         self.conn.commit()
     
+    @_synchronized
     def get_latest_regime(self, symbol: Optional[str] = None) -> Optional[dict]:
         """Get the most recent regime classification."""
         symbol_filter = "WHERE symbol = ?" if symbol else "WHERE symbol IS NULL"
@@ -394,6 +500,7 @@ class DuckDBStore:
     # Performance Operations
     # =========================================================================
     
+    @_synchronized
     def insert_performance(self, metrics: dict) -> None:
         """Insert daily performance metrics."""
         # Handle both "date" and "timestamp" keys
@@ -430,6 +537,34 @@ class DuckDBStore:
         ])
         self.conn.commit()
     
+    @_synchronized
+    def insert_performance_frame(self, df: pd.DataFrame) -> int:
+        """
+        Insert performance snapshots from a columnar DataFrame.
+        
+        Args:
+            df: Columns in table order (date, equity, cash, positions_value,
+                daily_return, cumulative_return, sharpe_30d, sortino_30d,
+                max_drawdown, current_drawdown, strategy_attribution) with
+                one row per date. NaN is stored as NULL.
+        
+        Returns:
+            Number of rows written
+        """
+        if df.empty:
+            return 0
+        
+        self.conn.execute("""
+            INSERT OR REPLACE INTO performance
+            (date, equity, cash, positions_value, daily_return, cumulative_return,
+             sharpe_30d, sortino_30d, max_drawdown, current_drawdown, strategy_attribution)
+            SELECT * FROM df
+        """)
+        self.conn.commit()
+        logger.debug("performance_batch_inserted", count=len(df))
+        return len(df)
+    
+    @_synchronized
     def get_performance_history(
         self,
         start: datetime,
@@ -448,6 +583,7 @@ class DuckDBStore:
     # Trade Operations
     # =========================================================================
     
+    @_synchronized
     def insert_trade(self, trade: dict) -> None:
         """Insert an executed trade."""
         self.conn.execute("""
@@ -473,6 +609,7 @@ class DuckDBStore:
         ])
         self.conn.commit()
     
+    @_synchronized
     def get_trades(
         self,
         start: datetime,
@@ -505,12 +642,23 @@ class DuckDBStore:
     # Utility Methods
     # =========================================================================
     
-    def execute(self, query: str, params: list = None) -> Any:
-        """Execute a raw query (for advanced analytics)."""
+    @_synchronized
+    def execute(self, query: str, params: list = None) -> list[tuple]:
+        """
+        Execute a raw query (for advanced analytics).
+        
+        Rows are fetched while the lock is held: the connection is shared
+        with the ETL thread, whose next statement would replace a result
+        left pending on it.
+        
+        Returns:
+            Result rows as tuples
+        """
         if params:
-            return self.conn.execute(query, params)
-        return self.conn.execute(query)
+            return self.conn.execute(query, params).fetchall()
+        return self.conn.execute(query).fetchall()
     
+    @_synchronized
     def close(self) -> None:
         """Close the database connection."""
         self.conn.close()
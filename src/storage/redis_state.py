@@ -135,9 +135,32 @@ class RedisStateStore:
         pattern = f"{self.POSITIONS_PREFIX}:*"
         keys = self.client.keys(pattern)
         
+        return self._load_positions(keys)
+    
+    def get_portfolio_state(self) -> tuple[dict[str, dict], Optional[float]]:
+        """
+        Get all positions and the initial equity in two round trips.
+        
+        The position key listing and the initial equity lookup share one
+        pipeline; position payloads are then fetched with a single MGET.
+        
+        Returns:
+            Tuple of (positions by symbol, initial equity or None)
+        """
+        pipe = self.pipeline()
+        pipe.keys(f"{self.POSITIONS_PREFIX}:*")
+        pipe.get(f"{self.STATE_PREFIX}:initial_equity")
+        keys, initial_equity = pipe.execute()
+        
+        return self._load_positions(keys), self._decode_state(initial_equity)
+    
+    def _load_positions(self, keys: list[str]) -> dict[str, dict]:
+        """Fetch and decode position payloads for the given keys with one MGET."""
+        if not keys:
+            return {}
+        
         positions = {}
-        for key in keys:
-            data = self.client.get(key)
+        for data in self.client.mget(keys):
             if data:
                 position = json.loads(data)
                 positions[position["symbol"]] = position
@@ -376,8 +399,11 @@ class RedisStateStore:
     def get_state(self, key: str) -> Optional[Any]:
         """Get a general state value."""
         full_key = f"{self.STATE_PREFIX}:{key}"
-        data = self.client.get(full_key)
-        
+        return self._decode_state(self.client.get(full_key))
+    
+    @staticmethod
+    def _decode_state(data: Optional[str]) -> Optional[Any]:
+        """Decode a stored state value (JSON, falling back to the raw string)."""
         if data:
             try:
                 return json.loads(data)
@@ -407,6 +433,15 @@ class RedisStateStore:
     # Utility Methods
     # =========================================================================
     
+    def pipeline(self, transaction: bool = False) -> "redis.client.Pipeline":
+        """
+        Create a pipeline for batching commands into one round trip.
+        
+        Args:
+            transaction: Wrap the queued commands in MULTI/EXEC
+        """
+        return self.client.pipeline(transaction=transaction)
+    
     def ping(self) -> bool:
         """Check if Redis is responding."""
         try:
@@ -1,5 +1,6 @@
 """Utility functions and helpers."""
 
 from src.utils.market_utils import is_market_open, get_market_time
+from src.utils.rolling import RollingMoments
 
-__all__ = ["is_market_open", "get_market_time"]
+__all__ = ["is_market_open", "get_market_time", "RollingMoments"]
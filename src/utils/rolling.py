@@ -0,0 +1,48 @@
+"""
+Running statistics over sliding windows.
+
+Shared by the monitoring and regime layers for O(1) rolling updates.
+"""
+
+import math
+
+
+class RollingMoments:
+    """
+    Welford running mean/variance supporting removal.
+    
+    Adding and removing a value are both O(1) and avoid the cancellation
+    error of the naive sum / sum-of-squares formulation.
+    """
+    
+    __slots__ = ("count", "mean", "m2")
+    
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, x: float) -> None:
+        """Include a value."""
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+    
+    def remove(self, x: float) -> None:
+        """Exclude a previously added value."""
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(self.m2 - delta * (x - self.mean), 0.0)
+    
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1), 0 with fewer than 2 values."""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.count - 1))
@@ -0,0 +1,86 @@
+"""
+Alerter deduplication tests.
+
+Verifies alert suppression, critical bypass and window expiry.
+"""
+
+import pytest
+
+from src.monitoring import alerter as alerter_module
+from src.monitoring.alerter import Alerter, AlertSeverity
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic()."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Patch the alerter's monotonic clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(alerter_module.time, "monotonic", fake)
+    return fake
+
+
+class TestAlerterDeduplication:
+    """Tests for alert deduplication."""
+
+    def test_suppresses_after_max_alerts(self, clock):
+        """Same message is suppressed once the limit is reached."""
+        alerter = Alerter(deduplication_window_seconds=300, max_alerts_per_hour=3)
+
+        for _ in range(5):
+            alerter.send_warning("disk almost full")
+            clock.now += 1
+
+        assert len(alerter.sent_alerts["disk almost full"]) == 3
+
+    def test_critical_never_suppressed(self, clock):
+        """Critical alerts bypass deduplication entirely."""
+        alerter = Alerter(max_alerts_per_hour=1)
+
+        assert alerter._should_send("halt", AlertSeverity.CRITICAL)
+        alerter.send_critical("halt")
+        alerter.send_critical("halt")
+
+        assert len(alerter.sent_alerts["halt"]) == 2
+
+    def test_alerts_expire_after_window(self, clock):
+        """Alerts older than the window no longer count toward the limit."""
+        alerter = Alerter(deduplication_window_seconds=300, max_alerts_per_hour=2)
+
+        alerter.send_warning("latency high")
+        alerter.send_warning("latency high")
+        assert not alerter._should_send("latency high", AlertSeverity.WARNING)
+
+        clock.now += 301
+
+        assert alerter._should_send("latency high", AlertSeverity.WARNING)
+        assert "latency high" not in alerter.sent_alerts
+
+    def test_numeric_variants_share_key(self, clock):
+        """Templated messages differing only in numbers are deduplicated together."""
+        alerter = Alerter(max_alerts_per_hour=1)
+
+        alerter.send_warning("Current drawdown: -5.12%")
+
+        assert not alerter._should_send("Current drawdown: -5.37%", AlertSeverity.WARNING)
+        assert len(alerter.sent_alerts) == 1
+
+    def test_tracked_messages_are_bounded(self, clock, monkeypatch):
+        """Least recently alerted keys are evicted past the cap."""
+        monkeypatch.setattr(Alerter, "MAX_TRACKED_MESSAGES", 2)
+        alerter = Alerter()
+
+        alerter.send_warning("alpha")
+        alerter.send_warning("beta")
+        alerter.send_warning("alpha")
+        alerter.send_warning("gamma")
+
+        assert list(alerter.sent_alerts) == ["alpha", "gamma"]
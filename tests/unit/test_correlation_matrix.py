@@ -0,0 +1,256 @@
+"""
+Correlation matrix tests.
+
+Checks the NumPy correlation kernels against pandas.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.portfolio.correlation_matrix import (
+    CorrelationMatrix,
+    ReturnMatrix,
+    _ledoit_wolf_intensity,
+)
+
+
+@pytest.fixture
+def returns_df():
+    """Correlated daily returns for a handful of symbols."""
+    rng = np.random.default_rng(11)
+    base = rng.normal(0, 0.01, (80, 1))
+    noise = rng.normal(0, 0.01, (80, 5))
+    data = base * np.array([1.0, 0.8, -0.5, 0.0, 1.2]) + noise
+    return pd.DataFrame(data, columns=["AAPL", "MSFT", "XOM", "GLD", "NVDA"])
+
+
+class TestCalculateCorrelation:
+    """Tests for calculate_correlation."""
+
+    def test_matches_pandas(self, returns_df):
+        """Matrix-product kernel agrees with DataFrame.corr()."""
+        result = CorrelationMatrix().calculate_correlation(returns_df)
+
+        np.testing.assert_allclose(result.to_numpy(), returns_df.corr().to_numpy(), atol=1e-12)
+        assert list(result.index) == list(returns_df.columns)
+
+    def test_constant_column_is_nan(self, returns_df):
+        """A constant column has undefined correlation but unit diagonal."""
+        returns_df["CASH"] = 0.0
+
+        result = CorrelationMatrix().calculate_correlation(returns_df)
+
+        assert np.isnan(result.loc["AAPL", "CASH"])
+        assert result.loc["CASH", "CASH"] == 1.0
+
+    def test_short_window_matches_pandas(self, returns_df):
+        """Few rows per symbol (centered path) also agrees with pandas."""
+        short = returns_df.head(12)
+
+        result = CorrelationMatrix().calculate_correlation(short)
+
+        np.testing.assert_allclose(result.to_numpy(), short.corr().to_numpy(), atol=1e-12)
+
+    def test_nonzero_constant_column_is_nan(self, returns_df):
+        """A constant non-zero column is detected exactly on the Gram path."""
+        returns_df["PEG"] = 0.0123
+
+        result = CorrelationMatrix().calculate_correlation(returns_df)
+
+        assert np.isnan(result.loc["AAPL", "PEG"])
+        assert result.loc["PEG", "PEG"] == 1.0
+
+    def test_missing_values_use_pairwise(self, returns_df):
+        """NaNs fall back to pandas pairwise-complete correlation."""
+        returns_df.iloc[:10, 0] = np.nan
+
+        result = CorrelationMatrix().calculate_correlation(returns_df)
+        expected = returns_df.corr()
+
+        assert result.loc["AAPL", "MSFT"] == pytest.approx(expected.loc["AAPL", "MSFT"])
+        assert result.loc["AAPL", "AAPL"] == 1.0
+
+
+class TestRollingUpdate:
+    """Tests for the incremental rolling window."""
+
+    def test_matches_batch_over_window(self, returns_df):
+        """Rolling matrix equals batch correlation over the last lookback rows."""
+        calc = CorrelationMatrix(lookback_days=30, min_data_points=20)
+
+        for _, row in returns_df.iterrows():
+            calc.update(row)
+
+        expected = returns_df.tail(30).corr()
+        np.testing.assert_allclose(
+            calc.current_matrix().to_numpy(), expected.to_numpy(), atol=1e-10
+        )
+
+    def test_insufficient_data(self, returns_df):
+        """Fewer rows than min_data_points yields an empty matrix."""
+        calc = CorrelationMatrix(lookback_days=30, min_data_points=20)
+
+        for _, row in returns_df.head(5).iterrows():
+            calc.update(row)
+
+        assert calc.current_matrix().empty
+
+    def test_symbol_change_resets_window(self, returns_df):
+        """A different symbol set starts a fresh window."""
+        calc = CorrelationMatrix(lookback_days=30, min_data_points=2)
+
+        for _, row in returns_df.head(10).iterrows():
+            calc.update(row)
+        for _, row in returns_df[["AAPL", "MSFT"]].tail(3).iterrows():
+            calc.update(row)
+
+        assert list(calc.current_matrix().columns) == ["AAPL", "MSFT"]
+        assert len(calc._window) == 3
+
+
+class TestReturnMatrix:
+    """Tests for the SoA return matrix."""
+
+    def _closes(self, returns_df):
+        """Close prices whose pct_change reproduces returns_df."""
+        return 100.0 * (1 + returns_df).cumprod()
+
+    def test_returns_from_closes(self, returns_df):
+        """Appended bars yield close-to-close returns, capped at capacity."""
+        closes = self._closes(returns_df)
+        matrix = ReturnMatrix(list(returns_df.columns), capacity=30)
+
+        for _, row in closes.iterrows():
+            matrix.append_bar(row.to_dict())
+
+        assert len(matrix) == 30
+        np.testing.assert_allclose(matrix.data, returns_df.tail(30).to_numpy())
+
+    def test_calculate_from_bars_uses_matrix(self, returns_df):
+        """Correlation over a ReturnMatrix matches pandas over the same rows."""
+        closes = self._closes(returns_df)
+        matrix = ReturnMatrix(list(returns_df.columns), capacity=60)
+        for _, row in closes.iterrows():
+            matrix.append_bar(row.to_dict())
+
+        result = CorrelationMatrix(min_data_points=20).calculate_from_bars(matrix)
+
+        expected = returns_df.tail(60).corr()
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-12)
+        assert list(result.columns) == list(returns_df.columns)
+
+    def test_missing_close_rows_skipped(self, returns_df):
+        """Bars with a missing symbol are excluded from the correlation."""
+        matrix = ReturnMatrix(["AAPL", "MSFT"], capacity=10)
+
+        matrix.append_bar({"AAPL": 100.0, "MSFT": 50.0})
+        matrix.append_bar({"AAPL": 101.0})
+        matrix.append_bar({"AAPL": 102.0, "MSFT": 51.0})
+
+        assert np.isnan(matrix.data).any(axis=1).tolist() == [True, True]
+        assert CorrelationMatrix(min_data_points=1).calculate_from_bars(matrix).empty
+
+
+class TestHighlyCorrelated:
+    """Tests for identify_highly_correlated."""
+
+    def test_upper_triangle_pairs(self, returns_df):
+        """Pairs above threshold come back once each, in matrix order."""
+        calc = CorrelationMatrix()
+        corr = calc.calculate_correlation(returns_df)
+
+        expected = [
+            (a, b, corr.loc[a, b])
+            for i, a in enumerate(corr.index)
+            for b in corr.columns[i + 1:]
+            if abs(corr.loc[a, b]) >= 0.3
+        ]
+
+        assert expected
+        assert calc.identify_highly_correlated(corr, threshold=0.3) == expected
+
+    def test_empty_matrix(self):
+        """Empty input yields no pairs."""
+        assert CorrelationMatrix().identify_highly_correlated(pd.DataFrame()) == []
+
+
+class TestCalculateFromBars:
+    """Tests for calculate_from_bars on per-symbol bar frames."""
+
+    def _bars(self, returns_df):
+        """Per-symbol bar frames with a timestamp column."""
+        stamps = pd.date_range("2024-01-01", periods=len(returns_df) + 1, freq="D")
+        closes = 100.0 * (1 + returns_df).cumprod()
+        closes = pd.concat([pd.DataFrame(100.0, index=[-1], columns=closes.columns), closes])
+        return {
+            symbol: pd.DataFrame({"timestamp": stamps, "close": closes[symbol].to_numpy()})
+            for symbol in closes.columns
+        }
+
+    def test_matches_pandas_on_returns(self, returns_df):
+        """Aligned closes reproduce the correlation of the underlying returns."""
+        result = CorrelationMatrix().calculate_from_bars(self._bars(returns_df))
+
+        np.testing.assert_allclose(result.to_numpy(), returns_df.corr().to_numpy(), atol=1e-12)
+
+    def test_aligns_on_timestamp(self, returns_df):
+        """A missing bar drops both returns that touch it, not later rows."""
+        bars = self._bars(returns_df)
+        bars["GLD"] = bars["GLD"].drop(index=40).reset_index(drop=True)
+
+        result = CorrelationMatrix().calculate_from_bars(bars)
+
+        expected = returns_df.drop(index=[39, 40]).corr()
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), atol=1e-12)
+
+    def test_short_history_symbol_excluded(self, returns_df):
+        """Symbols without min_data_points returns are left out."""
+        bars = self._bars(returns_df)
+        bars["NEW"] = bars["AAPL"].tail(10)
+
+        result = CorrelationMatrix().calculate_from_bars(bars)
+
+        assert "NEW" not in result.columns
+        assert len(result.columns) == 5
+
+
+class TestShrinkage:
+    """Tests for shrinkage toward the identity."""
+
+    def test_intensity_matches_sklearn(self, returns_df):
+        """Closed-form intensity equals sklearn's on standardized returns."""
+        covariance = pytest.importorskip("sklearn.covariance")
+        values = returns_df.to_numpy()
+        standardized = (values - values.mean(axis=0)) / values.std(axis=0)
+
+        expected = covariance.ledoit_wolf_shrinkage(standardized)
+
+        assert _ledoit_wolf_intensity(values) == pytest.approx(expected)
+
+    def test_fixed_intensity(self, returns_df):
+        """A fixed intensity scales off-diagonals and keeps a unit diagonal."""
+        raw = CorrelationMatrix().calculate_correlation(returns_df)
+        shrunk = CorrelationMatrix(shrinkage=0.25).calculate_correlation(returns_df)
+
+        off = ~np.eye(len(raw), dtype=bool)
+        np.testing.assert_allclose(shrunk.to_numpy()[off], 0.75 * raw.to_numpy()[off])
+        np.testing.assert_array_equal(np.diag(shrunk.to_numpy()), 1.0)
+
+    def test_auto_applies_everywhere(self, returns_df):
+        """Batch, bar and rolling paths shrink by the same intensity."""
+        calc = CorrelationMatrix(lookback_days=80, min_data_points=20, shrinkage="auto")
+        delta = _ledoit_wolf_intensity(returns_df.to_numpy())
+        expected = (1 - delta) * returns_df.corr().to_numpy() + delta * np.eye(5)
+
+        for _, row in returns_df.iterrows():
+            calc.update(row)
+
+        assert 0.0 < delta < 1.0
+        np.testing.assert_allclose(calc.calculate_correlation(returns_df).to_numpy(), expected)
+        np.testing.assert_allclose(calc.current_matrix().to_numpy(), expected, atol=1e-10)
+
+    def test_invalid_shrinkage(self):
+        """Out-of-range shrinkage is rejected."""
+        with pytest.raises(ValueError):
+            CorrelationMatrix(shrinkage=1.5)
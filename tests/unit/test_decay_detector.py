@@ -0,0 +1,91 @@
+"""
+Strategy decay detector tests.
+
+Verifies decay classification and the strategy death window.
+"""
+
+import pytest
+
+from src.monitoring import decay_detector as decay_module
+from src.monitoring.decay_detector import SharpeHistory, StrategyDecayDetector
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic()."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Patch the decay detector's monotonic clock."""
+    fake = FakeClock()
+    monkeypatch.setattr(decay_module.time, "monotonic", fake)
+    return fake
+
+
+class TestStrategyDeath:
+    """Tests for consecutive negative Sharpe detection."""
+
+    def test_dead_after_threshold_negative_checks(self, clock):
+        """Strategy is dead once the last N checks are all negative."""
+        detector = StrategyDecayDetector(disable_threshold_days=3)
+
+        results = []
+        for _ in range(3):
+            results.append(detector.check_strategy("momo", -0.5, 1.0).is_dead)
+            clock.now += 86400
+
+        assert results == [False, False, True]
+
+    def test_positive_check_resets_death(self, clock):
+        """A single non-negative Sharpe in the window keeps strategy alive."""
+        detector = StrategyDecayDetector(disable_threshold_days=3)
+
+        for sharpe in (-0.5, -0.2, 0.1, -0.3):
+            status = detector.check_strategy("momo", sharpe, 1.0)
+            clock.now += 86400
+
+        assert not status.is_dead
+        assert status.is_decaying
+
+    def test_old_observations_expire(self, clock):
+        """Observations older than threshold + 10 days are dropped."""
+        detector = StrategyDecayDetector(disable_threshold_days=2)
+
+        detector.check_strategy("momo", -0.5, 1.0)
+        clock.now += 13 * 86400
+        status = detector.check_strategy("momo", -0.5, 1.0)
+
+        assert not status.is_dead
+
+    def test_death_detected_after_buffer_wraps(self, clock):
+        """Death check still sees the latest window once the ring wraps."""
+        detector = StrategyDecayDetector(disable_threshold_days=2)
+
+        for sharpe in [0.5] * 15 + [-0.1, -0.2]:
+            status = detector.check_strategy("momo", sharpe, 1.0)
+            clock.now += 3600
+
+        assert len(detector.strategy_performance["momo"]) == 12
+        assert status.is_dead
+
+
+class TestSharpeHistory:
+    """Tests for the ring buffer."""
+
+    def test_ordered_oldest_first(self):
+        """Wrapped buffer returns observations in insertion order."""
+        history = SharpeHistory(capacity=3)
+
+        for i in range(5):
+            history.append(float(i), float(-i))
+
+        timestamps, sharpes = history.ordered()
+
+        assert timestamps.tolist() == [2.0, 3.0, 4.0]
+        assert sharpes.tolist() == [-2.0, -3.0, -4.0]
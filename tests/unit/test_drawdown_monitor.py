@@ -0,0 +1,155 @@
+"""
+Drawdown monitor tests.
+
+Checks the batch replay path against per-tick updates.
+"""
+
+import pytest
+import numpy as np
+
+from src.risk.drawdown_monitor import DrawdownMonitor
+
+
+@pytest.fixture
+def equity_curve():
+    """Deterministic random-walk equity curve with several drawdowns."""
+    rng = np.random.default_rng(3)
+    return 100000.0 * np.cumprod(1 + rng.normal(0.0, 0.02, 300))
+
+
+class TestUpdateSeries:
+    """Tests for update_series."""
+
+    def test_matches_tick_updates(self, equity_curve):
+        """Drawdowns and final state equal a per-tick replay."""
+        tick = DrawdownMonitor(initial_equity=100000.0)
+        batch = DrawdownMonitor(initial_equity=100000.0)
+
+        expected = [tick.update(e).current_drawdown_pct for e in equity_curve]
+        result = batch.update_series(equity_curve)
+
+        np.testing.assert_allclose(result, expected)
+        assert batch.peak_equity == tick.peak_equity
+        assert batch.max_drawdown_pct == pytest.approx(tick.max_drawdown_pct)
+
+    def test_continues_from_existing_peak(self, equity_curve):
+        """A second series is measured against the peak of the first."""
+        monitor = DrawdownMonitor()
+
+        monitor.update_series(equity_curve[:150])
+        peak = monitor.peak_equity
+        result = monitor.update_series(np.full(3, peak / 2))
+
+        np.testing.assert_allclose(result, -50.0)
+        assert monitor.peak_equity == peak
+        assert monitor.max_drawdown_pct <= -50.0
+
+    def test_metrics_buffer_matches_tick_metrics(self, equity_curve):
+        """Every buffer record equals the DrawdownMetrics update() returns."""
+        tick = DrawdownMonitor(initial_equity=100000.0, bars_per_day=7)
+        batch = DrawdownMonitor(initial_equity=100000.0, bars_per_day=7)
+
+        metrics = [tick.update(e) for e in equity_curve]
+        batch.update_series(equity_curve[:100])
+        batch.update_series(equity_curve[100:])
+        expected = metrics[100:]
+        buffer = batch.metrics_buffer
+
+        assert len(buffer) == len(expected)
+        for field in buffer.dtype.names:
+            np.testing.assert_allclose(
+                buffer[field], [getattr(m, field) for m in expected], err_msg=field
+            )
+
+    def test_metrics_are_slotted(self):
+        """Per-tick metrics carry no instance __dict__."""
+        metrics = DrawdownMonitor().update(100.0)
+
+        assert not hasattr(metrics, "__dict__")
+
+    def test_peak_tick_is_last_new_high(self):
+        """Peak tick indexes the last strict new high; ticks continue after."""
+        monitor = DrawdownMonitor()
+
+        monitor.update_series([100.0, 105.0, 103.0, 105.0, 101.0])
+        metrics = monitor.update(102.0)
+
+        assert monitor.peak_tick == 1
+        assert metrics.days_since_peak == 4
+
+
+class TestDaysSincePeak:
+    """Tick-based days_since_peak."""
+
+    def test_counts_bars_per_day(self):
+        """Ticks since the peak are converted to whole days."""
+        monitor = DrawdownMonitor(bars_per_day=3)
+
+        for equity in (100.0, 110.0, 108.0, 107.0, 106.0, 105.0):
+            metrics = monitor.update(equity)
+
+        assert monitor.peak_tick == 1
+        assert metrics.days_since_peak == 1
+
+    def test_explicit_tick_index(self):
+        """Caller-supplied indices (e.g. day ordinals) drive the count."""
+        monitor = DrawdownMonitor()
+
+        monitor.update(100.0, tick_index=738000)
+        metrics = monitor.update(95.0, tick_index=738005)
+
+        assert metrics.days_since_peak == 5
+        assert monitor.update(94.0).days_since_peak == 6
+
+
+class TestPositionScale:
+    """Scalar and batch position scaling."""
+
+    def test_batch_matches_scalar(self, equity_curve):
+        """Batch scales equal get_position_scale on each tick's metrics."""
+        monitor = DrawdownMonitor(
+            max_daily_drawdown_pct=3.0,
+            max_total_drawdown_pct=10.0,
+            initial_equity=100000.0,
+        )
+        metrics = [monitor.update(e) for e in equity_curve]
+
+        expected = [monitor.get_position_scale(m) for m in metrics]
+        result = monitor.get_position_scale_batch(
+            [m.current_drawdown_pct for m in metrics],
+            [m.total_drawdown_pct for m in metrics],
+        )
+
+        np.testing.assert_allclose(result, expected)
+        assert set(expected) == {0.0, 0.25, 1.0}
+
+
+class TestCachedInverses:
+    """Multiply-by-inverse drawdowns keep the zero-guard semantics."""
+
+    def test_no_initial_equity(self):
+        """Missing or zero initial equity yields zero total drawdown."""
+        for initial in (None, 0.0):
+            monitor = DrawdownMonitor(initial_equity=initial)
+
+            metrics = monitor.update(95.0)
+
+            assert metrics.total_drawdown_pct == 0.0
+
+    def test_initial_equity_reassigned(self):
+        """Setting initial_equity later refreshes the cached inverse."""
+        monitor = DrawdownMonitor()
+        monitor.initial_equity = 200.0
+
+        metrics = monitor.update(150.0)
+
+        assert metrics.total_drawdown_pct == pytest.approx(-25.0)
+
+    def test_non_positive_peak(self):
+        """A non-positive peak reports zero current drawdown."""
+        monitor = DrawdownMonitor()
+
+        monitor.update(0.0)
+        metrics = monitor.update(-10.0)
+
+        assert metrics.current_drawdown_pct == 0.0
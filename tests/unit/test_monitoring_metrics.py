@@ -0,0 +1,318 @@
+"""
+Monitoring metrics tests.
+
+Checks the NumPy metric kernels against straightforward pandas references.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.monitoring import metrics as metrics_module
+from src.monitoring.metrics import (
+    MetricsCollector,
+    MetricsBuffer,
+    RollingReturnStats,
+    RunningDrawdown,
+)
+from src.storage.duckdb_store import DuckDBStore
+
+
+@pytest.fixture
+def returns():
+    """Deterministic mix of positive and negative daily returns."""
+    rng = np.random.default_rng(42)
+    return pd.Series(rng.normal(0.0005, 0.01, 120))
+
+
+class TestMetricsCollectorKernels:
+    """Vectorized Sharpe/Sortino/drawdown match the pandas formulas."""
+
+    def test_sharpe_matches_pandas(self, returns):
+        """Sharpe uses sample std (ddof=1) like pandas."""
+        collector = MetricsCollector()
+        recent = returns.tail(30)
+
+        expected = recent.mean() / recent.std() * np.sqrt(252)
+        result = collector._calculate_sharpe(recent.to_numpy())
+
+        assert result == pytest.approx(expected)
+
+    def test_sortino_matches_pandas(self, returns):
+        """Sortino uses the sample std of negative returns."""
+        collector = MetricsCollector()
+        recent = returns.tail(30)
+
+        expected = recent.mean() / recent[recent < 0].std() * np.sqrt(252)
+        result = collector._calculate_sortino(recent.to_numpy())
+
+        assert result == pytest.approx(expected)
+
+    def test_sortino_without_losses(self):
+        """No downside returns with positive mean gives infinite Sortino."""
+        collector = MetricsCollector()
+
+        assert collector._calculate_sortino(np.full(30, 0.01)) == float("inf")
+
+    def test_drawdowns_match_pandas(self, returns):
+        """Equity curve and drawdowns match the expanding-max formulation."""
+        collector = MetricsCollector()
+        equity = 100000.0 * (1 + returns).cumprod()
+
+        running_max = equity.expanding().max()
+        expected_max = abs(((equity - running_max) / running_max).min())
+        expected_current = (equity.iloc[-1] - equity.max()) / equity.max()
+
+        curve = collector._returns_to_equity(returns.to_numpy(), 100000.0)
+
+        np.testing.assert_allclose(curve, equity.to_numpy())
+        assert collector._calculate_max_drawdown(curve) == pytest.approx(expected_max)
+        assert collector._calculate_current_drawdown(curve) == pytest.approx(expected_current)
+
+    def test_drawdowns_accept_series(self, returns):
+        """Drawdown kernels unwrap pandas Series input."""
+        collector = MetricsCollector()
+        equity = 100000.0 * (1 + returns).cumprod()
+
+        assert collector._calculate_max_drawdown(equity) == pytest.approx(
+            collector._calculate_max_drawdown(equity.to_numpy())
+        )
+        assert collector._calculate_current_drawdown(equity) == pytest.approx(
+            collector._calculate_current_drawdown(equity.to_numpy())
+        )
+
+    def test_calculate_metrics_with_history(self, returns):
+        """Full metrics tick populates risk metrics from history."""
+        collector = MetricsCollector()
+
+        metrics = collector.calculate_metrics(
+            equity=101000.0,
+            cash=50000.0,
+            positions_value=51000.0,
+            initial_equity=100000.0,
+            returns_history=returns,
+        )
+
+        assert metrics.cumulative_return == pytest.approx(0.01)
+        assert metrics.sharpe_30d is not None
+        assert metrics.max_drawdown >= 0.0
+        assert metrics.current_drawdown <= 0.0
+
+
+class TestRollingReturnStats:
+    """Incremental Sharpe/Sortino match the batch kernels."""
+
+    def test_matches_batch_after_window_slides(self, returns):
+        """Running moments agree with a full recompute over the last window."""
+        collector = MetricsCollector()
+        stats = RollingReturnStats(window=30)
+
+        for r in returns:
+            stats.push(float(r))
+
+        recent = returns.tail(30).to_numpy()
+        assert len(stats) == 30
+        assert stats.sharpe() == pytest.approx(collector._calculate_sharpe(recent))
+        assert stats.sortino() == pytest.approx(collector._calculate_sortino(recent))
+
+    def test_constant_returns(self):
+        """Zero variance yields zero Sharpe and infinite Sortino for gains."""
+        stats = RollingReturnStats(window=5)
+
+        for _ in range(12):
+            stats.push(0.01)
+
+        assert stats.sharpe() == 0.0
+        assert stats.sortino() == float("inf")
+
+    def test_collector_records_day_closes(self):
+        """One close-to-close return is pushed per completed day."""
+        collector = MetricsCollector()
+        start = datetime(2024, 1, 2, 10, 0)
+
+        collector._record_daily_close(start, 100.0)
+        collector._record_daily_close(start + timedelta(hours=5), 102.0)
+        collector._record_daily_close(start + timedelta(days=1), 103.0)
+        collector._record_daily_close(start + timedelta(days=2), 105.0)
+
+        assert list(collector.daily_returns._returns) == [pytest.approx(103.0 / 102.0 - 1)]
+
+
+class TestRunningDrawdown:
+    """Running drawdown state matches the batch kernels."""
+
+    def test_matches_batch(self, returns):
+        """Streaming updates agree with the full equity-curve computation."""
+        collector = MetricsCollector()
+        tracker = RunningDrawdown()
+
+        for r in returns:
+            tracker.push(float(r))
+
+        curve = collector._returns_to_equity(returns.to_numpy(), 1.0)
+        assert tracker.equity == pytest.approx(curve[-1])
+        assert tracker.max_drawdown == pytest.approx(collector._calculate_max_drawdown(curve))
+        assert tracker.current_drawdown == pytest.approx(
+            collector._calculate_current_drawdown(curve)
+        )
+
+    def test_seeded_collector_uses_running_state(self, returns):
+        """Seeded collector reports risk metrics without a returns history."""
+        collector = MetricsCollector()
+        collector.seed_daily_returns(returns, last_close=100000.0)
+
+        metrics = collector.calculate_metrics(
+            equity=100000.0, cash=0.0, positions_value=100000.0, initial_equity=100000.0,
+        )
+
+        expected = MetricsCollector().calculate_metrics(
+            equity=100000.0,
+            cash=0.0,
+            positions_value=100000.0,
+            initial_equity=100000.0,
+            returns_history=returns,
+        )
+        assert metrics.sharpe_30d == pytest.approx(expected.sharpe_30d)
+        assert metrics.sortino_30d == pytest.approx(expected.sortino_30d)
+        assert metrics.max_drawdown == pytest.approx(expected.max_drawdown)
+        assert metrics.current_drawdown == pytest.approx(expected.current_drawdown)
+
+
+class TestTickDrawdown:
+    """Scalar drawdown against the running equity peak."""
+
+    def _tick(self, collector, equity):
+        return collector.calculate_metrics(
+            equity=equity, cash=equity, positions_value=0.0, initial_equity=100.0,
+        )
+
+    def test_current_and_max_from_peak(self):
+        """Drawdown is measured from the highest equity seen so far."""
+        collector = MetricsCollector()
+
+        self._tick(collector, 100.0)
+        self._tick(collector, 120.0)
+        self._tick(collector, 90.0)
+        metrics = self._tick(collector, 108.0)
+
+        assert metrics.current_drawdown == pytest.approx(108.0 / 120.0 - 1.0)
+        assert metrics.max_drawdown == pytest.approx(0.25)
+
+
+class TestPortfolioMetrics:
+    """Snapshot container and collector history."""
+
+    def test_to_dict_columns(self):
+        """to_dict emits every storage column with an ISO timestamp."""
+        metrics = MetricsCollector().calculate_metrics(
+            equity=100000.0,
+            cash=40000.0,
+            positions_value=60000.0,
+            initial_equity=100000.0,
+            num_positions=3,
+        )
+
+        row = metrics.to_dict()
+
+        assert list(row) == [
+            "timestamp", "equity", "cash", "positions_value", "daily_return",
+            "cumulative_return", "sharpe_30d", "sortino_30d", "max_drawdown",
+            "current_drawdown", "num_positions", "num_open_orders",
+            "strategy_attribution",
+        ]
+        assert row["timestamp"] == metrics.timestamp.isoformat()
+        assert row["num_positions"] == 3
+        assert row["strategy_attribution"] == {}
+        assert not hasattr(metrics, "__dict__")
+
+    def test_history_is_bounded(self, monkeypatch):
+        """Collector keeps only the most recent snapshots."""
+        monkeypatch.setattr(metrics_module, "METRICS_HISTORY_SIZE", 3)
+        collector = MetricsCollector()
+
+        for equity in (100.0, 101.0, 102.0, 103.0, 104.0):
+            collector.calculate_metrics(
+                equity=equity, cash=equity, positions_value=0.0, initial_equity=100.0,
+            )
+
+        assert [m.equity for m in collector.metrics_history] == [102.0, 103.0, 104.0]
+        assert collector.get_latest_metrics().equity == 104.0
+
+    def test_history_window(self):
+        """get_metrics_history returns only snapshots inside the window."""
+        collector = MetricsCollector()
+
+        for equity in (100.0, 101.0, 102.0):
+            collector.calculate_metrics(
+                equity=equity, cash=equity, positions_value=0.0, initial_equity=100.0,
+            )
+        collector.metrics_history[0].timestamp -= timedelta(days=45)
+
+        recent = collector.get_metrics_history(days=30)
+
+        assert [m.equity for m in recent] == [101.0, 102.0]
+
+
+class TestMetricsBuffer:
+    """Batched performance inserts."""
+
+    def _metrics(self, collector, equity):
+        """Build a metrics snapshot for the given equity."""
+        return collector.calculate_metrics(
+            equity=equity,
+            cash=equity / 2,
+            positions_value=equity / 2,
+            initial_equity=100000.0,
+        )
+
+    def test_flush_on_capacity(self, temp_dir):
+        """Rows are written once capacity ticks accumulate, one per day."""
+        store = DuckDBStore(str(temp_dir / "test.duckdb"))
+        buffer = MetricsBuffer(store, capacity=3, flush_interval_seconds=3600)
+        collector = MetricsCollector()
+
+        buffer.append(self._metrics(collector, 100000.0))
+        buffer.append(self._metrics(collector, 100500.0))
+        assert store.execute("SELECT COUNT(*) FROM performance")[0][0] == 0
+
+        buffer.append(self._metrics(collector, 101000.0))
+
+        rows = store.execute("SELECT equity, sharpe_30d FROM performance")
+        assert rows == [(101000.0, None)]
+        store.close()
+
+    def test_coalesces_latest_per_day(self, temp_dir):
+        """Only the last snapshot of each day is written, NaN as NULL."""
+        store = DuckDBStore(str(temp_dir / "test.duckdb"))
+        buffer = MetricsBuffer(store, capacity=64, flush_interval_seconds=3600)
+        collector = MetricsCollector()
+
+        first = self._metrics(collector, 100000.0)
+        first.timestamp -= timedelta(days=1)
+        buffer.append(first)
+        buffer.append(self._metrics(collector, 100500.0))
+        last = self._metrics(collector, 101000.0)
+        last.strategy_attribution = {"ema": 0.5}
+        buffer.append(last)
+
+        assert buffer.flush() == 2
+        rows = store.execute(
+            "SELECT equity, sharpe_30d, strategy_attribution FROM performance ORDER BY date"
+        )
+        assert [(r[0], r[1]) for r in rows] == [(100000.0, None), (101000.0, None)]
+        assert '"ema"' in rows[1][2]
+        store.close()
+
+    def test_explicit_flush(self, temp_dir):
+        """flush() persists pending rows (used on shutdown)."""
+        store = DuckDBStore(str(temp_dir / "test.duckdb"))
+        buffer = MetricsBuffer(store, capacity=64, flush_interval_seconds=3600)
+
+        buffer.append(self._metrics(MetricsCollector(), 99000.0))
+
+        assert buffer.flush() == 1
+        assert buffer.flush() == 0
+        assert store.execute("SELECT COUNT(*) FROM performance")[0][0] == 1
+        store.close()
@@ -0,0 +1,352 @@
+"""
+Sentiment NLP pipeline tests.
+
+FinBERT itself is replaced by a fake tokenizer and forward pass so the
+batching logic runs without downloading the model.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+
+from src.sentiment.processing import nlp_pipeline
+from src.sentiment.processing.nlp_pipeline import SentimentPipeline
+
+
+class _Probs:
+    """Stand-in for a probabilities tensor."""
+
+    def __init__(self, rows, on_read=None):
+        self.rows = np.asarray(rows, dtype=np.float32)
+        self.on_read = on_read
+
+    def cpu(self):
+        if self.on_read:
+            self.on_read()
+        return self
+
+    def numpy(self):
+        return self.rows
+
+
+def _fake_probs(text):
+    """Deterministic class probabilities derived from the word count."""
+    words = len(text.split())
+    return np.array([words % 3 + 1, words % 5 + 1, 1.0], dtype=np.float32) / (
+        words % 3 + words % 5 + 3
+    )
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Basic pipeline, no model loaded."""
+    monkeypatch.setattr(nlp_pipeline, "TRANSFORMERS_AVAILABLE", False)
+    return SentimentPipeline()
+
+
+@pytest.fixture
+def finbert(pipeline):
+    """Pipeline with a fake tokenizer and forward pass that records batches."""
+    pipeline.tokenized = []
+
+    def tokenizer(texts, **kwargs):
+        pipeline.tokenized.append(list(texts))
+        return {"input_ids": [text.split() for text in texts]}
+
+    pipeline.tokenizer = tokenizer
+    pipeline.model = object()
+    pipeline.batches = []
+    pipeline.events = []
+
+    def forward(encoded):
+        texts = [" ".join(ids) for ids in encoded["input_ids"]]
+        n = len(pipeline.batches)
+        pipeline.batches.append(texts)
+        pipeline.events.append(f"forward {n}")
+        return _Probs(
+            [_fake_probs(text) for text in texts],
+            on_read=lambda: pipeline.events.append(f"read {n}"),
+        )
+
+    pipeline._forward = forward
+    return pipeline
+
+
+class TestAnalyzeSentimentBatch:
+    """Batched FinBERT inference."""
+
+    def test_results_in_input_order(self, finbert, monkeypatch):
+        """Bucketed batches are scattered back to the original positions."""
+        monkeypatch.setattr(SentimentPipeline, "BATCH_SIZE", 4)
+        rng = np.random.default_rng(3)
+        texts = [" ".join([f"w{i}"] * int(n)) for i, n in enumerate(rng.integers(1, 40, 19))]
+        texts[5] = "   "
+
+        results = finbert.analyze_sentiment_batch(texts)
+
+        assert len(results) == len(texts)
+        assert results[5] == {"score": 0.0, "label": "neutral", "confidence": 0.0}
+        for i, text in enumerate(texts):
+            if i != 5:
+                assert results[i] == finbert._scores_to_result(_fake_probs(text))
+        assert [len(batch) for batch in finbert.batches] == [4, 4, 4, 4, 2]
+        lengths = [len(text.split()) for batch in finbert.batches for text in batch]
+        assert lengths == sorted(lengths)
+
+    def test_tokenized_once(self, finbert, monkeypatch):
+        """One tokenizer call serves both length bucketing and every batch."""
+        monkeypatch.setattr(SentimentPipeline, "BATCH_SIZE", 2)
+        texts = ["a b c", "d", "e f", "g h i j", "k"]
+
+        finbert.analyze_sentiment_batch(texts)
+
+        assert finbert.tokenized == [texts]
+        assert finbert.batches == [["d", "k"], ["e f", "a b c"], ["g h i j"]]
+
+    def test_next_batch_launched_before_readback(self, finbert, monkeypatch):
+        """Batch N is read back only after batch N+1 has been sent to the model."""
+        monkeypatch.setattr(SentimentPipeline, "BATCH_SIZE", 2)
+
+        finbert.analyze_sentiment_batch(["a", "b", "c d", "e f", "g h i"])
+
+        assert finbert.events == [
+            "forward 0", "forward 1", "read 0", "forward 2", "read 1", "read 2",
+        ]
+
+    def test_readback_error_falls_back_for_that_batch(self, finbert, monkeypatch):
+        """An error surfacing at readback only affects its own batch."""
+        monkeypatch.setattr(SentimentPipeline, "BATCH_SIZE", 1)
+        forward = finbert._forward
+
+        def device_assert():
+            raise RuntimeError("device-side assert triggered")
+
+        def failing_read(encoded):
+            probs = forward(encoded)
+            if encoded["input_ids"] == [["crash"]]:
+                probs.cpu = device_assert
+            return probs
+
+        finbert._forward = failing_read
+
+        results = finbert.analyze_sentiment_batch(["crash", "rally today"])
+
+        assert results[0] == finbert._analyze_basic("crash")
+        assert results[1] == finbert._scores_to_result(_fake_probs("rally today"))
+
+    def test_single_text_matches_batch(self, finbert):
+        """analyze_sentiment is the one-element batch."""
+        text = "shares rally after earnings beat"
+
+        single = finbert.analyze_sentiment(text)
+        finbert._result_cache.clear()
+
+        assert single == finbert.analyze_sentiment_batch([text])[0]
+        assert finbert.batches == [[text], [text]]
+
+    def test_scores_to_result(self, pipeline):
+        """Label and signed score follow the most probable class."""
+        negative = pipeline._scores_to_result(np.array([0.1, 0.7, 0.2]))
+        neutral = pipeline._scores_to_result(np.array([0.2, 0.1, 0.7]))
+
+        assert negative["label"] == "negative"
+        assert negative["score"] == pytest.approx(-0.7)
+        assert neutral["label"] == "neutral"
+        assert neutral["score"] == 0.0
+
+    def test_failed_batch_falls_back_to_basic(self, finbert):
+        """A forward error scores that batch with keyword matching."""
+        def broken(texts):
+            raise RuntimeError("CUDA out of memory")
+
+        finbert._forward = broken
+
+        results = finbert.analyze_sentiment_batch(["bullish rally", "crash"])
+
+        assert results == [
+            finbert._analyze_basic("bullish rally"),
+            finbert._analyze_basic("crash"),
+        ]
+
+    def test_without_model_uses_basic(self, pipeline):
+        """No model loaded scores every text with keyword matching."""
+        texts = ["bullish breakout", "", "bearish dump"]
+
+        results = pipeline.analyze_sentiment_batch(texts)
+
+        assert results == [pipeline.analyze_sentiment(text) for text in texts]
+
+
+class TestResultCache:
+    """Repeated texts skip the model."""
+
+    def test_repeated_text_hits_cache(self, finbert):
+        """Duplicates within and across calls are forwarded once."""
+        texts = ["to the moon", "guidance cut", "to the moon"]
+
+        first = finbert.analyze_sentiment_batch(texts)
+        second = finbert.analyze_sentiment("guidance cut")
+
+        assert finbert.batches == [["to the moon", "guidance cut"]]
+        assert first[0] is first[2]
+        assert second is first[1]
+
+    def test_cache_is_bounded(self, finbert, monkeypatch):
+        """The least recently used results are evicted first."""
+        monkeypatch.setattr(SentimentPipeline, "RESULT_CACHE_SIZE", 2)
+
+        finbert.analyze_sentiment("a b")
+        finbert.analyze_sentiment("c d e")
+        finbert.analyze_sentiment("a b")
+        finbert.analyze_sentiment("f")
+        finbert.analyze_sentiment("a b")
+        finbert.analyze_sentiment("c d e")
+
+        assert finbert.batches == [["a b"], ["c d e"], ["f"], ["c d e"]]
+
+    def test_fallback_not_cached(self, finbert):
+        """Keyword results after a failed forward pass are retried next time."""
+        forward = finbert._forward
+
+        def broken(texts):
+            raise RuntimeError("CUDA out of memory")
+
+        finbert._forward = broken
+        fallback = finbert.analyze_sentiment("bullish rally")
+        finbert._forward = forward
+        result = finbert.analyze_sentiment("bullish rally")
+
+        assert "probabilities" not in fallback
+        assert "probabilities" in result
+
+
+class TestSharedPipeline:
+    """Process-wide pipelines."""
+
+    @pytest.fixture(autouse=True)
+    def _no_model(self, monkeypatch):
+        """Basic pipelines only; shared instances dropped after each test."""
+        monkeypatch.setattr(nlp_pipeline, "TRANSFORMERS_AVAILABLE", False)
+        yield
+        SentimentPipeline.release_shared()
+
+    def test_same_settings_share_instance(self):
+        """Equal arguments return one instance; other settings get their own."""
+        shared = SentimentPipeline.get_shared()
+
+        assert SentimentPipeline.get_shared() is shared
+        assert SentimentPipeline.get_shared(use_gpu=False) is not shared
+
+    def test_concurrent_callers_load_once(self, monkeypatch):
+        """Threads racing on the first call construct a single pipeline."""
+        created = []
+        init = SentimentPipeline.__init__
+
+        def slow_init(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)
+            init(self, *args, **kwargs)
+
+        monkeypatch.setattr(SentimentPipeline, "__init__", slow_init)
+
+        with ThreadPoolExecutor(8) as pool:
+            pipelines = list(pool.map(lambda _: SentimentPipeline.get_shared(), range(8)))
+
+        assert len(created) == 1
+        assert all(p is created[0] for p in pipelines)
+
+    def test_release_shared(self):
+        """Released pipelines are rebuilt on the next call."""
+        shared = SentimentPipeline.get_shared()
+
+        SentimentPipeline.release_shared()
+
+        assert SentimentPipeline.get_shared() is not shared
+
+
+class TestBackends:
+    """Backend selection and sequence buckets."""
+
+    def test_unknown_backend(self, monkeypatch):
+        """Unsupported backends are rejected."""
+        monkeypatch.setattr(nlp_pipeline, "TRANSFORMERS_AVAILABLE", False)
+
+        with pytest.raises(ValueError, match="backend"):
+            SentimentPipeline(backend="tensorrt")
+
+    def test_onnx_without_optimum_uses_eager(self, monkeypatch):
+        """Missing optimum falls back to the eager backend."""
+        monkeypatch.setattr(nlp_pipeline, "TRANSFORMERS_AVAILABLE", False)
+        monkeypatch.setattr(nlp_pipeline, "OPTIMUM_AVAILABLE", False)
+
+        assert SentimentPipeline(backend="onnx").backend == "eager"
+
+    def test_bucket_length(self, pipeline):
+        """Lengths round up to the next bucket, capped at 512."""
+        assert [pipeline._bucket_length(n) for n in (1, 128, 129, 300, 512, 600)] == [
+            128, 128, 256, 512, 512, 512,
+        ]
+
+
+class TestAnalyzeBasic:
+    """Keyword fallback."""
+
+    def test_counts_whole_words(self, pipeline):
+        """Keywords inside other words are ignored; repeats count."""
+        result = pipeline._analyze_basic("Support held, BUY buy and hold the rally")
+
+        assert result["label"] == "positive"
+        assert result["score"] == pytest.approx(0.3)
+
+    def test_negative_and_neutral(self, pipeline):
+        """More negative hits gives a negative score; ties are neutral."""
+        negative = pipeline._analyze_basic("bearish, expecting a crash. bear market")
+        neutral = pipeline._analyze_basic("buy the dip or sell the rip")
+
+        assert negative["score"] == pytest.approx(-0.3)
+        assert negative["label"] == "negative"
+        assert neutral == {"score": 0.0, "label": "neutral", "confidence": 0.0}
+
+    def test_score_capped(self, pipeline):
+        """Scores are capped at 0.5 in magnitude."""
+        result = pipeline._analyze_basic("moon " * 20)
+
+        assert result["score"] == 0.5
+
+
+class TestAggregateSentiment:
+    """Aggregation matches the NumPy reference statistics."""
+
+    def _reference(self, scores, weights=None):
+        """Straightforward per-statistic computation."""
+        arr = np.array(scores)
+        return {
+            "mean": np.average(arr, weights=weights) if weights else arr.mean(),
+            "median": np.median(arr),
+            "std": arr.std(),
+            "count": len(scores),
+            "positive_ratio": np.sum(arr > 0) / len(arr),
+            "negative_ratio": np.sum(arr < 0) / len(arr),
+        }
+
+    @pytest.mark.parametrize("n", [1, 2, 7, 250])
+    def test_matches_reference(self, pipeline, n):
+        """Every statistic equals the reference, odd and even counts."""
+        rng = np.random.default_rng(n)
+        scores = list(np.round(rng.uniform(-1, 1, n), 1))
+        weights = list(rng.uniform(1, 100, n))
+
+        for w in (None, weights):
+            result = pipeline.aggregate_sentiment(scores, w)
+            expected = self._reference(scores, w)
+
+            assert result == pytest.approx(expected)
+            assert type(result["mean"]) is float
+
+    def test_empty(self, pipeline):
+        """No scores gives zeros."""
+        assert pipeline.aggregate_sentiment([]) == {
+            "mean": 0.0, "median": 0.0, "std": 0.0, "count": 0,
+        }
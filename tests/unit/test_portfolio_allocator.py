@@ -0,0 +1,111 @@
+"""
+Portfolio allocator tests.
+
+Checks correlation adjustment and rebalance results.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.portfolio.allocator import PortfolioAllocator
+
+
+def _pairwise_reference(allocations, correlation_matrix):
+    """Original pairwise loop the vectorized adjustment must match."""
+    adjusted = allocations.copy()
+    symbols = list(allocations)
+    for i, symbol1 in enumerate(symbols):
+        for symbol2 in symbols[i + 1:]:
+            if symbol1 in correlation_matrix.index and symbol2 in correlation_matrix.columns:
+                correlation = correlation_matrix.loc[symbol1, symbol2]
+                if abs(correlation) > 0.7:
+                    reduction = abs(correlation) - 0.7
+                    adjusted[symbol1] *= (1 - reduction * 0.5)
+                    adjusted[symbol2] *= (1 - reduction * 0.5)
+    return adjusted
+
+
+class TestCorrelationAdjustment:
+    """Tests for _adjust_for_correlation."""
+
+    def test_matches_pairwise_loop(self):
+        """Vectorized adjustment equals the pairwise reference."""
+        rng = np.random.default_rng(7)
+        symbols = [f"S{i}" for i in range(12)]
+        raw = rng.uniform(-1, 1, (12, 12))
+        values = (raw + raw.T) / 2
+        np.fill_diagonal(values, 1.0)
+        corr = pd.DataFrame(values, index=symbols, columns=symbols)
+        allocations = {s: rng.uniform(0.01, 0.1) for s in symbols}
+
+        result = PortfolioAllocator()._adjust_for_correlation(allocations, corr)
+        expected = _pairwise_reference(allocations, corr)
+
+        assert list(result) == list(expected)
+        for symbol in symbols:
+            assert result[symbol] == pytest.approx(expected[symbol])
+
+    def test_symbols_missing_from_matrix_untouched(self):
+        """Symbols outside the matrix keep their allocation."""
+        corr = pd.DataFrame(
+            [[1.0, 0.9], [0.9, 1.0]], index=["AAPL", "MSFT"], columns=["AAPL", "MSFT"]
+        )
+        allocations = {"AAPL": 0.1, "MSFT": 0.1, "XOM": 0.05}
+
+        result = PortfolioAllocator()._adjust_for_correlation(allocations, corr)
+
+        assert result["AAPL"] == pytest.approx(0.1 * 0.9)
+        assert result["MSFT"] == pytest.approx(0.1 * 0.9)
+        assert result["XOM"] == 0.05
+
+
+class TestAllocate:
+    """Tests for allocate()."""
+
+    def test_rebalance_results(self):
+        """Targets and current positions are diffed per symbol."""
+        allocator = PortfolioAllocator(max_position_pct=10.0)
+        signals = [
+            {"symbol": "AAPL", "suggested_size_pct": 8.0, "confidence": 1.0},
+            {"symbol": "MSFT", "suggested_size_pct": 20.0, "confidence": 1.0},
+        ]
+        positions = {"AAPL": {"market_value": 8000.0}, "TSLA": {"market_value": 5000.0}}
+
+        results = {
+            r.symbol: r for r in allocator.allocate(signals, positions, portfolio_value=100000.0)
+        }
+
+        assert set(results) == {"AAPL", "MSFT", "TSLA"}
+        assert not results["AAPL"].rebalance_needed
+        assert results["MSFT"].target_size_pct == pytest.approx(10.0)
+        assert results["MSFT"].rebalance_amount == pytest.approx(10000.0)
+        assert results["TSLA"].rebalance_amount == pytest.approx(-5000.0)
+
+    def test_result_order_and_types(self):
+        """Signal symbols come first, then held-only symbols, as plain Python scalars."""
+        allocator = PortfolioAllocator()
+        signals = [
+            {"symbol": "MSFT", "suggested_size_pct": 5.0, "confidence": 1.0},
+            {"symbol": "AAPL", "suggested_size_pct": 5.0, "confidence": 1.0},
+        ]
+        positions = {"TSLA": {"market_value": 1000.0}, "AAPL": {"market_value": 5000.0}}
+
+        results = allocator.allocate(signals, positions, portfolio_value=100000.0)
+
+        assert [r.symbol for r in results] == ["MSFT", "AAPL", "TSLA"]
+        assert type(results[0].rebalance_needed) is bool
+        assert type(results[0].rebalance_amount) is float
+
+    def test_no_rebalance_returns_empty(self):
+        """Steady state yields no results unless full output is requested."""
+        signals = [{"symbol": "AAPL", "suggested_size_pct": 8.0, "confidence": 1.0}]
+        positions = {"AAPL": {"market_value": 8000.0}}
+
+        quiet = PortfolioAllocator().allocate(signals, positions, portfolio_value=100000.0)
+        full = PortfolioAllocator(return_empty_on_no_rebalance=False).allocate(
+            signals, positions, portfolio_value=100000.0
+        )
+
+        assert quiet == []
+        assert [(r.symbol, r.rebalance_needed) for r in full] == [("AAPL", False)]
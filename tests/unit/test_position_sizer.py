@@ -0,0 +1,260 @@
+"""
+Position sizer tests.
+
+Checks the batch sizing path against per-symbol calculate_size calls.
+"""
+
+import logging
+
+import pytest
+import numpy as np
+from structlog.testing import capture_logs
+
+from src.risk import position_sizer as position_sizer_module
+from src.risk.position_sizer import PositionSizer, PositionSizingMethod, kelly_size
+
+
+@pytest.fixture
+def universe():
+    """Prices, volatilities and regime scales including invalid entries."""
+    rng = np.random.default_rng(11)
+    prices = rng.uniform(5.0, 500.0, 40)
+    prices[3] = 0.0
+    vols = rng.uniform(0.05, 0.8, 40)
+    vols[[5, 9]] = [0.0, -0.1]
+    regimes = rng.uniform(0.25, 1.5, 40)
+    return prices, vols, regimes
+
+
+def _assert_matches(batch, expected):
+    """Batch arrays equal the scalar results field by field."""
+    for field in ("size_pct", "size_dollars", "size_shares"):
+        np.testing.assert_allclose(
+            getattr(batch, field), [getattr(r, field) for r in expected]
+        )
+
+
+class TestCalculateSizesBatch:
+    """Tests for calculate_sizes_batch."""
+
+    @pytest.mark.parametrize(
+        "method", [PositionSizingMethod.FIXED, PositionSizingMethod.VOLATILITY_ADJUSTED]
+    )
+    def test_matches_scalar(self, universe, method):
+        """Fixed and vol-adjusted rows equal calculate_size, fallbacks included."""
+        prices, vols, regimes = universe
+        sizer = PositionSizer(method=method, max_position_pct=8.0)
+
+        batch = sizer.calculate_sizes_batch(100000.0, prices, vols, regimes)
+        expected = [
+            sizer.calculate_size(100000.0, "X", p, volatility=v, regime_scale=r)
+            for p, v, r in zip(prices, vols, regimes)
+        ]
+
+        _assert_matches(batch, expected)
+        assert len(batch) == len(prices)
+
+    def test_kelly_matches_scalar(self, universe):
+        """Kelly rows equal calculate_size, invalid win rates fall back to fixed."""
+        prices, _, regimes = universe
+        rng = np.random.default_rng(5)
+        win_rates = rng.uniform(0.3, 0.8, 40)
+        win_rates[[0, 1]] = [0.0, 1.0]
+        avg_wins = rng.uniform(0.5, 3.0, 40)
+        avg_losses = rng.uniform(0.5, 2.0, 40)
+        avg_losses[2] = 0.0
+        sizer = PositionSizer(method=PositionSizingMethod.KELLY)
+
+        batch = sizer.calculate_sizes_batch(
+            50000.0, prices, regime_scales=regimes,
+            win_rates=win_rates, avg_wins=avg_wins, avg_losses=avg_losses,
+        )
+        expected = [
+            sizer.calculate_size(
+                50000.0, "X", p, win_rate=w, avg_win=aw, avg_loss=al, regime_scale=r
+            )
+            for p, w, aw, al, r in zip(prices, win_rates, avg_wins, avg_losses, regimes)
+        ]
+
+        _assert_matches(batch, expected)
+        assert batch.method == "kelly"
+
+    def test_kelly_numexpr_matches_numpy(self, monkeypatch):
+        """Fused numexpr kernel and NumPy fallback agree."""
+        pytest.importorskip("numexpr")
+        rng = np.random.default_rng(8)
+        win_rates = rng.uniform(-0.1, 1.1, 200)
+        avg_wins = rng.uniform(0.1, 3.0, 200)
+        avg_losses = rng.uniform(-0.5, 2.0, 200)
+        prices = rng.uniform(5.0, 500.0, 200)
+        sizer = PositionSizer(method=PositionSizingMethod.KELLY)
+
+        fused = sizer.calculate_sizes_batch(
+            100000.0, prices, win_rates=win_rates, avg_wins=avg_wins, avg_losses=avg_losses,
+        )
+        monkeypatch.setattr(position_sizer_module, "NUMEXPR_AVAILABLE", False)
+        fallback = sizer.calculate_sizes_batch(
+            100000.0, prices, win_rates=win_rates, avg_wins=avg_wins, avg_losses=avg_losses,
+        )
+
+        np.testing.assert_allclose(fused.size_pct, fallback.size_pct)
+
+    def test_missing_volatility_uses_fixed(self, universe):
+        """No volatility array sizes every row with the fixed method."""
+        prices, _, _ = universe
+        sizer = PositionSizer(method=PositionSizingMethod.VOLATILITY_ADJUSTED)
+
+        batch = sizer.calculate_sizes_batch(100000.0, prices)
+
+        assert batch.method == "fixed"
+        np.testing.assert_allclose(batch.size_pct, sizer.base_position_pct)
+
+    def test_result_row(self, universe):
+        """A single row converts to a PositionSizeResult with a rationale."""
+        prices, vols, regimes = universe
+        sizer = PositionSizer()
+
+        batch = sizer.calculate_sizes_batch(100000.0, prices, vols, regimes)
+        row = batch.result(7)
+
+        assert row.size_pct == batch.size_pct[7]
+        assert type(row.size_dollars) is float
+        assert row.method == "volatility_adjusted"
+        assert row.rationale.startswith("Batch volatility_adjusted")
+
+
+class TestKellySize:
+    """Standalone scalar Kelly function."""
+
+    def test_matches_method(self):
+        """Valid and invalid inputs equal calculate_size with the Kelly method."""
+        sizer = PositionSizer(method=PositionSizingMethod.KELLY, max_position_pct=8.0)
+        cases = [
+            (0.55, 1.5, 1.0, 1.0, 120.0),
+            (0.9, 3.0, 0.5, 1.2, 40.0),
+            (0.3, 0.5, 1.0, 0.8, 10.0),
+            (0.0, 1.5, 1.0, 0.7, 50.0),
+            (0.6, 1.5, 0.0, 2.5, 50.0),
+            (0.6, 1.5, 1.0, 1.0, 0.0),
+        ]
+
+        for win_rate, avg_win, avg_loss, regime, price in cases:
+            expected = sizer.calculate_size(
+                100000.0, "X", price,
+                win_rate=win_rate, avg_win=avg_win, avg_loss=avg_loss, regime_scale=regime,
+            )
+            result = kelly_size(
+                100000.0, win_rate, avg_win, avg_loss, regime, price,
+                sizer.base_position_pct, sizer.max_position_pct,
+            )
+
+            assert result == (expected.size_pct, expected.size_dollars, expected.size_shares)
+
+
+class TestFrictionAdjustedKelly:
+    """Vectorized friction-adjusted Kelly weights."""
+
+    def _reference(self, sigma_hat, p_bull, f_tilde, max_pct):
+        """Per-symbol evaluation of the sizing rule."""
+        w_vol = min(2.0, (0.15 / np.sqrt(252)) / max(sigma_hat, 1e-8))
+        if abs(f_tilde) < 1e-4:
+            weight = 0.25 * w_vol
+        else:
+            weight = f_tilde * w_vol * min(max((p_bull - 0.5) / 0.5, 0.0), 1.0)
+        return min(max(weight, 0.0), max_pct / 100)
+
+    def test_matches_scalar_rule(self):
+        """Each weight equals the rule applied to that symbol alone."""
+        rng = np.random.default_rng(21)
+        sigma_hat = rng.uniform(0.0, 0.04, 50)
+        p_bull = rng.uniform(0.2, 1.0, 50)
+        f_tilde = rng.uniform(-0.2, 0.5, 50)
+        f_tilde[:5] = 0.0
+        sizer = PositionSizer(max_position_pct=20.0)
+
+        weights = sizer.calculate_friction_adjusted_kelly(sigma_hat, p_bull, f_tilde)
+
+        expected = [
+            self._reference(s, p, f, 20.0) for s, p, f in zip(sigma_hat, p_bull, f_tilde)
+        ]
+        np.testing.assert_allclose(weights, expected)
+        assert weights.max() == pytest.approx(0.2)
+
+    def test_float32(self):
+        """Single precision input stays single precision."""
+        sizer = PositionSizer()
+
+        weights = sizer.calculate_friction_adjusted_kelly(
+            [0.01, 0.02], [0.9, 0.6], [0.3, 0.0], dtype=np.float32
+        )
+
+        expected = [
+            self._reference(0.01, 0.9, 0.3, 10.0),
+            self._reference(0.02, 0.6, 0.0, 10.0),
+        ]
+        assert weights.dtype == np.float32
+        np.testing.assert_allclose(weights, expected, rtol=1e-6)
+
+
+class TestFallbackLogging:
+    """Fallback warnings are only built when the warning level is enabled."""
+
+    class _RecordingLogger:
+        """Logger stub recording the warnings it is asked to emit."""
+
+        def __init__(self):
+            self.calls = []
+
+        def warning(self, event, **kw):
+            self.calls.append(event)
+
+        def info(self, event, **kw):
+            pass
+
+    @pytest.fixture
+    def warnings_filtered(self):
+        """Raise the module's stdlib level above WARNING for one test."""
+        level_logger = logging.getLogger(position_sizer_module.__name__)
+        level_logger.setLevel(logging.ERROR)
+        yield
+        level_logger.setLevel(logging.NOTSET)
+
+    def test_warning_emitted(self):
+        """Enabled warnings are logged with the symbol."""
+        sizer = PositionSizer()
+
+        with capture_logs() as logs:
+            sizer.calculate_size(100000.0, "AAPL", 150.0)
+
+        assert {
+            "event": "volatility_missing_using_fixed",
+            "symbol": "AAPL",
+            "log_level": "warning",
+        } in logs
+
+    def test_warning_skipped_when_filtered(self, monkeypatch, warnings_filtered):
+        """Filtered warnings never reach the logger; sizing is unchanged."""
+        recorder = self._RecordingLogger()
+        sizer = PositionSizer(method=PositionSizingMethod.KELLY)
+        kelly_inputs = {"win_rate": 0.0, "avg_win": 1.0, "avg_loss": 1.0}
+        expected = sizer.calculate_size(100000.0, "AAPL", 150.0, **kelly_inputs)
+        monkeypatch.setattr(position_sizer_module, "logger", recorder)
+
+        result = sizer.calculate_size(100000.0, "AAPL", 150.0, **kelly_inputs)
+        sizer.calculate_size(100000.0, "AAPL", 150.0)
+
+        assert recorder.calls == []
+        assert result.size_pct == expected.size_pct
+
+    def test_logger_without_is_enabled_for(self, monkeypatch):
+        """Fallbacks work with bound loggers predating is_enabled_for()."""
+        recorder = self._RecordingLogger()
+        monkeypatch.setattr(position_sizer_module, "logger", recorder)
+        sizer = PositionSizer(method=PositionSizingMethod.KELLY)
+
+        result = sizer.calculate_size(
+            100000.0, "AAPL", 150.0, win_rate=0.6, avg_win=1.0, avg_loss=0.0
+        )
+
+        assert recorder.calls == ["invalid_avg_loss_using_fixed"]
+        assert result.method == "fixed"
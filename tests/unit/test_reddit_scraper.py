@@ -0,0 +1,398 @@
+"""
+Reddit scraper tests.
+
+The PRAW client is replaced by in-memory fakes; no network access.
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from src.sentiment.sources import reddit_scraper
+from src.sentiment.sources.reddit_scraper import (
+    AsyncRedditScraper,
+    RedditScraper,
+    RedditPost,
+    RedditComment,
+    posts_to_arrays,
+)
+
+
+class _Comment:
+    """Stand-in for praw.models.Comment."""
+
+    def __init__(self, comment_id, created_utc):
+        self.id = comment_id
+        self.body = f"comment {comment_id}"
+        self.score = 1
+        self.created_utc = created_utc
+
+
+class _Comments(list):
+    """Comment forest with PRAW's replace_more()."""
+
+    def replace_more(self, limit=None):
+        return []
+
+
+def _submission(post_id, age_hours, title="AAPL earnings", n_comments=0):
+    """Fake submission created age_hours ago by an established account."""
+    created = time.time() - age_hours * 3600
+    return SimpleNamespace(
+        id=post_id,
+        title=title,
+        selftext="",
+        score=10,
+        num_comments=n_comments,
+        url=f"https://reddit.com/{post_id}",
+        created_utc=created,
+        author=SimpleNamespace(created_utc=created - 400 * 86400, link_karma=5000),
+        comments=_Comments(_Comment(f"{post_id}c{i}", created) for i in range(n_comments)),
+    )
+
+
+class _Reddit:
+    """Fake praw.Reddit serving canned submissions per subreddit."""
+
+    posts = {}
+    threads = set()
+    delay = 0.0
+
+    def __init__(self, **credentials):
+        self.credentials = credentials
+
+    def subreddit(self, name):
+        client = self
+
+        class _Subreddit:
+            def search(self, query, sort, limit):
+                _Reddit.threads.add((threading.current_thread().name, id(client)))
+                time.sleep(_Reddit.delay)
+                if name == "broken":
+                    raise RuntimeError("503 Service Unavailable")
+                return iter(_Reddit.posts.get(name, [])[:limit])
+
+        return _Subreddit()
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    """Scraper wired to the fake Reddit client."""
+    monkeypatch.setattr(reddit_scraper.praw, "Reddit", _Reddit)
+    monkeypatch.setattr(reddit_scraper, "Comment", _Comment)
+    _Reddit.posts = {}
+    _Reddit.threads = set()
+    _Reddit.delay = 0.0
+    scraper = RedditScraper("id", "secret", "agent", subreddits=["a", "b", "broken", "c"])
+    yield scraper
+    scraper.close()
+
+
+class _AsyncComments(_Comments):
+    """Comment forest with asyncpraw's awaitable replace_more()."""
+
+    async def replace_more(self, limit=None):
+        return []
+
+
+class _AsyncAuthor(SimpleNamespace):
+    """Lazy asyncpraw Redditor; fields are only valid after load()."""
+
+    async def load(self):
+        self.loaded = True
+
+
+def _async_submission(post_id, age_hours, title="AAPL earnings", n_comments=0):
+    """Fake asyncpraw submission built from the sync fake."""
+    submission = _submission(post_id, age_hours, title, n_comments)
+    submission.author = _AsyncAuthor(**vars(submission.author), loaded=False)
+    submission.comments = _AsyncComments(submission.comments)
+
+    async def load():
+        submission.loaded = True
+
+    submission.load = load
+    return submission
+
+
+class _AsyncReddit:
+    """Fake asyncpraw.Reddit serving canned submissions per subreddit."""
+
+    posts = {}
+    threads = set()
+    delay = 0.0
+    closed = 0
+
+    def __init__(self, **credentials):
+        self.credentials = credentials
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        _AsyncReddit.closed += 1
+
+    async def subreddit(self, name):
+        class _Subreddit:
+            async def search(self, query, sort, limit):
+                _AsyncReddit.threads.add(threading.current_thread().name)
+                await asyncio.sleep(_AsyncReddit.delay)
+                if name == "broken":
+                    raise RuntimeError("503 Service Unavailable")
+                for submission in _AsyncReddit.posts.get(name, [])[:limit]:
+                    yield submission
+
+        return _Subreddit()
+
+
+@pytest.fixture
+def async_scraper(monkeypatch):
+    """Async scraper wired to the fake asyncpraw client."""
+    monkeypatch.setattr(reddit_scraper, "ASYNCPRAW_AVAILABLE", True)
+    monkeypatch.setattr(
+        reddit_scraper, "asyncpraw", SimpleNamespace(Reddit=_AsyncReddit), raising=False
+    )
+    monkeypatch.setattr(reddit_scraper, "AsyncComment", _Comment, raising=False)
+    _AsyncReddit.posts = {}
+    _AsyncReddit.threads = set()
+    _AsyncReddit.delay = 0.0
+    _AsyncReddit.closed = 0
+    return AsyncRedditScraper("id", "secret", "agent", subreddits=["a", "b", "broken", "c"])
+
+
+class TestScrapeSymbol:
+    """Concurrent subreddit scraping."""
+
+    def test_results_keep_order_within_subreddit(self, scraper):
+        """Each subreddit's posts are followed by their comments, in order."""
+        _Reddit.posts = {
+            "a": [_submission("a1", 1, n_comments=2)],
+            "c": [_submission("c1", 2), _submission("c2", 3)],
+        }
+
+        results = scraper.scrape_symbol_list("AAPL")
+
+        by_subreddit = {}
+        for r in results:
+            item_id = r.comment_id if isinstance(r, RedditComment) else r.post_id
+            by_subreddit.setdefault(r.subreddit, []).append(item_id)
+        assert by_subreddit == {"a": ["a1", "a1c0", "a1c1"], "c": ["c1", "c2"]}
+        assert isinstance(results[0].created_at, datetime)
+
+    def test_yields_before_slow_subreddits_finish(self, scraper):
+        """Items from a fast subreddit arrive while others are still searching."""
+        _Reddit.posts = {"a": [_submission("a1", 1)]}
+        _Reddit.delay = 0.0
+        slow = _Reddit.subreddit
+
+        def subreddit(client, name):
+            if name != "a":
+                time.sleep(0.5)
+            return slow(client, name)
+
+        _Reddit.subreddit = subreddit
+        try:
+            start = time.monotonic()
+            first = next(scraper.scrape_symbol("AAPL"))
+            elapsed = time.monotonic() - start
+        finally:
+            _Reddit.subreddit = slow
+
+        assert first.post_id == "a1"
+        assert elapsed < 0.4
+
+    def test_closing_early_releases_workers(self, scraper, monkeypatch):
+        """Abandoning the generator stops blocked workers."""
+        monkeypatch.setattr(reddit_scraper, "RESULT_QUEUE_SIZE", 1)
+        _Reddit.posts = {
+            name: [_submission(f"{name}{i}", 1) for i in range(20)] for name in ("a", "b", "c")
+        }
+
+        stream = scraper.scrape_symbol("AAPL", max_posts=80)
+        next(stream)
+        stream.close()
+
+        _Reddit.posts = {"a": [_submission("again", 1)]}
+        assert [r.post_id for r in scraper.scrape_symbol_list("AAPL")] == ["again"]
+
+    def test_subreddits_run_concurrently(self, scraper):
+        """Searches overlap and each worker thread uses its own client."""
+        _Reddit.delay = 0.2
+
+        start = time.monotonic()
+        scraper.scrape_symbol_list("AAPL")
+        elapsed = time.monotonic() - start
+
+        assert elapsed < 0.6
+        assert len({thread for thread, _ in _Reddit.threads}) == 4
+        assert len({client for _, client in _Reddit.threads}) == 4
+
+    def test_old_posts_skipped(self, scraper):
+        """Posts older than the lookback window are dropped."""
+        _Reddit.posts = {"a": [_submission("new", 2), _submission("old", 30)]}
+
+        results = scraper.scrape_symbol_list("AAPL", lookback_hours=24)
+
+        assert [r.post_id for r in results] == ["new"]
+
+    def test_old_posts_rejected_before_lookups(self, scraper):
+        """Stale posts never touch the author or comments (lazy PRAW fetches)."""
+        old = _submission("old", 30, n_comments=3)
+        del old.author, old.comments
+        _Reddit.posts = {"a": [old, _submission("new", 1)]}
+
+        results = scraper.scrape_symbol_list("AAPL", lookback_hours=24)
+
+        assert [r.post_id for r in results] == ["new"]
+
+    def test_top_comments_capped(self, scraper):
+        """At most ten comments are kept per post."""
+        _Reddit.posts = {"b": [_submission("b1", 1, n_comments=15)]}
+
+        results = scraper.scrape_symbol_list("AAPL")
+
+        assert len(results) == 11
+
+    def test_limit_split_across_subreddits(self, scraper):
+        """Each subreddit is searched for its share of max_posts."""
+        _Reddit.posts = {"a": [_submission(f"a{i}", 1) for i in range(10)]}
+
+        results = scraper.scrape_symbol_list("AAPL", max_posts=20)
+
+        assert len(results) == 5
+
+
+class TestScrapedItems:
+    """Slotted result records."""
+
+    def test_post_fields(self, scraper):
+        """Posts carry the submission fields and convert created_utc lazily."""
+        submission = _submission("a1", 2, n_comments=1)
+        _Reddit.posts = {"a": [submission]}
+
+        post, comment = scraper.scrape_symbol_list("AAPL")
+
+        assert isinstance(post, RedditPost)
+        assert (post.source, post.post_id, post.symbol, post.url) == (
+            "reddit", "a1", "AAPL", "https://reddit.com/a1",
+        )
+        assert post.created_at == datetime.fromtimestamp(submission.created_utc)
+        assert isinstance(comment, RedditComment)
+        assert comment.post_id == "a1"
+        assert not hasattr(post, "__dict__")
+        with pytest.raises(AttributeError):
+            post.score = 0
+
+    def test_posts_to_arrays(self):
+        """Arrays hold created_utc and score in item order."""
+        items = [
+            RedditPost("a", "p1", "t", "", 5, 0, 100.0, "u"),
+            RedditComment("a", "p1", "c1", "x", -2, 160.0),
+        ]
+
+        arrays = posts_to_arrays(items)
+
+        assert arrays["created_utc"].tolist() == [100.0, 160.0]
+        assert arrays["score"].tolist() == [5.0, -2.0]
+        assert arrays["score"].flags.c_contiguous
+
+
+class TestIsManipulation:
+    """Manipulation heuristics."""
+
+    def test_new_account(self, scraper):
+        """Accounts younger than 30 days are flagged."""
+        submission = _submission("x", 1)
+        submission.author.created_utc = (datetime.now() - timedelta(days=5)).timestamp()
+
+        assert scraper._is_manipulation(submission)
+
+    def test_established_account(self, scraper):
+        """Plain posts from established accounts pass."""
+        assert not scraper._is_manipulation(_submission("x", 1))
+
+    def test_account_age_against_given_clock(self, scraper):
+        """Account age is measured from the scrape's timestamp when given."""
+        submission = _submission("x", 1)
+        created = submission.author.created_utc
+
+        assert scraper._is_manipulation(submission, now_ts=created + 10 * 86400)
+        assert not scraper._is_manipulation(submission, now_ts=created + 31 * 86400)
+
+    @pytest.mark.parametrize(
+        "title, flagged",
+        [
+            ("AAPL 🚀", False),
+            ("AAPL 🚀🚀", False),
+            ("AAPL 🚀💎🦍", True),
+            ("AAPL 📈📈📈 calls", True),
+            ("AAPL to the MOON", True),
+            ("diamond hands on AAPL", False),
+        ],
+    )
+    def test_title_patterns(self, scraper, title, flagged):
+        """Three or more hype emoji or pump phrases flag the post."""
+        assert scraper._is_manipulation(_submission("x", 1, title=title)) is flagged
+
+    def test_diamond_hands_on_viral_post(self, scraper):
+        """The diamond hands phrase is only suspicious on high-score posts."""
+        submission = _submission("x", 1, title="Diamond hands AAPL")
+        submission.score = 5000
+
+        assert scraper._is_manipulation(submission)
+
+
+class TestAsyncRedditScraper:
+    """asyncpraw-based scraping."""
+
+    async def test_subreddits_run_concurrently_on_one_thread(self, async_scraper):
+        """Searches overlap as coroutines without worker threads."""
+        _AsyncReddit.delay = 0.2
+
+        start = time.monotonic()
+        await async_scraper.scrape_symbol("AAPL")
+        elapsed = time.monotonic() - start
+        await async_scraper.close()
+
+        assert elapsed < 0.6
+        assert _AsyncReddit.threads == {threading.current_thread().name}
+        assert _AsyncReddit.closed == 1
+
+    async def test_results_match_sync_filters(self, async_scraper):
+        """Stale and manipulated posts are dropped; comments follow their post."""
+        suspicious = _async_submission("pump", 1, title="AAPL to the moon")
+        stale = _async_submission("old", 30)
+        _AsyncReddit.posts = {
+            "a": [_async_submission("a1", 1, n_comments=2), stale],
+            "c": [suspicious, _async_submission("c1", 2)],
+        }
+
+        results = await async_scraper.scrape_symbol("AAPL", lookback_hours=24)
+
+        ids = [r.comment_id if isinstance(r, RedditComment) else r.post_id for r in results]
+        assert ids == ["a1", "a1c0", "a1c1", "c1"]
+        assert all(r.symbol == "AAPL" for r in results)
+        assert not stale.author.loaded
+
+    def test_sync_wrapper(self, async_scraper):
+        """scrape_symbol_sync runs its own loop and closes its client."""
+        _AsyncReddit.posts = {"b": [_async_submission("b1", 1)]}
+
+        results = async_scraper.scrape_symbol_sync("AAPL")
+
+        assert [r.post_id for r in results] == ["b1"]
+        assert _AsyncReddit.closed == 1
+
+    def test_requires_asyncpraw(self, monkeypatch):
+        """Without asyncpraw the scraper cannot be created."""
+        monkeypatch.setattr(reddit_scraper, "ASYNCPRAW_AVAILABLE", False)
+
+        with pytest.raises(ImportError, match="asyncpraw"):
+            AsyncRedditScraper("id", "secret", "agent")
@@ -0,0 +1,49 @@
+"""
+Redis state store tests.
+
+Runs RedisStateStore against an in-memory fakeredis server.
+"""
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from src.storage import redis_state as redis_state_module
+from src.storage.redis_state import RedisStateStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """RedisStateStore backed by fakeredis."""
+    server = fakeredis.FakeServer()
+
+    def fake_redis(**kwargs):
+        kwargs.pop("socket_timeout", None)
+        return fakeredis.FakeRedis(server=server, **kwargs)
+
+    monkeypatch.setattr(redis_state_module.redis, "Redis", fake_redis)
+    return RedisStateStore()
+
+
+class TestPortfolioState:
+    """Tests for batched position/equity reads."""
+
+    def test_positions_and_initial_equity(self, store):
+        """Positions and initial equity come back from one pipelined read."""
+        store.set_position("AAPL", 10, 150.0, 1500.0, 0.0, "long")
+        store.set_position("MSFT", 5, 300.0, 1500.0, 25.0, "long")
+        store.set_initial_equity(100000.0)
+
+        positions, initial_equity = store.get_portfolio_state()
+
+        assert set(positions) == {"AAPL", "MSFT"}
+        assert positions["MSFT"]["unrealized_pnl"] == 25.0
+        assert initial_equity == 100000.0
+        assert store.get_all_positions() == positions
+
+    def test_empty_state(self, store):
+        """No positions and no initial equity yields empty results."""
+        positions, initial_equity = store.get_portfolio_state()
+
+        assert positions == {}
+        assert initial_equity is None
@@ -9,7 +9,17 @@ import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 
-from src.regime.detector import RegimeDetector, MarketRegime, TrendRegime, VolRegime
+from src.regime import detector as detector_module
+from src.storage.duckdb_store import DuckDBStore
+from src.regime.detector import (
+    RegimeDetector,
+    MarketRegime,
+    TrendRegime,
+    VolRegime,
+    _adx_tr_kernel,
+    _sma,
+    _true_range,
+)
 
 
 class TestRegimeDetectorEdgeCases:
@@ -333,3 +343,211 @@ class TestRegimeDetectorPositionScaling:
         # Position scale should decrease (or stay same) as volatility increases
         for i in range(len(scales) - 1):
             assert scales[i] >= scales[i+1] - 0.1, f"Position scale increased with volatility: {scales}"
+
+
+def _random_bars(n=120, seed=3):
+    """Deterministic OHLC bars with a mild trend."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.015, n)))
+    spread = np.abs(rng.normal(0, 0.01, n))
+    return pd.DataFrame({
+        'timestamp': pd.date_range(start=datetime(2020, 1, 1), periods=n, freq='D'),
+        'open': close,
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'volume': np.full(n, 1000000),
+    })
+
+
+class TestAdxTrKernel:
+    """Single-pass ATR/ADX kernel matches the vectorized methods."""
+    
+    @pytest.mark.parametrize("n", [28, 60, 250])
+    def test_matches_vectorized(self, n):
+        """Kernel output equals _calculate_fast_volatility and _calculate_adx."""
+        detector = RegimeDetector()
+        bars = _random_bars(n)
+        
+        columns = (bars["high"].to_numpy(), bars["low"].to_numpy(), bars["close"].to_numpy())
+        
+        atr, adx = _adx_tr_kernel(*columns, detector.adx_period, detector.fast_window)
+        
+        assert atr == pytest.approx(detector._calculate_fast_volatility(*columns))
+        assert adx == pytest.approx(detector._calculate_adx(*columns))
+    
+    def test_sma_matches_rolling_mean(self):
+        """Running-sum SMA equals pandas rolling mean, NaN windows included."""
+        values = np.arange(20, dtype=float) ** 1.5
+        values[7] = np.nan
+        
+        expected = pd.Series(values).rolling(window=5).mean().to_numpy()[4:]
+        
+        np.testing.assert_allclose(_sma(values, 5), expected)
+        assert len(_sma(values[:3], 5)) == 0
+    
+    def test_flat_market(self):
+        """Zero range gives zero ATR and an undefined (0.0) ADX."""
+        prices = np.full(40, 100.0)
+        
+        atr, adx = _adx_tr_kernel(prices, prices, prices, 14, 3)
+        
+        assert atr == 0.0
+        assert adx == 0.0
+    
+    def test_true_range_first_bar(self):
+        """First bar uses high - low; later bars include the previous close gap."""
+        high = np.array([10.0, 12.0, 11.0])
+        low = np.array([9.0, 11.5, 8.0])
+        close = np.array([9.5, 11.8, 9.0])
+        
+        np.testing.assert_allclose(_true_range(high, low, close), [1.0, 2.5, 3.8])
+
+
+class TestRegimeCache:
+    """Memoization of regime results per bar history."""
+    
+    def test_unchanged_bars_hit_cache(self, monkeypatch):
+        """Repeated calls on the same history compute once."""
+        detector = RegimeDetector()
+        bars = _random_bars(60)
+        calls = []
+        compute = detector._compute_regime
+        monkeypatch.setattr(
+            detector, "_compute_regime", lambda b, s, k: calls.append(s) or compute(b, s, k)
+        )
+        
+        first = detector.detect_regime(bars, symbol="TEST")
+        second = detector.detect_regime(bars.copy(), symbol="TEST")
+        
+        assert second is first
+        assert calls == ["TEST"]
+    
+    def test_new_bar_or_updated_close_recomputes(self):
+        """Advancing or revising the last bar misses the cache."""
+        detector = RegimeDetector()
+        bars = _random_bars(61)
+        
+        first = detector.detect_regime(bars.head(60), symbol="TEST")
+        advanced = detector.detect_regime(bars, symbol="TEST")
+        revised = bars.head(60).copy()
+        revised.loc[59, "close"] *= 1.01
+        
+        assert advanced is not first
+        assert detector.detect_regime(revised, symbol="TEST") is not first
+        assert detector.detect_regime(bars.head(60), symbol="OTHER") is not first
+    
+    def test_cache_is_bounded(self, monkeypatch):
+        """Least recently used entries are evicted past the size limit."""
+        monkeypatch.setattr(detector_module, "REGIME_CACHE_SIZE", 2)
+        detector = RegimeDetector()
+        bars = _random_bars(60)
+        
+        for symbol in ("A", "B", "C"):
+            detector.detect_regime(bars, symbol=symbol)
+        
+        assert [key[0] for key in detector._cache] == ["B", "C"]
+
+
+class TestVolPercentile:
+    """Sorted rolling-vol history lookups."""
+    
+    def test_matches_linear_scan(self):
+        """Binary search counts the same strictly-lower history as a scan."""
+        detector = RegimeDetector()
+        bars = _random_bars(300)
+        rolling_vol = (
+            bars["close"].pct_change().dropna().rolling(20).std().dropna() * np.sqrt(252)
+        )
+        
+        for current_vol in (0.0, rolling_vol.iloc[100], rolling_vol.median(), 10.0):
+            expected = (rolling_vol < current_vol).sum() / len(rolling_vol) * 100
+            result = detector._calculate_vol_percentile(bars["close"].to_numpy(), current_vol)
+            assert result == pytest.approx(expected)
+    
+    def test_history_cached_until_bars_change(self, monkeypatch):
+        """The sorted history is rebuilt only when a new bar arrives."""
+        detector = RegimeDetector()
+        bars = _random_bars(301)
+        builds = []
+        build = detector._sorted_rolling_vol
+        monkeypatch.setattr(
+            detector, "_sorted_rolling_vol", lambda c: builds.append(len(c)) or build(c)
+        )
+        
+        for frame, vol in ((bars.head(300), 0.1), (bars.head(300), 0.2), (bars, 0.2)):
+            key = detector._cache_key(frame, "TEST")
+            detector._calculate_vol_percentile(frame["close"].to_numpy(), vol, "TEST", key)
+        
+        assert builds == [300, 301]
+    
+    def test_insufficient_history_is_median(self):
+        """Fewer returns than the lookback default to the 50th percentile."""
+        detector = RegimeDetector()
+        
+        close = _random_bars(100)["close"].to_numpy()
+        
+        assert detector._calculate_vol_percentile(close, 0.2) == 50.0
+
+
+class TestSlowVolatility:
+    """Realized vol from close-to-close returns."""
+    
+    def test_matches_pandas(self):
+        """NumPy returns reproduce pct_change().dropna() including gaps."""
+        detector = RegimeDetector()
+        bars = _random_bars(80)
+        bars.loc[70, "close"] = np.nan
+        
+        returns = bars["close"].pct_change().dropna()
+        expected = returns.tail(20).std() * np.sqrt(252)
+        
+        result = detector._calculate_slow_volatility(bars["close"].to_numpy())
+        
+        assert result == pytest.approx(expected)
+    
+    def test_streaming_matches_batch(self):
+        """Streamed returns give the batch slow vol once the window is full."""
+        detector = RegimeDetector()
+        close = _random_bars(80)["close"].to_numpy()
+        returns = close[1:] / close[:-1] - 1
+        
+        streamed = [detector.update_return("TEST", float(r)) for r in returns]
+        
+        assert streamed[18] == 0.0
+        assert streamed[-1] == pytest.approx(detector._calculate_slow_volatility(close))
+        assert detector.streaming_slow_vol("OTHER") == 0.0
+
+
+class TestBatchDetection:
+    """Universe-wide regime detection from one DuckDB query."""
+    
+    def _store_bars(self, store, symbol, seed):
+        """Insert 59 daily bars ending today for a symbol."""
+        bars = _random_bars(59, seed=seed)
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for i, row in enumerate(bars.itertuples()):
+            store.execute(
+                "INSERT INTO bars (id, symbol, timestamp, timeframe, tier, open, high, low, "
+                "close, volume) VALUES (?, ?, ?, '1Day', 'TIER_1_VALIDATION', ?, ?, ?, ?, ?)",
+                [seed * 1000 + i, symbol, today - timedelta(days=58 - i),
+                 row.open, row.high, row.low, row.close, float(row.volume)],
+            )
+    
+    def test_matches_per_symbol_detection(self, temp_dir):
+        """Batch results equal detect_regime_from_duckdb for each symbol."""
+        store = DuckDBStore(str(temp_dir / "test.duckdb"))
+        self._store_bars(store, "AAPL", seed=1)
+        self._store_bars(store, "MSFT", seed=2)
+        
+        batch = RegimeDetector().detect_regimes_batch(store, ["AAPL", "MSFT", "NONE"])
+        single = RegimeDetector()
+        
+        assert batch["NONE"] is None
+        for symbol in ("AAPL", "MSFT"):
+            expected = single.detect_regime_from_duckdb(store, symbol).to_dict()
+            result = batch[symbol].to_dict()
+            expected.pop("timestamp")
+            result.pop("timestamp")
+            assert result == expected
+        store.close()
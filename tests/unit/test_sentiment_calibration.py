@@ -7,14 +7,40 @@ testing problem identified by Gemini.
 
 import pytest
 import numpy as np
+from scipy import stats
 
 from src.sentiment.calibration.lead_lag import (
     SentimentCalibrator,
     LeadLagResult,
     SentimentMode,
+    _PrefixStats,
+    _pearson_fast,
 )
 
 
+def _pearson_at_lag(sentiment, returns, lag):
+    """Slice-and-pearsonr reference for a single lag."""
+    if lag > 0:
+        x, y = sentiment[:-lag], returns[lag:]
+    elif lag < 0:
+        x, y = sentiment[-lag:], returns[:lag]
+    else:
+        x, y = sentiment, returns
+    if len(x) < 30:
+        return 0.0, 1.0
+    return stats.pearsonr(x, y)
+
+
+def _loop_reference(calibrator, sentiment, returns):
+    """Per-lag pearsonr scan the vectorized search must match."""
+    best_lag, best_corr, best_p = 0, 0.0, 1.0
+    for lag in range(-calibrator.lag_range, calibrator.lag_range + 1):
+        corr, p_value = _pearson_at_lag(sentiment, returns, lag)
+        if abs(corr) > abs(best_corr):
+            best_lag, best_corr, best_p = lag, corr, p_value
+    return best_lag, best_corr, best_p
+
+
 class TestSentimentCalibration:
     """Tests for sentiment calibration."""
     
@@ -123,3 +149,194 @@ class TestSentimentCalibration:
         
         mode = calibrator.get_sentiment_mode(result)
         assert mode == SentimentMode.CONTRARIAN
+
+
+class TestFindOptimalLag:
+    """Vectorized lag search matches the per-lag Pearson loop."""
+    
+    @pytest.mark.parametrize("n", [40, 120, 600])
+    def test_matches_loop(self, n):
+        """Best lag, correlation and p-value equal the pearsonr scan."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(n)
+        sentiment = rng.normal(size=n)
+        returns = 0.3 * np.roll(sentiment, 3) + rng.normal(size=n)
+        
+        result = calibrator._find_optimal_lag(sentiment, returns)
+        expected_lag, expected_corr, expected_p = _loop_reference(
+            calibrator, sentiment, returns
+        )
+        
+        assert result["optimal_lag"] == expected_lag
+        assert result["correlation"] == pytest.approx(expected_corr)
+        assert result["p_value"] == pytest.approx(expected_p, rel=1e-6)
+    
+    def test_constant_series_has_no_candidate(self):
+        """Zero-variance input yields lag 0 with no correlation."""
+        calibrator = SentimentCalibrator()
+        returns = np.random.default_rng(1).normal(size=200)
+        
+        result = calibrator._find_optimal_lag(np.ones(200), returns)
+        
+        assert result["optimal_lag"] == 0
+        assert result["correlation"] == 0.0
+        assert result["p_value"] == 1.0
+        assert result["is_candidate"] is False
+
+
+class TestSingleLag:
+    """Prefix-sum single-lag test matches pearsonr."""
+    
+    @pytest.mark.parametrize("lag", [-24, -3, 0, 5, 24])
+    def test_matches_pearsonr(self, lag):
+        """Correlation and p-value equal scipy on the sliced series."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(abs(lag))
+        sentiment = rng.normal(size=150)
+        returns = 0.4 * np.roll(sentiment, lag) + rng.normal(size=150)
+        
+        corr, p_value = calibrator._test_single_lag(sentiment, returns, lag)
+        expected_corr, expected_p = _pearson_at_lag(sentiment, returns, lag)
+        
+        assert corr == pytest.approx(expected_corr)
+        assert p_value == pytest.approx(expected_p, rel=1e-6)
+    
+    def test_pearson_fast_matches_scipy(self):
+        """Standalone helper agrees with pearsonr, constant input gives (0, 1)."""
+        rng = np.random.default_rng(4)
+        x = rng.normal(size=60)
+        y = 0.5 * x + rng.normal(size=60)
+        
+        corr, p_value = _pearson_fast(x, y)
+        expected_corr, expected_p = stats.pearsonr(x, y)
+        
+        assert corr == pytest.approx(expected_corr)
+        assert p_value == pytest.approx(expected_p, rel=1e-6)
+        assert _pearson_fast(np.ones(60), y) == (0.0, 1.0)
+    
+    def test_window_of_shared_prefix(self):
+        """A window of shared prefix sums equals testing the sliced arrays."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(9)
+        sentiment = rng.normal(size=200) + 5.0
+        returns = rng.normal(size=200)
+        prefix = _PrefixStats(sentiment, returns)
+        
+        windowed = calibrator._test_single_lag(
+            sentiment[120:], returns[120:], 4, prefix=prefix, start=120
+        )
+        expected = _pearson_at_lag(sentiment[120:], returns[120:], 4)
+        
+        assert windowed[0] == pytest.approx(expected[0])
+        assert windowed[1] == pytest.approx(expected[1], rel=1e-6)
+    
+    def test_lag_outside_configured_range(self):
+        """Lags beyond lag_range are still aligned correctly."""
+        calibrator = SentimentCalibrator(lag_range_hours=2)
+        rng = np.random.default_rng(6)
+        sentiment = rng.normal(size=120)
+        returns = rng.normal(size=120)
+        
+        for lag in (-7, 7):
+            corr, p_value = calibrator._test_single_lag(sentiment, returns, lag)
+            expected_corr, expected_p = _pearson_at_lag(sentiment, returns, lag)
+            
+            assert corr == pytest.approx(expected_corr)
+            assert p_value == pytest.approx(expected_p, rel=1e-6)
+    
+    def test_short_window_untestable(self):
+        """Fewer than 30 overlapping points yields (0, 1)."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(2)
+        
+        result = calibrator._test_single_lag(rng.normal(size=40), rng.normal(size=40), 15)
+        
+        assert result == (0.0, 1.0)
+
+
+class TestInsufficientData:
+    """Short series return the shared no-edge result."""
+    
+    def test_shared_immutable_result(self):
+        """Insufficient data reuses one frozen result instance."""
+        calibrator = SentimentCalibrator()
+        short = np.zeros(50)
+        
+        first = calibrator.measure_lead_lag(short, short)
+        second = calibrator.measure_lead_lag(short, short)
+        
+        assert first is second
+        assert calibrator.get_sentiment_mode(first) == SentimentMode.DISABLED
+        with pytest.raises(AttributeError):
+            first.validation_passed = True
+
+
+class TestPrefixReuse:
+    """Cached and online prefix sums."""
+    
+    def test_cache_hit_reuses_prefix(self):
+        """Re-calibrating the same arrays reuses their prefix sums."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(12)
+        sentiment = rng.normal(size=300)
+        returns = rng.normal(size=300)
+        
+        first = calibrator._prefix_for(sentiment, returns)
+        
+        assert calibrator._prefix_for(sentiment, returns) is first
+        sentiment[10] += 1.0
+        assert calibrator._prefix_for(sentiment, returns) is not first
+    
+    def test_cache_is_bounded(self):
+        """Only the most recent series pairs are kept."""
+        calibrator = SentimentCalibrator()
+        rng = np.random.default_rng(13)
+        
+        for _ in range(10):
+            calibrator.measure_lead_lag(rng.normal(size=150), rng.normal(size=150))
+        
+        assert len(calibrator._prefix_cache) <= 4
+    
+    def test_roll_in_matches_rebuild(self):
+        """Appending point by point gives the same window statistics as a rebuild."""
+        rng = np.random.default_rng(14)
+        sentiment = rng.normal(size=250) + 3.0
+        returns = rng.normal(size=250)
+        online = _PrefixStats(np.empty(0), np.empty(0))
+        
+        for s, r in zip(sentiment, returns):
+            online.roll_in(s, r)
+        rebuilt = _PrefixStats(sentiment, returns)
+        
+        assert online.n == 250
+        np.testing.assert_allclose(
+            online.lag_range(24, 40, 250)[1], rebuilt.lag_range(24, 40, 250)[1]
+        )
+        assert online.single_lag(-5, 100)[0] == pytest.approx(rebuilt.single_lag(-5, 100)[0])
+    
+    @pytest.mark.parametrize("use_two_stage", [True, False])
+    def test_measure_online_matches_batch(self, use_two_stage):
+        """A sliding window over rolled-in data equals calibrating the slice."""
+        rng = np.random.default_rng(15)
+        sentiment = rng.normal(size=400)
+        returns = 0.3 * np.roll(sentiment, 2) + rng.normal(size=400)
+        calibrator = SentimentCalibrator()
+        
+        for s, r in zip(sentiment, returns):
+            calibrator.roll_in(s, r)
+        online = calibrator.measure_online(window=300, use_two_stage=use_two_stage)
+        batch = SentimentCalibrator().measure_lead_lag(
+            sentiment[100:], returns[100:], use_two_stage=use_two_stage
+        )
+        
+        assert online.optimal_lag_hours == batch.optimal_lag_hours
+        assert online.correlation == pytest.approx(batch.correlation)
+        assert online.validation_passed == batch.validation_passed
+    
+    def test_measure_online_insufficient(self):
+        """Fewer than 100 rolled-in points returns the no-edge result."""
+        calibrator = SentimentCalibrator()
+        
+        assert calibrator.measure_online().validation_passed is False
+        calibrator.roll_in(0.1, 0.01)
+        assert calibrator.measure_online().validation_passed is False
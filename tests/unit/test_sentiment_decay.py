@@ -0,0 +1,120 @@
+"""
+Sentiment decay model tests.
+
+Checks the batch decay kernels against the scalar formula.
+"""
+
+import math
+
+import pytest
+import numpy as np
+
+from src.sentiment.decay import exponential
+from src.sentiment.decay.exponential import ExponentialDecayModel, ExponentialDecayPool
+
+
+@pytest.fixture
+def signals():
+    """Signals, ages (hours) and regime multipliers."""
+    rng = np.random.default_rng(17)
+    return rng.uniform(0.0, 1.0, 500), rng.uniform(0.0, 72.0, 500), rng.uniform(0.5, 2.0, 500)
+
+
+class TestApplyDecayBatch:
+    """Vectorized decay matches the scalar path."""
+
+    def test_matches_scalar(self, signals):
+        """Every decayed signal equals apply_decay on that signal."""
+        model = ExponentialDecayModel(half_life_hours=6.0)
+        strengths, ages, regimes = signals
+
+        result = model.apply_decay_batch(strengths, ages, regimes)
+
+        expected = [model.apply_decay(s, a, r) for s, a, r in zip(strengths, ages, regimes)]
+        np.testing.assert_allclose(result, expected, rtol=1e-15)
+
+    def test_half_life(self):
+        """A signal halves after one half-life and quarters after two."""
+        model = ExponentialDecayModel(half_life_hours=4.0)
+
+        result = model.apply_decay_batch(np.ones(3), np.array([0.0, 4.0, 8.0]))
+
+        np.testing.assert_allclose(result, [1.0, 0.5, 0.25])
+        assert model.apply_decay(0.8, 4.0) == pytest.approx(0.4)
+
+    def test_scalar_regime_and_list_input(self, signals):
+        """A single regime multiplier and list inputs broadcast."""
+        model = ExponentialDecayModel()
+        strengths, ages, _ = signals
+
+        result = model.apply_decay_batch(list(strengths[:5]), list(ages[:5]), 1.5)
+
+        expected = [s * math.exp(-model.decay_rate * a * 1.5) for s, a in zip(strengths, ages)]
+        np.testing.assert_allclose(result, expected[:5])
+
+    def test_decay_factor_batch(self, signals):
+        """Batch decay factors equal get_decay_factor per age."""
+        model = ExponentialDecayModel(half_life_hours=3.0)
+        _, ages, regimes = signals
+
+        result = model.get_decay_factor_batch(ages, regimes)
+
+        expected = [model.get_decay_factor(a, r) for a, r in zip(ages, regimes)]
+        np.testing.assert_allclose(result, expected, rtol=1e-15)
+
+    def test_numba_kernel_matches_numpy(self, monkeypatch):
+        """Compiled kernel and NumPy path agree above the size threshold."""
+        pytest.importorskip("numba")
+        rng = np.random.default_rng(23)
+        strengths = rng.uniform(0.0, 1.0, 5000)
+        ages = rng.uniform(0.0, 72.0, 5000)
+        model = ExponentialDecayModel()
+
+        compiled = model.apply_decay_batch(strengths, ages, 1.5)
+        monkeypatch.setattr(exponential, "NUMBA_AVAILABLE", False)
+        fallback = model.apply_decay_batch(strengths, ages, 1.5)
+
+        np.testing.assert_allclose(compiled, fallback, rtol=1e-12)
+
+
+class TestExponentialDecayPool:
+    """Array-backed decay for many symbols."""
+
+    def test_matches_per_row_models(self, signals):
+        """Each row decays exactly like its own ExponentialDecayModel."""
+        strengths, ages, regimes = signals
+        sources = ["reddit", "twitter"] * 250
+        pool = ExponentialDecayPool.from_sources(sources)
+
+        result = pool.apply_decay_all(strengths, ages, regimes)
+
+        expected = [
+            ExponentialDecayModel.from_source(src).apply_decay(s, a, r)
+            for src, s, a, r in zip(sources, strengths, ages, regimes)
+        ]
+        np.testing.assert_allclose(result, expected, rtol=1e-15)
+        assert pool.rates.flags.c_contiguous
+
+    def test_history_broadcasts_over_rows(self):
+        """A (ticks, rows) age array decays every row's history at once."""
+        pool = ExponentialDecayPool([2.0, 4.0])
+        ages = np.array([[0.0, 0.0], [2.0, 2.0], [4.0, 4.0]])
+
+        result = pool.apply_decay_all(np.ones(2), ages)
+
+        np.testing.assert_allclose(result, [[1.0, 1.0], [0.5, 2 ** -0.5], [0.25, 0.5]])
+
+    def test_model_view(self):
+        """model(i) returns the scalar model for that row."""
+        pool = ExponentialDecayPool([6.0, 3.0], sources=["reddit", "twitter"])
+
+        model = pool.model(1)
+
+        assert len(pool) == 2
+        assert model.source == "twitter"
+        assert model.decay_rate == pool.rates[1]
+
+    def test_sources_length_checked(self):
+        """Sources must match the number of half-lives."""
+        with pytest.raises(ValueError, match="sources"):
+            ExponentialDecayPool([6.0, 3.0], sources=["reddit"])
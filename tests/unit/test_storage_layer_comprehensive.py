@@ -4,14 +4,24 @@ Comprehensive storage layer tests.
 Tests AppendOnlyLog, DuckDB, Redis with concurrent operations and edge cases.
 """
 
+import gzip
+import os
 import pytest
 import tempfile
 import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
 
-from src.storage.append_log import AppendOnlyLog, Event, EventType
+import numpy as np
+
+from src.storage import append_log as append_log_module
+from src.storage.append_log import AppendOnlyLog, BufferedEventWriter, Event, EventType
 from src.storage.duckdb_store import DuckDBStore
 
 
@@ -194,6 +204,615 @@ class TestAppendOnlyLogEdgeCases:
         assert self.log_path.stat().st_size > 0
 
 
+class TestBufferedEventWriter:
+    """Tests for batched event writes."""
+    
+    def setup_method(self):
+        """Create temp directory for each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "test.log"
+    
+    def teardown_method(self):
+        """Clean up temp directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _event(self, i):
+        return Event(
+            event_type=EventType.HEARTBEAT,
+            timestamp=datetime.now(),
+            data={"index": i},
+        )
+    
+    def test_flushes_at_capacity(self):
+        """Events are held until capacity is reached, then written in order."""
+        log = AppendOnlyLog(self.log_path)
+        writer = BufferedEventWriter(log, capacity=3, max_latency_ms=60000)
+        
+        writer.write(self._event(0))
+        writer.write(self._event(1))
+        assert log.read_all() == []
+        
+        writer.write(self._event(2))
+        
+        assert [e.data["index"] for e in log.read_all()] == [0, 1, 2]
+        writer.close()
+    
+    def test_flushes_after_latency(self):
+        """A lone event is written once max latency elapses."""
+        log = AppendOnlyLog(self.log_path)
+        writer = BufferedEventWriter(log, capacity=100, max_latency_ms=20)
+        
+        writer.write(self._event(0))
+        
+        deadline = time.monotonic() + 2.0
+        while not log.read_all() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert len(log.read_all()) == 1
+        writer.close()
+    
+    def test_batch_serializes_numpy_and_int_keys(self):
+        """Batched lines accept NumPy scalars and non-string keys."""
+        log = AppendOnlyLog(self.log_path)
+        event = Event(
+            event_type=EventType.HEARTBEAT,
+            timestamp=datetime.now(),
+            data={"price": np.float64(101.5), 7: "seven"},
+        )
+        
+        log.write_batch([event, self._event(1)])
+        
+        events = log.read_all()
+        assert events[0].data == {"price": 101.5, "7": "seven"}
+        assert events[0].event_id == event.event_id
+        assert events[1].data["index"] == 1
+    
+    def test_explicit_flush(self):
+        """flush() writes pending events immediately."""
+        log = AppendOnlyLog(self.log_path)
+        writer = BufferedEventWriter(log, capacity=100, max_latency_ms=60000)
+        
+        writer.write(self._event(0))
+        writer.flush()
+        writer.flush()
+        
+        assert len(log.read_all()) == 1
+        writer.close()
+    
+    def test_batches_start_no_threads(self, monkeypatch):
+        """Batches after construction reuse the one flusher thread."""
+        log = AppendOnlyLog(self.log_path)
+        writer = BufferedEventWriter(log, capacity=100, max_latency_ms=20)
+        
+        def no_thread(*args, **kwargs):
+            raise AssertionError("thread started for a batch")
+        
+        monkeypatch.setattr(append_log_module.threading.Thread, "start", no_thread)
+        for i in range(3):
+            writer.write(self._event(2 * i))
+            writer.write(self._event(2 * i + 1))
+            writer.flush()
+        writer.write(self._event(6))
+        
+        deadline = time.monotonic() + 2.0
+        while len(log.read_all()) < 7 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert [e.data["index"] for e in log.read_all()] == list(range(7))
+        monkeypatch.undo()
+        writer.close()
+    
+    def test_close_stops_flusher(self):
+        """close() writes pending events and joins the thread; later writes go direct."""
+        log = AppendOnlyLog(self.log_path)
+        writer = BufferedEventWriter(log, capacity=100, max_latency_ms=60000)
+        writer.write(self._event(0))
+        
+        writer.close()
+        writer.write(self._event(1))
+        
+        assert not writer._flusher.is_alive()
+        assert [e.data["index"] for e in log.read_all()] == [0, 1]
+
+
+class TestEventSerialization:
+    """orjson event lines."""
+    
+    def setup_method(self):
+        """Create temp directory for each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "test.log"
+    
+    def teardown_method(self):
+        """Clean up temp directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @pytest.mark.parametrize(
+        "timestamp",
+        [
+            datetime(2024, 3, 1, 9, 30, 0, 123456),
+            datetime(2024, 3, 1, 9, 30),
+            datetime(2024, 3, 1, 9, 30, tzinfo=timezone(timedelta(hours=-5))),
+        ],
+    )
+    def test_line_matches_to_dict(self, timestamp):
+        """The serialized line parses back to exactly to_dict()."""
+        event = Event(
+            event_type=EventType.QUOTE,
+            timestamp=timestamp,
+            data={"bid": 1.5},
+            symbol="AAPL",
+        )
+        
+        line = event.to_json_bytes()
+        
+        assert line.endswith(b"\n")
+        assert json.loads(line) == event.to_dict()
+        assert json.loads(event.to_json()) == event.to_dict()
+    
+    def test_event_ids(self):
+        """IDs are unique per event and carry the time, type and pid."""
+        timestamp = datetime(2024, 3, 1, 9, 30)
+        
+        events = [Event(EventType.BAR, timestamp, {}) for _ in range(1000)]
+        
+        assert len({e.event_id for e in events}) == 1000
+        micros, event_type, pid, _ = events[0].event_id.split("_", 3)
+        assert int(micros) == int(timestamp.timestamp() * 1e6)
+        assert (event_type, pid) == ("bar", str(os.getpid()))
+        assert Event(EventType.BAR, timestamp, {}, event_id="given").event_id == "given"
+    
+    def test_non_string_keys_and_unserializable_data(self):
+        """Int keys fall back to OPT_NON_STR_KEYS; other bad data still raises."""
+        event = Event(EventType.HEARTBEAT, datetime.now(), {1: {2: "x"}, "a": np.int64(3)})
+        
+        assert json.loads(event.to_json_bytes())["data"] == {"1": {"2": "x"}, "a": 3}
+        with pytest.raises(TypeError):
+            Event(EventType.HEARTBEAT, datetime.now(), {"bad": object()}).to_json_bytes()
+    
+    def test_event_type_is_string(self):
+        """Event types compare equal to and serialize as their string value."""
+        event = Event(EventType.ORDER_FILLED, datetime.now(), {})
+        
+        assert EventType.ORDER_FILLED == "order_filled"
+        assert json.loads(event.to_json_bytes())["event_type"] == "order_filled"
+        assert json.loads(json.dumps(event.to_dict()))["event_type"] == "order_filled"
+    
+    def test_event_is_slotted(self):
+        """Events carry no instance __dict__."""
+        event = Event(EventType.HEARTBEAT, datetime.now(), {})
+        
+        assert not hasattr(event, "__dict__")
+    
+    def test_write_read_unicode(self):
+        """Non-ASCII data round-trips through write() and read_all()."""
+        log = AppendOnlyLog(self.log_path)
+        event = Event(
+            event_type=EventType.SENTIMENT_REDDIT,
+            timestamp=datetime.now(),
+            data={"title": "Émojis: 🚀📈 \"quoted\"\nnext line"},
+        )
+        
+        log.write(event)
+        log.write(event)
+        
+        events = log.read_all()
+        assert [e.data for e in events] == [event.data, event.data]
+        assert events[0].timestamp == event.timestamp
+        assert events[0].event_type == EventType.SENTIMENT_REDDIT
+    
+    def test_invalid_line_skipped(self):
+        """Lines that are not JSON are skipped on read."""
+        log = AppendOnlyLog(self.log_path)
+        event = Event(event_type=EventType.HEARTBEAT, timestamp=datetime.now(), data={})
+        
+        log.write(event)
+        with open(self.log_path, "a") as f:
+            f.write("CORRUPTED LINE NOT JSON\n")
+        log.write(event)
+        
+        assert len(log.read_all()) == 2
+
+
+class TestAppendDescriptor:
+    """Persistent O_APPEND descriptor."""
+    
+    def setup_method(self):
+        """Create temp directory for each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "test.log"
+    
+    def teardown_method(self):
+        """Clean up temp directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _event(self, i, payload=""):
+        return Event(
+            event_type=EventType.HEARTBEAT,
+            timestamp=datetime.now(),
+            data={"index": i, "payload": payload},
+        )
+    
+    def test_writes_do_not_reopen(self, monkeypatch):
+        """After the first write claims the log, writes reuse the init descriptor."""
+        log = AppendOnlyLog(self.log_path)
+        log.write(self._event(0))
+        
+        def no_open(*args, **kwargs):
+            raise AssertionError("log reopened")
+        
+        monkeypatch.setattr(append_log_module.os, "open", no_open)
+        log.write(self._event(1))
+        log.write_batch([self._event(2), self._event(3)])
+        monkeypatch.undo()
+        
+        assert [e.data["index"] for e in log.read_all()] == [0, 1, 2, 3]
+        log.close()
+    
+    def test_concurrent_writes_whole_lines(self):
+        """Threads sharing the descriptor never interleave lines."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        log = AppendOnlyLog(self.log_path)
+        
+        def write_events(thread):
+            for i in range(50):
+                log.write(self._event(thread * 50 + i, "x" * 2000))
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write_events, range(8)))
+        
+        events = log.read_all()
+        assert sorted(e.data["index"] for e in events) == list(range(400))
+        log.close()
+    
+    def test_write_after_close_reopens(self):
+        """A write after close() (e.g. an exit-time flush) is not lost."""
+        log = AppendOnlyLog(self.log_path)
+        log.write(self._event(0))
+        
+        log.close()
+        log.write(self._event(1))
+        
+        assert [e.data["index"] for e in log.read_all()] == [0, 1]
+        log.close()
+        log.close()
+    
+    def test_rotation_check_uses_byte_counter(self, monkeypatch):
+        """Writes track the file size in memory instead of calling stat()."""
+        self.log_path.write_bytes(b"x" * 100 + b"\n")
+        log = AppendOnlyLog(self.log_path)
+        
+        def no_stat(*args, **kwargs):
+            raise AssertionError("stat() on the write path")
+        
+        monkeypatch.setattr(append_log_module.Path, "stat", no_stat)
+        log.write(self._event(0))
+        log.write_batch([self._event(1), self._event(2)])
+        monkeypatch.undo()
+        
+        assert log._bytes_written == self.log_path.stat().st_size
+        assert log.get_stats()["size_bytes"] == log._bytes_written
+        log.close()
+    
+    def test_batch_uses_writev_groups(self, monkeypatch):
+        """write_batch() issues one writev() per IOV_MAX lines, in order."""
+        log = AppendOnlyLog(self.log_path)
+        writev = append_log_module.os.writev
+        calls = []
+        
+        def recording_writev(fd, buffers):
+            calls.append(len(buffers))
+            return writev(fd, buffers)
+        
+        monkeypatch.setattr(append_log_module.os, "writev", recording_writev)
+        log.write_batch([self._event(i) for i in range(2500)])
+        
+        assert calls == [1024, 1024, 452]
+        assert [e.data["index"] for e in log.read_all()] == list(range(2500))
+        assert log._bytes_written == self.log_path.stat().st_size
+        log.close()
+    
+    def test_batch_short_writev(self, monkeypatch):
+        """A short writev() is completed with write()."""
+        log = AppendOnlyLog(self.log_path)
+        
+        def short_writev(fd, buffers):
+            return os.write(fd, buffers[0][:10])
+        
+        monkeypatch.setattr(append_log_module.os, "writev", short_writev)
+        log.write_batch([self._event(i) for i in range(3)])
+        
+        assert [e.data["index"] for e in log.read_all()] == [0, 1, 2]
+        log.close()
+    
+    def test_rotation_keeps_descriptor(self):
+        """Rotation compresses the old file and later writes go to a new one."""
+        log = AppendOnlyLog(self.log_path, max_file_size_mb=0.002)
+        fd = log._fd
+        
+        for i in range(10):
+            log.write(self._event(i, "x" * 200))
+        
+        rotated = Path(f"{self.log_path}.1.gz")
+        with gzip.open(rotated, "rb") as f:
+            rotated_indices = [json.loads(line)["data"]["index"] for line in f]
+        current_indices = [e.data["index"] for e in log.read_all()]
+        
+        assert log._fd == fd
+        assert rotated_indices + current_indices == list(range(10))
+        assert current_indices
+        assert not Path(f"{self.log_path}.2.gz").exists()
+        assert not list(Path(self.temp_dir).glob("*.rotating"))
+        log.close()
+    
+    def test_rotation_compresses_fast_outside_lock(self, monkeypatch):
+        """Rotated files use gzip level 1; writers proceed during compression."""
+        log = AppendOnlyLog(self.log_path, max_file_size_mb=0.002)
+        copying = threading.Event()
+        release = threading.Event()
+        copyfileobj = shutil.copyfileobj
+        
+        def slow_copy(f_in, f_out, length=0):
+            copying.set()
+            release.wait(5)
+            copyfileobj(f_in, f_out, length)
+        
+        monkeypatch.setattr(append_log_module.shutil, "copyfileobj", slow_copy)
+        log._writable_fd()  # claim the log, as a first write would
+        log._bytes_written = log.max_file_size_bytes
+        rotator = threading.Thread(target=log.write, args=(self._event(0),))
+        rotator.start()
+        assert copying.wait(5)
+        
+        # Another writer is not blocked by the ongoing compression
+        writer = threading.Thread(target=log.write, args=(self._event(1),))
+        writer.start()
+        writer.join(2)
+        assert not writer.is_alive()
+        
+        release.set()
+        rotator.join(5)
+        
+        # XFL header byte 4 marks the fastest compression level
+        assert Path(f"{self.log_path}.1.gz").read_bytes()[8] == 4
+        assert sorted(e.data["index"] for e in log.read_all()) == [0, 1]
+        log.close()
+
+
+class TestSingleWriterProcess:
+    """One writer per log."""
+    
+    def setup_method(self):
+        """Create temp directory for each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "test.log"
+    
+    def teardown_method(self):
+        """Clean up temp directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _event(self, i):
+        return Event(
+            event_type=EventType.HEARTBEAT,
+            timestamp=datetime.now(),
+            data={"index": i},
+        )
+    
+    def _other_process(self, action):
+        """Open the log in a fresh interpreter, run action, report the outcome."""
+        code = (
+            "from datetime import datetime\n"
+            "from src.storage.append_log import AppendOnlyLog, Event, EventType\n"
+            f"log = AppendOnlyLog({str(self.log_path)!r})\n"
+            "event = Event(event_type=EventType.HEARTBEAT, timestamp=datetime.now(), data={})\n"
+            "try:\n"
+            f"    {action}\n"
+            "    print('ok')\n"
+            "except RuntimeError:\n"
+            "    print('rejected')\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=Path(__file__).resolve().parents[2],
+            capture_output=True,
+            text=True,
+            timeout=60,
+        )
+        return result.stdout.strip().splitlines()[-1]
+    
+    def test_second_process_cannot_write(self):
+        """Another process may read the log but not write to it."""
+        log = AppendOnlyLog(self.log_path)
+        log.write(self._event(0))
+        
+        assert self._other_process("log.write(event)") == "rejected"
+        assert self._other_process("assert len(log.read_all()) == 1") == "ok"
+        
+        log.close()
+        assert self._other_process("log.write(event)") == "ok"
+        assert len(log.read_all()) == 2
+    
+    def test_second_instance_cannot_write(self):
+        """One writing instance per path, so rotation never strands events."""
+        first = AppendOnlyLog(self.log_path, max_file_size_mb=0.01)
+        second = AppendOnlyLog(self.log_path, max_file_size_mb=0.01)
+        written = []
+        
+        for i in range(400):
+            try:
+                (first if i % 2 == 0 else second).write(self._event(i))
+                written.append(i)
+            except RuntimeError:
+                pass
+        
+        recovered = [e.data["index"] for e in first.read_all()]
+        for path in Path(self.temp_dir).glob("test.log.*.gz"):
+            with gzip.open(path, "rb") as f:
+                recovered += [json.loads(line)["data"]["index"] for line in f]
+        
+        assert written == list(range(0, 400, 2))
+        assert sorted(recovered) == written
+        assert Path(f"{self.log_path}.2.gz").exists()
+        assert not list(Path(self.temp_dir).glob("*.rotating"))
+        
+        first.close()
+        second.write(self._event(400))
+        assert second.read_all()[-1].data["index"] == 400
+        second.close()
+    
+    def test_dropped_writer_releases_path(self):
+        """A writer garbage-collected without close() no longer claims the path."""
+        import gc
+        
+        first = AppendOnlyLog(self.log_path)
+        first.write(self._event(0))
+        del first
+        gc.collect()
+        
+        second = AppendOnlyLog(self.log_path)
+        second.write(self._event(1))
+        
+        assert [e.data["index"] for e in second.read_all()] == [0, 1]
+        second.close()
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork()")
+    def test_forked_child_cannot_write(self):
+        """A forked child does not inherit the writer role."""
+        log = AppendOnlyLog(self.log_path)
+        log.write(self._event(0))
+        
+        pid = os.fork()
+        if pid == 0:
+            try:
+                log.write(self._event(1))
+                code = 1
+            except RuntimeError:
+                code = 0
+            except BaseException:
+                code = 2
+            os._exit(code)
+        
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        log.write(self._event(2))
+        assert [e.data["index"] for e in log.read_all()] == [0, 2]
+        log.close()
+
+
+class TestBatchMode:
+    """Background flusher thread."""
+    
+    def setup_method(self):
+        """Create temp directory for each test."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.log_path = Path(self.temp_dir) / "test.log"
+    
+    def teardown_method(self):
+        """Clean up temp directory."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _event(self, i):
+        return Event(
+            event_type=EventType.HEARTBEAT,
+            timestamp=datetime.now(),
+            data={"index": i},
+        )
+    
+    def test_flusher_writes_queued_events(self):
+        """Queued events reach the file without an explicit flush."""
+        log = AppendOnlyLog(self.log_path, batch_mode=True, flush_interval_ms=5)
+        
+        for i in range(5):
+            log.write(self._event(i))
+        
+        deadline = time.monotonic() + 2.0
+        while len(log.read_all()) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        assert [e.data["index"] for e in log.read_all()] == list(range(5))
+        log.close()
+    
+    def test_flush_groups_by_max_batch(self, monkeypatch):
+        """flush() writes everything queued, max_batch lines per writev()."""
+        log = AppendOnlyLog(
+            self.log_path, batch_mode=True, flush_interval_ms=60000, max_batch=10
+        )
+        append_lines = log._append_lines
+        sizes = []
+        
+        def recording_append_lines(lines):
+            sizes.append(len(lines))
+            append_lines(lines)
+        
+        monkeypatch.setattr(log, "_append_lines", recording_append_lines)
+        log.write_batch([self._event(i) for i in range(20)])
+        for i in range(20, 25):
+            log.write(self._event(i))
+        assert log.read_all() == []
+        
+        log.flush()
+        
+        assert sizes == [10, 10, 5]
+        assert [e.data["index"] for e in log.read_all()] == list(range(25))
+        log.close()
+    
+    def test_concurrent_producers(self):
+        """Events from many threads are all written once, in per-thread order."""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        log = AppendOnlyLog(self.log_path, batch_mode=True, flush_interval_ms=1)
+        
+        def write_events(thread):
+            for i in range(200):
+                log.write(Event(
+                    event_type=EventType.HEARTBEAT,
+                    timestamp=datetime.now(),
+                    data={"thread": thread, "index": i},
+                ))
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(write_events, range(8)))
+        log.close()
+        
+        events = log.read_all()
+        assert len(events) == 1600
+        for thread in range(8):
+            indices = [e.data["index"] for e in events if e.data["thread"] == thread]
+            assert indices == list(range(200))
+    
+    def test_close_drains_and_later_writes_are_synchronous(self):
+        """close() writes the queue and stops the thread; then writes go direct."""
+        log = AppendOnlyLog(self.log_path, batch_mode=True, flush_interval_ms=60000)
+        flusher = log._flusher
+        log.write(self._event(0))
+        
+        log.close()
+        log.write(self._event(1))
+        
+        assert not flusher.is_alive()
+        assert [e.data["index"] for e in log.read_all()] == [0, 1]
+        log.close()
+    
+    def test_write_racing_close_is_not_stranded(self):
+        """A line queued after close()'s final drain is written by the producer."""
+        log = AppendOnlyLog(self.log_path, batch_mode=True, flush_interval_ms=60000)
+        
+        class CloseFirst(deque):
+            """Queue whose append lands just after close() has finished."""
+            
+            def append(self, line):
+                log.close()
+                super().append(line)
+        
+        log._lines = CloseFirst()
+        log.write(self._event(0))
+        
+        assert not log._lines
+        assert [e.data["index"] for e in log.read_all()] == [0]
+        log.close()
+
+
 class TestDuckDBStoreEdgeCases:
     """Comprehensive tests for DuckDB store."""
     
@@ -449,6 +1068,83 @@ class TestDuckDBStoreEdgeCases:
             }])
         
         readonly_store.close()
+    
+    def test_execute_returns_materialized_rows(self):
+        """Raw query rows survive later statements on the shared connection."""
+        self.store.insert_bars([self._bar(1, 100.5), self._bar(2, 101.0)])
+        
+        rows = self.store.execute("SELECT close FROM bars ORDER BY timestamp")
+        self.store.execute("SELECT COUNT(*) FROM sentiment")
+        
+        assert rows == [(100.5,), (101.0,)]
+    
+    def _bar(self, day, close, **extra):
+        """Daily TEST bar with the given close."""
+        return {
+            "symbol": "TEST",
+            "timestamp": datetime(2020, 1, day),
+            "timeframe": "1Day",
+            "tier": "TIER_1_VALIDATION",
+            "open": 100.0,
+            "high": 101.0,
+            "low": 99.0,
+            "close": close,
+            "volume": 1000000.0,
+            **extra,
+        }
+    
+    def test_upsert_replaces_existing_bar(self):
+        """Re-inserting a key updates it in place; new keys get fresh ids."""
+        self.store.insert_bars([self._bar(1, 100.5), self._bar(2, 101.0)])
+        self.store.insert_bars([self._bar(2, 102.0), self._bar(3, 103.0)])
+        
+        rows = self.store.conn.execute(
+            "SELECT id, close FROM bars ORDER BY timestamp"
+        ).fetchall()
+        
+        ids, closes = zip(*rows)
+        
+        assert closes == (100.5, 102.0, 103.0)
+        assert ids[:2] == (1, 2)
+        assert ids[2] > 2
+    
+    def test_bar_columns_matched_by_name(self):
+        """Key order is irrelevant and a missing spread is stored as NULL."""
+        reordered = dict(reversed(list(self._bar(1, 100.5).items())))
+        
+        self.store.insert_bars([reordered, self._bar(2, 101.0, estimated_spread_bps=4.5)])
+        
+        bars = self.store.get_bars("TEST", datetime(2020, 1, 1), datetime(2020, 1, 31))
+        
+        assert bars["close"].tolist() == [100.5, 101.0]
+        assert bars["estimated_spread_bps"].isna().tolist() == [True, False]
+    
+    def test_duplicate_keys_in_batch_last_wins(self):
+        """Rows sharing a key within one call collapse to the last one."""
+        inserted = self.store.insert_bars([self._bar(1, 100.5), self._bar(1, 99.5)])
+        
+        bars = self.store.get_bars("TEST", datetime(2020, 1, 1), datetime(2020, 1, 31))
+        
+        assert inserted == 2
+        assert bars["close"].tolist() == [99.5]
+    
+    def test_insert_sentiment_upsert(self):
+        """Sentiment rows upsert on symbol, timestamp and source."""
+        record = {
+            "symbol": "TEST",
+            "timestamp": datetime(2020, 1, 1),
+            "source": "reddit",
+            "score": 0.2,
+            "volume": 10,
+        }
+        
+        self.store.insert_sentiment([record, {**record, "source": "twitter"}])
+        self.store.insert_sentiment([{**record, "score": -0.4, "is_calibrated": True}])
+        
+        result = self.store.get_sentiment("TEST", datetime(2020, 1, 1), datetime(2020, 1, 2))
+        
+        assert result.sort_values("source")["score"].tolist() == [-0.4, 0.2]
+        assert result["volume"].tolist() == [10, 10]
 
 
 class TestStorageIntegration: